@@ -0,0 +1,224 @@
+import time
+import numpy as np
+
+from cards import CARD_VALUES
+from blackjack_ai import BlackjackAI, SMALL_BETS, threshold_bet
+from blackjack_baseline import BaselineModel
+
+# card values of one 52-card deck, in the same order Deck builds them
+DECK_VALUES = np.array(CARD_VALUES, dtype=np.int8)
+DECK_SIZE = len(DECK_VALUES)
+FULL_COUNTS = np.bincount(DECK_VALUES, minlength=12).astype(np.int16)
+RESHUFFLE_AT = 15  # Deck.deal reshuffles when fewer cards than this remain
+
+class BatchShoes:
+    """
+    N independent single-deck shoes stored as rows of integer card values.
+    """
+    def __init__(self, n_shoes, rng=None):
+        """
+        Initializes and shuffles every shoe.
+        """
+        self.n_shoes = n_shoes
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.cards = np.empty((n_shoes, DECK_SIZE), dtype=np.int8)
+        self.pos = np.zeros(n_shoes, dtype=np.int64)
+        self.counts = np.empty((n_shoes, 12), dtype=np.int16)
+        self.shuffle(np.ones(n_shoes, dtype=bool))
+
+    def shuffle(self, mask):
+        """
+        Reshuffles the full deck back into the shoes selected by mask.
+        """
+        rows = np.flatnonzero(mask)
+        if rows.size == 0:
+            return
+        self.cards[rows] = self.rng.permuted(np.broadcast_to(DECK_VALUES, (rows.size, DECK_SIZE)), axis=1)
+        self.pos[rows] = 0
+        self.counts[rows] = FULL_COUNTS
+
+    def deal(self, mask):
+        """
+        Deals one card to every shoe selected by mask, 0 for the others.
+        """
+        self.shuffle(mask & (DECK_SIZE - self.pos < RESHUFFLE_AT))
+        rows = np.flatnonzero(mask)
+        values = np.zeros(self.n_shoes, dtype=np.int64)
+        dealt = self.cards[rows, self.pos[rows]]
+        values[rows] = dealt
+        self.pos[rows] += 1
+        self.counts[rows, dealt] -= 1
+        return values
+
+    def composition(self):
+        """
+        Returns the low (2-6), mid (7-9) and high (10-ace) fractions of each shoe.
+        """
+        remaining = DECK_SIZE - self.pos
+        low = self.counts[:, 2:7].sum(axis=1) / remaining
+        mid = self.counts[:, 7:10].sum(axis=1) / remaining
+        high = self.counts[:, 10:12].sum(axis=1) / remaining
+        return low, mid, high
+
+def add_card(total, soft_aces, card, mask):
+    """
+    Adds card to the hands selected by mask, demoting soft aces on a bust.
+    """
+    total = np.where(mask, total + card, total)
+    soft_aces = np.where(mask & (card == 11), soft_aces + 1, soft_aces)
+    # two aces can need demoting at once (soft 21 plus an ace)
+    for _ in range(2):
+        demote = (total > 21) & (soft_aces > 0)
+        total = np.where(demote, total - 10, total)
+        soft_aces = np.where(demote, soft_aces - 1, soft_aces)
+    return total, soft_aces
+
+def q_table_policy(ai: BlackjackAI):
+    """
+    Builds a vectorized greedy policy from the AI's q-table, which must be keyed
+    on the bucket fractions the vectorized callers pass in.
+    """
+    if ai.encoder.composition != "buckets":
+        raise ValueError(f"vectorized policies need a bucket state abstraction, not {ai.encoder.abstraction!r}")
+    frozen = ai.freeze()
+
+    def policy(player_total, dealer_card, low, mid, high, bet, soft):
+        return frozen.query(player_total, dealer_card, low, mid, high, bet, soft) == 0
+    return policy
+
+def baseline_policy(player_total, dealer_card, low, mid, high, bet, soft):
+    """
+    Vectorized BaselineModel.get_action, True for hit.
+    """
+    weak_for_12 = (dealer_card >= 4) & (dealer_card <= 6)
+    return ((player_total <= 11)
+            | ((player_total == 12) & ~weak_for_12)
+            | ((player_total >= 13) & (player_total <= 16) & (dealer_card > 6)))
+
+def ai_bet(low, mid, high, rng):
+    """
+    Vectorized BlackjackAI.choose_bet.
+    """
+    small = rng.choice(np.array(SMALL_BETS), size=low.shape)
+    bet = threshold_bet(low, mid, high)
+    return np.where(bet > 0, bet, small)
+
+def baseline_bet(low, mid, high, rng):
+    """
+    Vectorized BaselineModel.get_bet.
+    """
+    return np.full(low.shape, BaselineModel.get_bet(), dtype=np.int64)
+
+def play_round(shoes, policy, bet_fn):
+    """
+    Plays one hand in every shoe and returns the rewards.
+    """
+    n = shoes.n_shoes
+    everyone = np.ones(n, dtype=bool)
+    zeros = np.zeros(n, dtype=np.int64)
+
+    low, mid, high = shoes.composition()
+    bet = bet_fn(low, mid, high, shoes.rng).astype(np.int64)
+
+    # initial deal, same order as BlackjackGame.deal_initial
+    player_total, player_soft = add_card(zeros, zeros, shoes.deal(everyone), everyone)
+    player_total, player_soft = add_card(player_total, player_soft, shoes.deal(everyone), everyone)
+    dealer_card = shoes.deal(everyone)
+    dealer_total, dealer_soft = add_card(zeros, zeros, dealer_card, everyone)
+    dealer_total, dealer_soft = add_card(dealer_total, dealer_soft, shoes.deal(everyone), everyone)
+
+    # player's turn
+    active = everyone
+    busted = np.zeros(n, dtype=bool)
+    while active.any():
+        low, mid, high = shoes.composition()
+        active = active & policy(player_total, dealer_card, low, mid, high, bet, player_soft > 0)
+        if not active.any():
+            break
+        player_total, player_soft = add_card(player_total, player_soft, shoes.deal(active), active)
+        bust = active & (player_total > 21)
+        busted |= bust
+        active = active & ~bust
+
+    # dealer's turn, only for hands still standing
+    drawing = ~busted & (dealer_total < 17)
+    while drawing.any():
+        dealer_total, dealer_soft = add_card(dealer_total, dealer_soft, shoes.deal(drawing), drawing)
+        drawing = drawing & (dealer_total < 17)
+
+    win = ~busted & ((dealer_total > 21) | (player_total > dealer_total))
+    draw = ~busted & ~win & (player_total == dealer_total)
+    reward = np.where(win, (bet * 3) // 2, -bet)
+    return np.where(draw, 0, reward)
+
+def simulate_batch(policy, bet_fn, n_hands, n_shoes=10000, rng=None, fresh_shoe=False):
+    """
+    Plays n_hands hands spread over n_shoes independent shoes and returns the rewards.
+    fresh_shoe reshuffles before every hand, like simulate_baseline_hand.
+    """
+    n_shoes = min(n_shoes, n_hands)
+    shoes = BatchShoes(n_shoes, rng)
+    rewards = []
+    played = 0
+    while played < n_hands:
+        if fresh_shoe:
+            shoes.shuffle(np.ones(n_shoes, dtype=bool))
+        rewards.append(play_round(shoes, policy, bet_fn))
+        played += n_shoes
+    return np.concatenate(rewards)[:n_hands]
+
+def simulate_ai_batch(ai: BlackjackAI, n_hands, n_shoes=10000, rng=None):
+    """
+    Batched equivalent of simulate_hand(ai, train=False) with a greedy AI.
+    """
+    if ai.rules.extended:
+        raise ValueError("the batched simulator only plays the simple hit/stand rules")
+    return simulate_batch(q_table_policy(ai), ai_bet, n_hands, n_shoes, rng)
+
+def simulate_baseline_batch(n_hands, n_shoes=10000, rng=None):
+    """
+    Batched equivalent of simulate_baseline_hand.
+    """
+    return simulate_batch(baseline_policy, baseline_bet, n_hands, n_shoes, rng, fresh_shoe=True)
+
+def main():
+    """
+    compares hands/sec of the batched simulator against the one-hand-at-a-time loop
+    """
+    from train_blackjack_ai import simulate_hand, simulate_baseline_hand
+
+    ai = BlackjackAI(epsilon=0.0)
+    try:
+        ai.load_model()
+        ai.epsilon = 0.0
+    except FileNotFoundError:
+        print("No trained AI model found, using untrained version")
+    baseline = BaselineModel()
+
+    serial_hands = 20000
+    batch_hands = 1000000
+
+    rows = []
+    for label, serial, batch in [
+        ("AI", lambda: simulate_hand(ai, train=False), lambda: simulate_ai_batch(ai, batch_hands)),
+        ("Baseline", lambda: simulate_baseline_hand(baseline), lambda: simulate_baseline_batch(batch_hands)),
+    ]:
+        start = time.perf_counter()
+        serial_profit = sum(serial() for _ in range(serial_hands))
+        serial_rate = serial_hands / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        batch_profit = int(batch().sum())
+        batch_rate = batch_hands / (time.perf_counter() - start)
+
+        rows.append((label, serial_rate, batch_rate, serial_profit / serial_hands, batch_profit / batch_hands))
+
+    print("-"*92)
+    print(f"| {'Model':<10} | {'Serial hands/s':>15} | {'Batch hands/s':>15} | {'Speedup':>8} | {'Serial avg':>11} | {'Batch avg':>11} |")
+    print("-"*92)
+    for label, serial_rate, batch_rate, serial_avg, batch_avg in rows:
+        print(f"| {label:<10} | {serial_rate:15,.0f} | {batch_rate:15,.0f} | {batch_rate/serial_rate:7.1f}x | {serial_avg:11.2f} | {batch_avg:11.2f} |")
+    print("-"*92)
+
+if __name__ == "__main__":
+    main()
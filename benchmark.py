@@ -0,0 +1,281 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import numpy as np
+
+from cards import Deck, DECK_CARDS
+from blackjack import BlackjackGame, Hand, TableRules
+from blackjack_ai import BlackjackAI
+from blackjack_baseline import BaselineModel
+import train_blackjack_ai
+
+SEED = 12345
+# seen states in the q-tables whose load time is measured
+LOAD_SIZES = (1000, 10000, 100000)
+
+def bench_deck_deal(ops):
+    """
+    Deck.deal, including reshuffles.
+    """
+    deck = Deck(random.Random(SEED))
+    def run():
+        for _ in range(ops):
+            deck.deal()
+    return run
+
+def bench_card_filename(ops):
+    """
+    Card.filename, as called for every card on every GUI redraw.
+    """
+    def run():
+        for i in range(ops):
+            DECK_CARDS[i % 52].filename()
+    return run
+
+def bench_remaining_probabilities(ops):
+    """
+    Deck.get_remaining_probabilities on a partly dealt deck.
+    """
+    deck = Deck(random.Random(SEED))
+    for _ in range(20):
+        deck.deal()
+    def run():
+        for _ in range(ops):
+            deck.get_remaining_probabilities()
+    return run
+
+def bench_calculate_score(ops):
+    """
+    BlackjackGame.calculate_score over a mix of hand sizes.
+    """
+    deck = Deck(random.Random(SEED))
+    game = BlackjackGame(deck)
+    hands = [Hand(deck.deal() for _ in range(2 + i % 3)) for i in range(100)]
+    def run():
+        for i in range(ops):
+            game.calculate_score(hands[i % 100])
+    return run
+
+def _sample_states(ai, count, rng):
+    """
+    Returns state indexes built from random but plausible game situations.
+    """
+    states = []
+    for _ in range(count):
+        low = rng.uniform(0.25, 0.5)
+        high = rng.uniform(0.25, 0.45)
+        buckets = (low, 1 - low - high, high)
+        states.append(ai.get_state_from_buckets(rng.randint(4, 21), rng.randint(2, 11), buckets, rng.choice(ai.bet_sizes)))
+    return states
+
+def bench_choose_action(ops):
+    """
+    BlackjackAI.choose_action with exploration, over seen and unseen states.
+    """
+    rng = random.Random(SEED)
+    ai = BlackjackAI(epsilon=0.1, rng=rng)
+    states = _sample_states(ai, 1000, rng)
+    def run():
+        for i in range(ops):
+            ai.choose_action(states[i % 1000])
+    return run
+
+def bench_update(ops):
+    """
+    BlackjackAI.update with a next state.
+    """
+    rng = random.Random(SEED)
+    ai = BlackjackAI(rng=rng)
+    states = _sample_states(ai, 1001, rng)
+    def run():
+        for i in range(ops):
+            ai.update(states[i % 1000], 'hit', 0, states[i % 1000 + 1])
+    return run
+
+def bench_simulate_hand(ops):
+    """
+    Full training hands through simulate_hand.
+    """
+    rng = random.Random(SEED)
+    deck = Deck(random.Random(SEED + 1))
+    ai = BlackjackAI(rng=rng)
+    def run():
+        for _ in range(ops):
+            train_blackjack_ai.simulate_hand(ai, train=True, deck=deck)
+            ai.decay_epsilon()
+    return run
+
+def bench_simulate_rules_hand(ops):
+    """
+    Full training hands under the vegas rules, with doubles, splits, surrender and insurance.
+    """
+    rng = random.Random(SEED)
+    deck = Deck(random.Random(SEED + 1))
+    ai = BlackjackAI(rng=rng, rules=TableRules.preset("vegas"))
+    def run():
+        for _ in range(ops):
+            train_blackjack_ai.simulate_hand(ai, train=True, deck=deck)
+            ai.decay_epsilon()
+    return run
+
+def bench_simulate_baseline_hand(ops):
+    """
+    Full hands through simulate_baseline_hand.
+    """
+    rng = random.Random(SEED)
+    baseline = BaselineModel()
+    def run():
+        for _ in range(ops):
+            train_blackjack_ai.simulate_baseline_hand(baseline, rng)
+    return run
+
+def bench_load_model(seen_states):
+    """
+    BlackjackAI.load_model latency for a q-table with the given number of seen states.
+    """
+    def factory(ops):
+        ai = BlackjackAI()
+        rng = np.random.default_rng(SEED)
+        states = rng.choice(ai.encoder.size, size=seen_states, replace=False)
+        ai.q_table[states] = rng.random((seen_states, 2), dtype=np.float32)
+        ai.seen[states] = True
+        ai.visits[states] = 1
+        directory = tempfile.TemporaryDirectory()
+        path = os.path.join(directory.name, "bench_model.bjq")
+        ai.save_model(path)
+        def run():
+            for _ in range(ops):
+                loaded = BlackjackAI()
+                loaded.load_model(path)
+                # touch the table so the mapping is really read
+                loaded.q_table[states[0]]
+        return run, directory.cleanup
+    return factory
+
+# (name, factory, ops): factory(ops) returns the timed run function, or
+# (run, cleanup) when it sets up something to remove after the trials
+BENCHMARKS = [
+    ("deck_deal", bench_deck_deal, 200000),
+    ("card_filename", bench_card_filename, 200000),
+    ("deck_remaining_probabilities", bench_remaining_probabilities, 100000),
+    ("calculate_score", bench_calculate_score, 200000),
+    ("ai_choose_action", bench_choose_action, 200000),
+    ("ai_update", bench_update, 200000),
+    ("simulate_hand", bench_simulate_hand, 20000),
+    ("simulate_rules_hand", bench_simulate_rules_hand, 20000),
+    ("simulate_baseline_hand", bench_simulate_baseline_hand, 20000),
+] + [(f"load_model_{size}", bench_load_model(size), 20) for size in LOAD_SIZES]
+
+def run_benchmarks(trials=5, warmup=1, scale=1.0, only=None):
+    """
+    Runs every benchmark with warmup and repeated trials and returns the results dict.
+    """
+    results = {}
+    for name, factory, ops in BENCHMARKS:
+        if only and name not in only:
+            continue
+        ops = max(1, int(ops * scale))
+        run = factory(ops)
+        cleanup = None
+        if isinstance(run, tuple):
+            run, cleanup = run
+        try:
+            for _ in range(warmup):
+                run()
+            times = []
+            for _ in range(trials):
+                start = time.perf_counter()
+                run()
+                times.append(time.perf_counter() - start)
+        finally:
+            if cleanup:
+                cleanup()
+        median = statistics.median(times)
+        results[name] = {
+            "ops": ops,
+            "trial_seconds": times,
+            "median_ops_per_sec": ops / median,
+            "median_seconds_per_op": median / ops,
+        }
+        print(f"{name:<32} {ops / median:15,.0f} ops/s  {median / ops * 1e6:12.3f} us/op")
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seed": SEED,
+            "trials": trials,
+            "warmup": warmup,
+            "scale": scale,
+        },
+        "results": results,
+    }
+
+def compare(base, new, threshold=0.1):
+    """
+    Prints per-benchmark changes between two result dicts and returns the names
+    that slowed down by more than threshold.
+    """
+    regressions = []
+    print("-"*80)
+    print(f"| {'Benchmark':<32} | {'Base ops/s':>12} | {'New ops/s':>12} | {'Change':>9} |    |")
+    print("-"*80)
+    for name, new_result in new["results"].items():
+        if name not in base["results"]:
+            continue
+        base_rate = base["results"][name]["median_ops_per_sec"]
+        new_rate = new_result["median_ops_per_sec"]
+        change = new_rate / base_rate - 1
+        flag = ""
+        if change < -threshold:
+            regressions.append(name)
+            flag = "!!"
+        print(f"| {name:<32} | {base_rate:12,.0f} | {new_rate:12,.0f} | {change*100:+8.1f}% | {flag:>2} |")
+    print("-"*80)
+    return regressions
+
+def main():
+    """
+    run benchmarks or compare two result files
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the blackjack hot paths.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run the benchmarks and write JSON results")
+    run_parser.add_argument("--output", default="bench_results.json", help="JSON file to write")
+    run_parser.add_argument("--trials", type=int, default=5, help="timed trials per benchmark")
+    run_parser.add_argument("--warmup", type=int, default=1, help="untimed warmup runs per benchmark")
+    run_parser.add_argument("--scale", type=float, default=1.0, help="multiply the operations per trial")
+    run_parser.add_argument("--only", nargs="*", help="benchmark names to run")
+
+    compare_parser = subparsers.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("base", help="baseline results JSON")
+    compare_parser.add_argument("new", help="new results JSON")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="slowdown fraction flagged as a regression")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        results = run_benchmarks(args.trials, args.warmup, args.scale, args.only)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.output}")
+    else:
+        with open(args.base) as f:
+            base = json.load(f)
+        with open(args.new) as f:
+            new = json.load(f)
+        regressions = compare(base, new, args.threshold)
+        if regressions:
+            print(f"Regressions beyond {args.threshold*100:.0f}%: {', '.join(regressions)}")
+            sys.exit(1)
+        print("No regressions")
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,165 @@
+class Hand(list):
+    """
+    A list of cards that keeps its score up to date as cards are added.
+
+    hard_total counts every ace as 1; one ace is worth 11 whenever that keeps the
+    hand at 21 or under, so the score and soft flag are constant-time reads.
+    """
+    __slots__ = ('hard_total', 'aces', 'bet', 'split', 'parent')
+
+    def __init__(self, cards=(), bet=0):
+        super().__init__()
+        self.hard_total = 0
+        self.aces = 0
+        self.bet = bet
+        # split hands can't be naturals; parent is the hand this one was split from
+        self.split = False
+        self.parent = None
+        for card in cards:
+            self.append(card)
+
+    def append(self, card):
+        """
+        Adds a card and updates the running totals.
+        """
+        list.append(self, card)
+        if card.value == 11:
+            self.aces += 1
+            self.hard_total += 1
+        else:
+            self.hard_total += card.value
+
+    @property
+    def is_soft(self):
+        """
+        Whether an ace is counted as 11.
+        """
+        return self.aces > 0 and self.hard_total <= 11
+
+    @property
+    def score(self):
+        """
+        The best total of the hand.
+        """
+        return self.hard_total + 10 if self.aces and self.hard_total <= 11 else self.hard_total
+
+    @property
+    def is_blackjack(self):
+        """
+        Whether the hand is a two-card 21.
+        """
+        return len(self) == 2 and self.aces > 0 and self.hard_total == 11
+
+    @property
+    def is_pair(self):
+        """
+        Whether the hand is two cards of the same value.
+        """
+        return len(self) == 2 and self[0].value == self[1].value
+
+    def split_off(self):
+        """
+        Moves the second card into a new hand with the same bet and returns it.
+        """
+        card = list.pop(self)
+        if card.value == 11:
+            self.aces -= 1
+            self.hard_total -= 1
+        else:
+            self.hard_total -= card.value
+        other = Hand((card,), self.bet)
+        self.split = other.split = True
+        other.parent = self
+        return other
+
+class TableRules:
+    """
+    Table rules for BlackjackGame.
+
+    The defaults are the simple game the trainer has always played: hit or stand
+    only, the dealer stands on soft 17, every win pays 1.5x the bet and a natural
+    is an ordinary 21. Setting blackjack_payout turns on naturals, paid at that
+    multiple, with the dealer peeking for blackjack before the player acts.
+    max_hands caps how many hands splitting can make.
+    """
+    def __init__(self, hit_soft_17=False, win_payout=1.5, blackjack_payout=None, double=False,
+                 double_after_split=False, split=False, max_hands=4, resplit_aces=False,
+                 hit_split_aces=False, surrender=False, insurance=False):
+        self.hit_soft_17 = hit_soft_17
+        self.win_payout = win_payout
+        self.blackjack_payout = blackjack_payout
+        self.double = double
+        self.double_after_split = double_after_split
+        self.split = split
+        self.max_hands = max_hands
+        self.resplit_aces = resplit_aces
+        self.hit_split_aces = hit_split_aces
+        self.surrender = surrender
+        self.insurance = insurance
+        self.naturals = blackjack_payout is not None
+        self.actions = ['hit', 'stand'] + [action for action, allowed in
+                                           (('double', double), ('split', split), ('surrender', surrender)) if allowed]
+        # anything beyond the simple game is played by the full rules engine
+        self.extended = bool(hit_soft_17 or win_payout != 1.5 or self.naturals or insurance or len(self.actions) > 2)
+
+    @classmethod
+    def preset(cls, name, **overrides):
+        """
+        Returns a rule set from RULE_PRESETS, with any rules in overrides changed.
+        """
+        if name not in RULE_PRESETS:
+            raise ValueError(f"unknown rule set {name!r}, expected one of {', '.join(RULE_PRESETS)}")
+        return cls(**{**RULE_PRESETS[name], **overrides})
+
+    def to_dict(self):
+        """
+        Returns the rules as keyword arguments for TableRules.
+        """
+        return {
+            "hit_soft_17": self.hit_soft_17,
+            "win_payout": self.win_payout,
+            "blackjack_payout": self.blackjack_payout,
+            "double": self.double,
+            "double_after_split": self.double_after_split,
+            "split": self.split,
+            "max_hands": self.max_hands,
+            "resplit_aces": self.resplit_aces,
+            "hit_split_aces": self.hit_split_aces,
+            "surrender": self.surrender,
+            "insurance": self.insurance,
+        }
+
+# named rule sets: the simple training game, a typical Las Vegas Strip table
+# (S17, 3:2, double after split, late surrender) and a dealer-hits-soft-17 6:5 table
+RULE_PRESETS = {
+    "simple": {},
+    "vegas": {"win_payout": 1.0, "blackjack_payout": 1.5, "double": True, "double_after_split": True,
+              "split": True, "surrender": True, "insurance": True},
+    "h17_6to5": {"hit_soft_17": True, "win_payout": 1.0, "blackjack_payout": 1.2, "double": True,
+                 "double_after_split": True, "split": True, "insurance": True},
+}
+
+# shared default, so games under the simple rules don't build their own
+SIMPLE_RULES = TableRules()
+
 class BlackjackGame:
     """
     Represents a blackjack game.
     """
-    def __init__(self, deck, chips=500):
+    def __init__(self, deck, chips=500, rules=None):
         """
-        Initializes a new blackjack game.
+        Initializes a new blackjack game, under the simple rules unless a TableRules is given.
         """
         self.deck = deck
-        self.player_hand = []
-        self.dealer_hand = []
+        self.rules = rules if rules is not None else SIMPLE_RULES
+        self.player_hand = Hand()
+        self.dealer_hand = Hand()
+        # every hand the player is playing, more than one after splits
+        self.hands = [self.player_hand]
         self.chips = chips
         self.bet = 0
+        self.insurance = 0
+        self.surrendered = False
         self.game_over = False
 
     def place_bet(self, amount):
@@ -27,8 +176,19 @@ class BlackjackGame:
         """
         Deals the initial cards to the player and dealer.
         """
-        self.player_hand = [self.deck.deal(), self.deck.deal()]
-        self.dealer_hand = [self.deck.deal(), self.deck.deal()]
+        self.deck.start_hand()
+        player_hand = Hand((self.deck.deal(), self.deck.deal()), self.bet)
+        self.start_round(player_hand, Hand((self.deck.deal(), self.deck.deal())))
+
+    def start_round(self, player_hand, dealer_hand):
+        """
+        Starts a round with hands dealt elsewhere, e.g. by a table sharing one dealer hand between seats.
+        """
+        self.player_hand = player_hand
+        self.dealer_hand = dealer_hand
+        self.hands = [player_hand]
+        self.insurance = 0
+        self.surrendered = False
 
     def hit(self, hand):
         """
@@ -36,16 +196,150 @@ class BlackjackGame:
         """
         hand.append(self.deck.deal())
 
+    def legal_actions(self, hand):
+        """
+        Returns the actions the rules allow for a hand, a single 'stand' when the hand is finished.
+        """
+        rules = self.rules
+        if rules.naturals and hand.is_blackjack and not hand.split:
+            return ['stand']
+        pair = hand.is_pair and rules.split and len(self.hands) < rules.max_hands and self.chips >= hand.bet
+        if hand.split and hand[0].value == 11:
+            # split aces get one card each, unless the rules allow hitting or resplitting them
+            if pair and not rules.resplit_aces:
+                pair = False
+            if not rules.hit_split_aces:
+                return ['stand', 'split'] if pair and len(hand) == 2 else ['stand']
+        legal = ['hit', 'stand']
+        if len(hand) == 2:
+            if rules.double and self.chips >= hand.bet and (rules.double_after_split or not hand.split):
+                legal.append('double')
+            if pair:
+                legal.append('split')
+            if rules.surrender and not hand.split:
+                legal.append('surrender')
+        return legal
+
+    def double(self, hand):
+        """
+        Doubles the bet on a hand and deals it exactly one more card.
+        """
+        self.chips -= hand.bet
+        hand.bet *= 2
+        self.hit(hand)
+
+    def split(self, hand):
+        """
+        Splits a pair into two hands with equal bets, deals each a second card
+        and returns the new hand, which is played after this one.
+        """
+        self.chips -= hand.bet
+        other = hand.split_off()
+        # Hand compares by cards, so find this one by identity
+        position = next(i for i, played in enumerate(self.hands) if played is hand)
+        self.hands.insert(position + 1, other)
+        self.hit(hand)
+        self.hit(other)
+        return other
+
+    def surrender(self, hand):
+        """
+        Gives up the hand for half the bet back.
+        """
+        self.surrendered = True
+
+    def can_insure(self):
+        """
+        Whether insurance is offered, i.e. the rules allow it and the dealer shows an ace.
+        """
+        return self.rules.insurance and self.dealer_hand[0].value == 11 and self.chips >= self.bet // 2
+
+    def take_insurance(self):
+        """
+        Places an insurance side bet of half the bet, paid 2:1 if the dealer has blackjack.
+        """
+        self.insurance = self.bet // 2
+        self.chips -= self.insurance
+
+    def dealer_has_blackjack(self):
+        """
+        The dealer's peek: whether naturals are in play and the dealer has one.
+        """
+        return self.rules.naturals and self.dealer_hand.is_blackjack
+
+    def has_live_hand(self):
+        """
+        Whether any player hand still depends on the dealer's draw.
+        """
+        if self.surrendered or all(hand.score > 21 for hand in self.hands):
+            return False
+        return not (self.rules.naturals and len(self.hands) == 1 and self.player_hand.is_blackjack)
+
+    def dealer_play(self):
+        """
+        Draws the dealer's hand when any player hand is still live.
+        """
+        if self.has_live_hand():
+            self.draw_dealer()
+
+    def draw_dealer(self):
+        """
+        Draws the dealer's hand to 17 under the soft-17 rule.
+        """
+        hand = self.dealer_hand
+        hit_soft_17 = self.rules.hit_soft_17
+        while hand.score < 17 or (hit_soft_17 and hand.score == 17 and hand.is_soft):
+            self.hit(hand)
+
+    def settle(self):
+        """
+        Pays out every hand and the insurance bet under the rules.
+        Returns the net reward of the round and the reward of each hand.
+        """
+        rules = self.rules
+        dealer_score = self.dealer_hand.score
+        dealer_blackjack = self.dealer_has_blackjack()
+        rewards = []
+        for hand in self.hands:
+            bet = hand.bet
+            score = hand.score
+            if self.surrendered:
+                reward = -(bet // 2)
+            elif rules.naturals and hand.is_blackjack and not hand.split:
+                reward = 0 if dealer_blackjack else int(bet * rules.blackjack_payout)
+            elif dealer_blackjack or score > 21:
+                reward = -bet
+            elif dealer_score > 21 or score > dealer_score:
+                reward = int(bet * rules.win_payout)
+            elif score == dealer_score:
+                reward = 0
+            else:
+                reward = -bet
+            self.chips += bet + reward
+            rewards.append(reward)
+
+        total = sum(rewards)
+        if self.insurance:
+            insurance = 2 * self.insurance if dealer_blackjack else -self.insurance
+            self.chips += self.insurance + insurance
+            total += insurance
+        return total, rewards
+
     def calculate_score(self, hand):
         """
         Calculates the score of a player's hand.
         """
-        score = sum(card.value for card in hand)
-        aces = sum(1 for card in hand if card.rank == 'ace')
-        while score > 21 and aces:
-            score -= 10
-            aces -= 1
-        return score
+        if not isinstance(hand, Hand):
+            hand = Hand(hand)
+        return hand.score
+
+    def is_soft(self, hand):
+        """
+        Returns whether an ace in the hand is still counted as 11.
+        """
+        if not isinstance(hand, Hand):
+            hand = Hand(hand)
+        return hand.is_soft
 
     def check_winner(self):
         """
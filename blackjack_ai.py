@@ -1,20 +1,361 @@
+import bisect
 import random
 import numpy as np
 import pickle
+from blackjack import SIMPLE_RULES
+from model_format import write_model, open_model
+
+MODEL_PATH = "blackjack_model.bjq"
+# one-step Q-learning, n-step returns, Watkins Q(lambda) and Monte Carlo returns
+UPDATE_MODES = ("q", "nstep", "lambda", "mc")
+
+# true-count edges between the bins of the "count" abstractions
+COUNT_EDGES = (-2, -1, 0, 1, 2, 3, 4)
+# named state abstractions: what describes the rest of the shoe ("buckets" of
+# low/mid/high fractions, a Hi-Lo true-count bin, or "none") and whether the
+# bet is part of the play state
+STATE_ABSTRACTIONS = {
+    "full": {"composition": "buckets", "bet": True},
+    "no_bet": {"composition": "buckets", "bet": False},
+    "count_bet": {"composition": "count", "bet": True},
+    "count": {"composition": "count", "bet": False},
+    "basic": {"composition": "none", "bet": False},
+}
+
+def to_tenths(fraction):
+    """
+    Rounds a bucket fraction to whole tenths (half to even), elementwise for an array.
+    The scalar and batched encoders both key states through this, so they agree on
+    fractions like 0.35 that sit on a rounding boundary.
+    """
+    if isinstance(fraction, np.ndarray):
+        return np.rint(fraction * 10).astype(np.int64)
+    return round(fraction * 10)
+
+class StateEncoder:
+    """
+    Maps game states to flat indices into a dense q-table.
+
+    A state is (player_total, dealer_card, low, mid, high, bet) with the three
+    probabilities rounded to 0.1. Since low + mid + high = 1, high is stored as its
+    offset (-1, 0 or +1 tenth) from 1 - low - mid. Player totals above 21 share
+    one bust slot and bets are bucketed in steps of 10.
+
+    That is the "full" abstraction. The others in STATE_ABSTRACTIONS keep the
+    total and dealer card but swap the three fractions for a Hi-Lo true-count bin
+    (split at COUNT_EDGES) or drop them, and may drop the bet, for a table up to
+    several thousand times smaller. Those need the deck itself, so use
+    encode_deck, which works for every abstraction.
+
+    With soft=True or pairs=True the table gets a leading hand-kind axis (hard,
+    then soft, then splittable pair); hard states keep the same indices as
+    without it and the other kinds follow them. Pair states are keyed on the
+    pair card, passed as pair: two of a card worth v sit in the slot of total
+    2v, so a pair of aces (2 x 11) takes the otherwise unused bust slot rather
+    than sharing 6-6's total of 12.
+    """
+    MIN_TOTAL = 4
+    MAX_TOTAL = 22
+    # a pair of aces is a soft 12
+    ACE_PAIR_TOTAL = 12
+
+    def __init__(self, soft=False, pairs=False, abstraction="full"):
+        if abstraction not in STATE_ABSTRACTIONS:
+            raise ValueError(f"unknown state abstraction {abstraction!r}, expected one of {', '.join(STATE_ABSTRACTIONS)}")
+        self.soft = soft
+        self.pairs = pairs
+        self.abstraction = abstraction
+        self.composition = STATE_ABSTRACTIONS[abstraction]["composition"]
+        self.bet = STATE_ABSTRACTIONS[abstraction]["bet"]
+        composition_shape = {"buckets": (11, 11, 3), "count": (len(COUNT_EDGES) + 1,), "none": ()}[self.composition]
+        self.base_shape = (self.MAX_TOTAL - self.MIN_TOTAL + 1, 10) + composition_shape + ((11,) if self.bet else ())
+        self.block = int(np.prod(self.base_shape))
+        kinds = 1 + soft + pairs
+        self.pair_offset = (kinds - 1) * self.block
+        self.shape = (kinds,) + self.base_shape if kinds > 1 else self.base_shape
+        self.size = int(np.prod(self.shape))
+        self.strides = tuple(int(np.prod(self.base_shape[i + 1:])) for i in range(len(self.base_shape)))
+
+    def encode(self, player_total, dealer_card, low10, mid10, high10, bet, soft=False, pair=False):
+        """
+        Returns the flat index of a state, with probabilities given in tenths.
+        pair is the value of the pair card for a hand that can be split, else 0.
+        Only for the abstractions keyed on the bucket fractions.
+        """
+        if self.composition != "buckets":
+            raise ValueError(f"the {self.abstraction!r} abstraction is not keyed on bucket fractions, use encode_deck")
+        if pair and self.pairs:
+            total = min(2 * pair, self.MAX_TOTAL) - self.MIN_TOTAL
+        else:
+            total = min(max(player_total, self.MIN_TOTAL), self.MAX_TOTAL) - self.MIN_TOTAL
+        residual = high10 - (10 - low10 - mid10) + 1
+        s = self.strides
+        index = (total * s[0] + (dealer_card - 2) * s[1] + low10 * s[2]
+                 + mid10 * s[3] + residual * s[4])
+        if self.bet:
+            index += min(bet // 10, 10)
+        if pair and self.pairs:
+            index += self.pair_offset
+        elif soft and self.soft:
+            index += self.block
+        return index
+
+    def encode_deck(self, player_total, dealer_card, deck, bet, soft=False, pair=False):
+        """
+        Returns the flat index of a state, reading the shoe from a Deck or Shoe.
+        """
+        if self.composition == "buckets":
+            low, mid, high = deck.get_bucket_probabilities()
+            return self.encode(player_total, dealer_card, to_tenths(low),
+                               to_tenths(mid), to_tenths(high), bet, soft, pair)
+        if pair and self.pairs:
+            total = min(2 * pair, self.MAX_TOTAL) - self.MIN_TOTAL
+        else:
+            total = min(max(player_total, self.MIN_TOTAL), self.MAX_TOTAL) - self.MIN_TOTAL
+        s = self.strides
+        index = total * s[0] + (dealer_card - 2) * s[1]
+        if self.composition == "count":
+            index += bisect.bisect_right(COUNT_EDGES, deck.true_count()) * s[2]
+        if self.bet:
+            index += min(bet // 10, 10)
+        if pair and self.pairs:
+            index += self.pair_offset
+        elif soft and self.soft:
+            index += self.block
+        return index
+
+    def encode_arrays(self, player_total, dealer_card, low10, mid10, high10, bet, soft=None):
+        """
+        Vectorized encode over arrays of state components.
+        """
+        if self.composition != "buckets":
+            raise ValueError(f"the {self.abstraction!r} abstraction is not keyed on bucket fractions")
+        total = np.clip(player_total, self.MIN_TOTAL, self.MAX_TOTAL) - self.MIN_TOTAL
+        residual = high10 - (10 - low10 - mid10) + 1
+        s = self.strides
+        index = (total * s[0] + (dealer_card - 2) * s[1] + low10 * s[2]
+                 + mid10 * s[3] + residual * s[4])
+        if self.bet:
+            index = index + np.minimum(bet // 10, 10)
+        if soft is not None and self.soft:
+            index = index + soft * self.block
+        return index
+
+    def slot_totals(self, pair=False):
+        """
+        The player total each slot of the total axis stands for, in the pair
+        block when pair is set, where the bust slot holds the pair of aces.
+        """
+        totals = np.arange(self.MIN_TOTAL, self.MAX_TOTAL + 1)
+        if pair:
+            totals[-1] = self.ACE_PAIR_TOTAL
+        return totals
+
+    def decode(self, index):
+        """
+        Returns the components of a flat index: (player_total, dealer_card, low,
+        mid, high, bet) under "full", and always the player total and dealer card
+        first, then the fractions or count bin and the bet as the abstraction keeps them.
+        """
+        parts = [int(part) for part in np.unravel_index(index % self.block, self.base_shape)]
+        state = (int(self.slot_totals(self.pairs and index >= self.pair_offset)[parts[0]]), parts[1] + 2)
+        if self.composition == "buckets":
+            low10, mid10, residual = parts[2:5]
+            high10 = 10 - low10 - mid10 + residual - 1
+            state += (low10 / 10, mid10 / 10, high10 / 10)
+        elif self.composition == "count":
+            state += (parts[2],)
+        if self.bet:
+            state += (parts[-1] * 10,)
+        return state
+
+# bets by deck composition, first match wins: (index into (low, mid, high), threshold, bet)
+BET_THRESHOLDS = ((2, 0.37, 100), (2, 0.3, 80), (1, 0.4, 60), (0, 0.4, 40))
+# the AI bets one of these at random when no bucket passes its threshold
+SMALL_BETS = (10, 20, 30, 50, 70)
+
+def threshold_bet(low, mid, high):
+    """
+    The bet of the first BET_THRESHOLDS entry the bucket fractions pass, or 0
+    when none does and the AI makes a random small bet. Works elementwise on
+    NumPy arrays too, so the scalar and batched players share one rule.
+    """
+    buckets = (low, mid, high)
+    if np.ndim(low):
+        return np.select([buckets[i] > threshold for i, threshold, _ in BET_THRESHOLDS],
+                         [bet for _, _, bet in BET_THRESHOLDS], 0)
+    for i, threshold, bet in BET_THRESHOLDS:
+        if buckets[i] > threshold:
+            return bet
+    return 0
+
+def insurance_pays(deck):
+    """
+    True when more than a third of the unseen cards are tens, the point where
+    the 2:1 insurance bet has positive expectation.
+    """
+    return deck.value_counts[10] * 3 > deck.remaining()
+
+def heuristic_hit_grid():
+    """
+    Returns a (player_total, dealer_card) grid of the greedy action BlackjackAI
+    takes in a state it has never seen, True for hit.
+    """
+    player_total = np.arange(32, dtype=np.float64)[:, None]
+    dealer_card = np.arange(12)[None, :]
+    hit_bias = np.minimum(1.0, (21 - player_total) / 21 * 2)
+    stand_bias = 1 - np.abs(player_total - 17) / 17
+    strong = (dealer_card >= 7) & (dealer_card <= 11)
+    weak = (dealer_card >= 2) & (dealer_card <= 6)
+    hit_bias = np.where(strong, hit_bias * 1.2, hit_bias)
+    stand_bias = np.where(weak, stand_bias * 1.2, stand_bias)
+    # np.argmax picks hit on ties
+    return hit_bias >= stand_bias
+
+class GreedyPolicy:
+    """
+    Read-only greedy policy exported from a trained BlackjackAI.
+
+    The greedy action of every state is computed once up front. States the AI
+    never saw get the hit/stand heuristic that choose_action would initialise
+    them with, and ties go to the earlier action as in choose_action. Nothing is
+    ever written, so one policy can be shared between threads while training
+    carries on elsewhere.
+    """
+    def __init__(self, q_table, seen, encoder, actions, bet_sizes):
+        self.encoder = encoder
+        self.actions = list(actions)
+        self.action_index = {action: i for i, action in enumerate(self.actions)}
+        self.bet_sizes = list(bet_sizes)
+        self.q_table = q_table
+        self.seen = seen
+        grid = heuristic_hit_grid()[:, 2:12]
+        kinds = []
+        for kind in range(encoder.size // encoder.block):
+            totals = encoder.slot_totals(encoder.pairs and kind * encoder.block == encoder.pair_offset)
+            unseen = grid[totals][(slice(None), slice(None)) + (None,) * (len(encoder.base_shape) - 2)]
+            kinds.append(np.broadcast_to(unseen, encoder.base_shape).ravel())
+        unseen = np.concatenate(kinds)
+        self.best = np.where(seen, q_table.argmax(axis=1), np.where(unseen, 0, 1)).astype(np.int8)
+        self.best.setflags(write=False)
+
+    @classmethod
+    def load(cls, path=MODEL_PATH):
+        """
+        Builds the policy straight from a model file, memory-mapped read-only.
+        """
+        header, sections = open_model(path, "r")
+        schema = header["schema"]
+        encoder = StateEncoder(schema.get("soft_hands", False), schema.get("pairs", False), schema.get("abstraction", "full"))
+        if tuple(schema["shape"]) != encoder.shape:
+            raise ValueError(f"{path} was saved with state schema {schema}, expected shape {encoder.shape}")
+        return cls(sections["q_table"], sections["seen"], encoder, schema["actions"], range(10, 101, 10))
+
+    def get_state(self, player_total, dealer_card, buckets, bet, soft=False, pair=False):
+        """
+        Returns the state index, keyed like BlackjackAI.get_state_from_buckets.
+        """
+        low, mid, high = buckets
+        return self.encoder.encode(player_total, dealer_card, to_tenths(low),
+                                   to_tenths(mid), to_tenths(high), bet, soft, pair)
+
+    def action(self, state, legal=None):
+        """
+        Returns the greedy action of a state, among the legal actions when they are given.
+        """
+        best = self.actions[self.best[state]]
+        if legal is None or best in legal:
+            return best
+        if not self.seen[state]:
+            return 'stand' if 'stand' in legal else legal[0]
+        q = self.q_table[state]
+        return max(legal, key=lambda action: q[self.action_index[action]])
+
+    def get_action(self, player_total, dealer_card, buckets, bet, soft=False, pair=False, legal=None):
+        """
+        Returns the greedy action for a game situation.
+        """
+        return self.action(self.get_state(player_total, dealer_card, buckets, bet, soft, pair), legal)
+
+    def get_state_from_deck(self, player_total, dealer_card, deck, bet, soft=False, pair=False):
+        """
+        Returns the state index, keyed like BlackjackAI.get_state_from_deck.
+        """
+        return self.encoder.encode_deck(player_total, dealer_card, deck, bet, soft, pair)
+
+    def get_action_from_deck(self, player_total, dealer_card, deck, bet, soft=False, pair=False, legal=None):
+        """
+        Same as get_action, reading the shoe from a Deck or Shoe; works under every state abstraction.
+        """
+        return self.action(self.encoder.encode_deck(player_total, dealer_card, deck, bet, soft, pair), legal)
+
+    def get_bet(self, buckets, rng=None):
+        """
+        Returns the AI's bet for the deck composition. Where the AI picks a random
+        small bet this uses rng, or bets the minimum when no rng is given.
+        """
+        bet = threshold_bet(*buckets)
+        if bet:
+            return bet
+        return rng.choice(SMALL_BETS) if rng is not None else self.bet_sizes[0]
+
+    def take_insurance(self, deck):
+        """
+        Same count rule as BlackjackAI.take_insurance.
+        """
+        return insurance_pays(deck)
+
+    def best_actions(self, states):
+        """
+        Vectorized action: the greedy action index of every state in an array.
+        """
+        return self.best[states]
+
+    def query_states(self, player_total, dealer_card, low, mid, high, bet, soft=None):
+        """
+        Vectorized get_state over arrays of state components, returning state indices.
+        """
+        return self.encoder.encode_arrays(player_total, dealer_card, to_tenths(low),
+                                          to_tenths(mid), to_tenths(high), bet, soft)
+
+    def query(self, player_total, dealer_card, low, mid, high, bet, soft=None):
+        """
+        Vectorized get_action over arrays of state components, returning action indices.
+        """
+        return self.best[self.query_states(player_total, dealer_card, low, mid, high, bet, soft)]
 
 class BlackjackAI:
     """
     Class representing the blackjack AI.
     """
-    def __init__(self, epsilon=1.0, alpha=0.05, gamma=0.95, epsilon_min=0.05, epsilon_decay=0.999995):
-        self.actions = ['hit', 'stand']
-        self.bet_sizes = [i for i in range(10, 101, 10)]  
-        self.q_table = {} 
+    def __init__(self, epsilon=1.0, alpha=0.05, gamma=0.95, epsilon_min=0.05, epsilon_decay=0.999995, rng=None,
+                 soft_hands=False, rules=None, update_mode="q", n_step=3, trace_lambda=0.8, state_abstraction="full"):
+        if update_mode not in UPDATE_MODES:
+            raise ValueError(f"unknown update mode {update_mode!r}, expected one of {', '.join(UPDATE_MODES)}")
+        # the table rules decide the actions; splitting needs separate states for pairs
+        self.rules = rules if rules is not None else SIMPLE_RULES
+        self.actions = list(self.rules.actions)
+        self.action_index = {action: i for i, action in enumerate(self.actions)}
+        self.bet_sizes = [i for i in range(10, 101, 10)]
+        # soft_hands keeps separate states for soft and hard totals; state_abstraction
+        # names how much of the shoe and bet the states keep (see STATE_ABSTRACTIONS)
+        self.encoder = StateEncoder(soft_hands, self.rules.split, state_abstraction)
+        self.q_table = np.zeros((self.encoder.size, len(self.actions)), dtype=np.float32)
+        self.seen = np.zeros(self.encoder.size, dtype=bool)
+        self.visits = np.zeros(self.encoder.size, dtype=np.uint32)
         self.epsilon = epsilon
         self.alpha = alpha
         self.gamma = gamma
         self.epsilon_min = epsilon_min
         self.epsilon_decay = epsilon_decay
+        # random.Random stream for exploration and bets, the random module by default
+        self.rng = rng if rng is not None else random
+        # how observe() learns: "q" updates every step at once, the others learn a
+        # whole hand's steps together once its reward is known
+        self.update_mode = update_mode
+        self.n_step = n_step
+        self.trace_lambda = trace_lambda
+        self._episode = []
 
     def decay_epsilon(self):
         """
@@ -23,89 +364,271 @@ class BlackjackAI:
         if self.epsilon > self.epsilon_min:
             self.epsilon *= self.epsilon_decay
 
-    def get_state(self, player_total, dealer_card, deck_probs, bet):
+    def get_state(self, player_total, dealer_card, deck_probs, bet, soft=False, pair=False):
+        """
+        Returns the q-table index of the current state of the game. soft only
+        matters for an AI built with soft_hands=True and pair (the card value of
+        a hand that can be split, else 0) only under rules that allow splitting.
+        """
+        buckets = (sum(deck_probs[v] for v in range(2, 7)),
+                   sum(deck_probs[v] for v in range(7, 10)),
+                   sum(deck_probs[v] for v in range(10, 12)))
+        return self.get_state_from_buckets(player_total, dealer_card, buckets, bet, soft, pair)
+
+    def get_state_from_buckets(self, player_total, dealer_card, buckets, bet, soft=False, pair=False):
         """
-        Returns a tuple representing the current state of the game. 
+        Same as get_state, from the (low, mid, high) fractions kept by Deck.get_bucket_probabilities.
         """
-        low = round(sum(deck_probs[v] for v in range(2, 7)), 1)
-        mid = round(sum(deck_probs[v] for v in range(7, 10)), 1)
-        high = round(sum(deck_probs[v] for v in range(10, 12)), 1)
-        return (player_total, dealer_card, low, mid, high, bet)
+        low, mid, high = buckets
+        return self.encoder.encode(player_total, dealer_card, to_tenths(low),
+                                   to_tenths(mid), to_tenths(high), bet, soft, pair)
 
-    def choose_action(self, state):
+    def get_state_from_deck(self, player_total, dealer_card, deck, bet, soft=False, pair=False):
         """
-        Selects an action based on the current state and epsilon-greedy policy.
+        Same as get_state, reading the shoe from a Deck or Shoe. Unlike the bucket
+        versions this works under every state abstraction.
+        """
+        return self.encoder.encode_deck(player_total, dealer_card, deck, bet, soft, pair)
+
+    def choose_action(self, state, legal=None):
         """
-        if state not in self.q_table:
-            player_total, dealer_card, _, _, _, _ = state
-            
+        Selects an action based on the current state and epsilon-greedy policy,
+        among the legal actions when they are given.
+        """
+        if not self.seen[state]:
+            player_total, dealer_card = self.encoder.decode(state)[:2]
+
             # bias based on player's total
             hit_bias = min(1.0, (21 - player_total)/21 * 2)  # favor hitting when far from 21
             stand_bias = 1 - (abs(player_total - 17)/17)      # favor standing near 17-21
-            
+
             # adjust based on dealer's visibile card
             dealer_modifier = 1.0
             if dealer_card in [7, 8, 9, 10, 11]:  # dealer strong cards
                 hit_bias *= 1.2
             elif dealer_card in [2, 3, 4, 5, 6]:  # dealer weak cards
                 stand_bias *= 1.2
-            
+
             # normalize and initialize
             total = hit_bias + stand_bias
-            self.q_table[state] = [hit_bias/total, stand_bias/total]
+            self.q_table[state, :2] = [hit_bias/total, stand_bias/total]
+            self.seen[state] = True
 
         # epsilon-greedy policy
-        if random.random() < self.epsilon:
-            return random.choice(self.actions)
-        return self.actions[np.argmax(self.q_table[state])]
+        if legal is None:
+            if self.rng.random() < self.epsilon:
+                return self.rng.choice(self.actions)
+            q = self.q_table[state]
+            return self.actions[0 if q[0] >= q[1] else 1]
+        if self.rng.random() < self.epsilon:
+            return self.rng.choice(legal)
+        q = self.q_table[state]
+        return max(legal, key=lambda action: q[self.action_index[action]])
+
+    def take_insurance(self, deck):
+        """
+        Takes insurance when more than a third of the unseen cards are tens, the
+        point where the 2:1 side bet has positive expectation.
+        """
+        return insurance_pays(deck)
 
     def choose_bet(self, deck_probs):
         """
         Determines a confident bet based on high/mid/low card probabilities.
         """
-        low = sum(deck_probs[v] for v in range(2, 7))
-        mid = sum(deck_probs[v] for v in range(7, 10))
-        high = sum(deck_probs[v] for v in range(10, 12))
-
-        if high > 0.37:
-            return 100
-        elif high > 0.3:
-            return 80
-        elif mid > 0.4:
-            return 60
-        elif low > 0.4:
-            return 40
-        else:
-            return random.choice([10, 20, 30, 50, 70]) 
+        buckets = (sum(deck_probs[v] for v in range(2, 7)),
+                   sum(deck_probs[v] for v in range(7, 10)),
+                   sum(deck_probs[v] for v in range(10, 12)))
+        return self.choose_bet_from_buckets(buckets)
+
+    def choose_bet_from_buckets(self, buckets):
+        """
+        Same as choose_bet, from the (low, mid, high) fractions kept by Deck.get_bucket_probabilities.
+        """
+        bet = threshold_bet(*buckets)
+        if bet:
+            return bet
+        return self.rng.choice(SMALL_BETS)
 
-    def update(self, state, action, reward, next_state=None):
-        """ 
+    def update(self, state, action, reward, next_state=None, next_legal=None):
+        """
         updates the q-table based on the current state, action, reward, and next state.
+        next_legal lists the actions legal in the next state when they aren't all
+        (a hit hand can no longer double or surrender), so the bootstrap only looks at those.
         """
-        if state not in self.q_table:
-            self.q_table[state] = [0.5, 0.5]
-        if next_state and next_state not in self.q_table:
-            self.q_table[next_state] = [0.5, 0.5]
+        if not self.seen[state]:
+            self.q_table[state] = 0.5
+            self.seen[state] = True
+        if next_state is not None and not self.seen[next_state]:
+            self.q_table[next_state] = 0.5
+            self.seen[next_state] = True
+        self.visits[state] += 1
 
         action_idx = self.actions.index(action)
-        max_q_next = max(self.q_table[next_state]) if next_state else 0
-        self.q_table[state][action_idx] += self.alpha * (reward + self.gamma * max_q_next - self.q_table[state][action_idx])
+        if next_state is None:
+            max_q_next = 0
+        elif next_legal is None:
+            max_q_next = self.q_table[next_state].max()
+        else:
+            max_q_next = max(self.q_table[next_state, self.action_index[a]] for a in next_legal)
+        self.q_table[state, action_idx] += self.alpha * (reward + self.gamma * max_q_next - self.q_table[state, action_idx])
+
+    def observe(self, state, action, reward, next_state=None, next_legal=None):
+        """
+        Learns from one step of a hand; next_state is None on the hand's last step
+        and next_legal, as for update, the actions legal there. In "q" mode this is
+        update; the other modes keep the steps until the last one and then learn
+        them all with learn_episode.
+        """
+        if self.update_mode == "q":
+            self.update(state, action, reward, next_state, next_legal)
+            return
+        columns = [self.action_index[a] for a in next_legal] if next_legal is not None else None
+        self._episode.append((state, self.action_index[action], columns))
+        if next_state is None:
+            self.learn_episode(self._episode, reward)
+            self._episode = []
+
+    def learn_episode(self, steps, reward):
+        """
+        Updates every (state, action index, next columns) step of a hand from its
+        final reward in one backward pass, where next columns are the action
+        indices legal at the following step (None for all of them). Targets are worked out from the q-values before any of
+        them change:
+        - nstep: the reward, or the best q-value n_step steps later, discounted
+        - lambda: the lambda-return, mixing one-step and longer returns by
+          trace_lambda, cut back to one step after an exploratory action (Watkins)
+        - mc: the discounted reward alone
+        Steps between decisions earn nothing, so the reward only comes at the end.
+        """
+        q_table = self.q_table
+        seen = self.seen
+        for state, _, _ in steps:
+            if not seen[state]:
+                q_table[state] = 0.5
+                seen[state] = True
+
+        gamma = self.gamma
+        last = len(steps) - 1
+        # the best q-value among each step's legal actions, as recorded by the step before
+        best = [0.0] * len(steps)
+        for t in range(1, len(steps)):
+            state, columns = steps[t][0], steps[t - 1][2]
+            best[t] = float(q_table[state].max() if columns is None else q_table[state, columns].max())
+        targets = [0.0] * len(steps)
+        target = reward
+        targets[last] = target
+        for t in range(last - 1, -1, -1):
+            if self.update_mode == "mc":
+                target = gamma * target
+            elif self.update_mode == "lambda":
+                next_state, next_action, _ = steps[t + 1]
+                if q_table[next_state, next_action] < best[t + 1]:
+                    target = gamma * best[t + 1]
+                else:
+                    target = gamma * ((1 - self.trace_lambda) * best[t + 1] + self.trace_lambda * target)
+            elif t + self.n_step > last:
+                target = gamma ** (last - t) * reward
+            else:
+                target = gamma ** self.n_step * best[t + self.n_step]
+            targets[t] = target
+
+        alpha = self.alpha
+        for (state, action_idx, _), target in zip(steps, targets):
+            self.visits[state] += 1
+            q_table[state, action_idx] += alpha * (target - q_table[state, action_idx])
+
+    def freeze(self):
+        """
+        Returns a GreedyPolicy over a read-only snapshot of the current q-table.
+        """
+        q_table = self.q_table.copy()
+        seen = self.seen.copy()
+        q_table.setflags(write=False)
+        seen.setflags(write=False)
+        return GreedyPolicy(q_table, seen, self.encoder, self.actions, self.bet_sizes)
+
+    def load_q_dict(self, q_table, visits=None):
+        """
+        loads a q-table stored as a dict keyed by state tuples
+        """
+        visits = visits or {}
+        for (player_total, dealer_card, low, mid, high, bet), q in q_table.items():
+            index = self.encoder.encode(player_total, dealer_card, round(low * 10), round(mid * 10), round(high * 10), bet)
+            self.q_table[index] = q
+            self.seen[index] = True
+            self.visits[index] += visits.get((player_total, dealer_card, low, mid, high, bet), 0)
+
+    def save_model(self, path=MODEL_PATH):
+        """
+        saves the model in the binary model format
+        """
+        header = {
+            "schema": {
+                "encoder": type(self.encoder).__name__,
+                "shape": list(self.encoder.shape),
+                "min_total": self.encoder.MIN_TOTAL,
+                "max_total": self.encoder.MAX_TOTAL,
+                "soft_hands": self.encoder.soft,
+                "pairs": self.encoder.pairs,
+                "abstraction": self.encoder.abstraction,
+                "actions": self.actions,
+            },
+            "hyperparameters": {
+                "alpha": self.alpha,
+                "gamma": self.gamma,
+                "epsilon_min": self.epsilon_min,
+                "epsilon_decay": self.epsilon_decay,
+                "update_mode": self.update_mode,
+                "n_step": self.n_step,
+                "trace_lambda": self.trace_lambda,
+            },
+            "epsilon": self.epsilon,
+            "rules": self.rules.to_dict(),
+            "states_seen": int(self.seen.sum()),
+            "total_visits": int(self.visits.sum(dtype=np.uint64)),
+        }
+        write_model(path, header, {
+            "q_table": self.q_table,
+            "visits": self.visits,
+            "seen": self.seen,
+        })
 
-    def save_model(self, path="blackjack_q_table.pkl"):
+    def load_model(self, path=MODEL_PATH, mmap_mode="c"):
         """
-        saves the model
+        loads a binary model, memory-mapped copy-on-write by default so loading
+        is instant and processes share one page-cached copy
         """
-        with open(path, "wb") as f:
-            pickle.dump({
-                "q_table": self.q_table,
-                "epsilon": self.epsilon
-            }, f)
+        header, sections = open_model(path, mmap_mode)
+        schema = header["schema"]
+        # the file decides the state abstraction and whether soft and hard totals have separate states
+        soft_hands = schema.get("soft_hands", False)
+        abstraction = schema.get("abstraction", "full")
+        if soft_hands != self.encoder.soft or abstraction != self.encoder.abstraction:
+            self.encoder = StateEncoder(soft_hands, self.encoder.pairs, abstraction)
+        if tuple(schema["shape"]) != self.encoder.shape or schema["actions"] != self.actions:
+            raise ValueError(f"{path} was saved with state schema {schema}, expected shape {self.encoder.shape} "
+                             f"and actions {self.actions}")
+        self.q_table = sections["q_table"]
+        self.visits = sections["visits"]
+        self.seen = sections["seen"]
+        self.epsilon = header["epsilon"]
 
-    def load_model(self, path="blackjack_q_table.pkl"):
+    def load_pickle(self, path="blackjack_q_table.pkl"):
         """
-        loads the model
+        loads a model saved with pickle by older versions, only use on trusted files
         """
         with open(path, "rb") as f:
             data = pickle.load(f)
-            self.q_table = data["q_table"]
+            self.q_table[:] = 0
+            self.seen[:] = False
+            self.visits[:] = 0
+            if "states" in data:
+                states = data["states"]
+                self.q_table[states] = data["q_values"]
+                self.seen[states] = True
+                self.visits[states] = data["visits"]
+            else:
+                # the first models pickled the q-table as a dict of lists
+                self.load_q_dict(data["q_table"], data.get("visits"))
             self.epsilon = data.get("epsilon", 0.1)
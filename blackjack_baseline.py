@@ -28,6 +28,51 @@ class BaselineModel:
         else:
             return "hit"
     
+    @staticmethod
+    def get_rules_action(player_total, dealer_card_value, legal, soft=False, pair_card=None):
+        """
+        Returns the basic strategy action among the legal ones, for rules with
+        doubling, splitting and surrender. pair_card is the card value of a splittable pair.
+        """
+        dealer = dealer_card_value
+
+        # surrender hard 16 against 9-ace and hard 15 against a ten
+        if 'surrender' in legal and not soft:
+            if (player_total == 16 and dealer >= 9) or (player_total == 15 and dealer == 10):
+                return "surrender"
+
+        # always split aces and eights, never tens, fives or fours
+        if 'split' in legal and pair_card is not None:
+            if pair_card in (8, 11):
+                return "split"
+            if pair_card == 9 and dealer not in (7, 10, 11):
+                return "split"
+            if pair_card in (2, 3, 7) and dealer <= 7:
+                return "split"
+            if pair_card == 6 and dealer <= 6:
+                return "split"
+
+        if 'double' in legal:
+            if not soft and (player_total == 11 or (player_total == 10 and dealer <= 9)
+                             or (player_total == 9 and 3 <= dealer <= 6)):
+                return "double"
+            if soft and 13 <= player_total <= 18 and 5 <= dealer <= 6:
+                return "double"
+
+        if soft:
+            # stand on soft 19 or more, and on soft 18 unless the dealer shows 9-ace
+            if player_total >= 19 or (player_total == 18 and dealer <= 8):
+                return "stand"
+            return "hit"
+        return BaselineModel.get_action(player_total, dealer)
+
+    @staticmethod
+    def take_insurance(deck):
+        """
+        Basic strategy never takes insurance
+        """
+        return False
+
     @staticmethod
     def get_bet():
         """
@@ -1,19 +1,29 @@
+import argparse
+import statistics
+import time
 import tkinter as tk
-from PIL import Image, ImageTk
-import os
-from cards import Card, Deck
+from cards import Deck
 from blackjack import BlackjackGame
-from blackjack_ai import BlackjackAI
+from blackjack_ai import BlackjackAI, GreedyPolicy
 from blackjack_baseline import BaselineModel
+from dealer_odds import DealerOdds
+from optimal_strategy import OptimalStrategy
+from card_images import CardImages, CARD_WIDTH, CARD_HEIGHT, BACK_FILENAME
+from gui_worker import BackgroundWorker
 
-CARD_WIDTH = 80
-CARD_HEIGHT = 120
+# auto-play works in slices of this many seconds between Tk events, and repaints the table at most this often
+AUTO_SLICE = 0.015
+AUTO_REPAINT = 1 / 30
 
 class BlackjackGUI:
     """
     GUI for the blackjack game with AI assistant.
     """
-    def __init__(self):
+    def __init__(self, timings=False):
+        self.start_time = time.perf_counter()
+        self.timings = timings
+        # seconds each hit spent redrawing the cards
+        self.redraw_times = []
         self.window = tk.Tk()
         self.window.title("Blackjack with AI Assistant")
         self.window.geometry("1200x800")
@@ -23,18 +33,21 @@ class BlackjackGUI:
         self.deck = Deck()
         self.game = BlackjackGame(self.deck)
         
-        # Load AI & Baseline models
-        self.ai = BlackjackAI()
+        # Load AI & Baseline models; the AI and optimal tables load in the background
         self.baseline = BaselineModel()
         self.current_model = "ai"
-        
-        try:
-            self.ai.load_model()
-        except:
-            print("No trained AI model found, using untrained version")
-
-        self.card_images = {}
-        self.load_images()
+        self.dealer_odds = DealerOdds(rules=self.game.rules)
+        self.policy = None
+        self.optimal = None
+        self.round_active = False
+        self.auto_target = 0
+        self.worker = BackgroundWorker(self.window)
+
+        # decoded on first use, so the window appears without loading any images
+        self.card_images = CardImages(CARD_WIDTH, CARD_HEIGHT)
+        # the labels on the table and the image each one shows
+        self.player_cards = []
+        self.dealer_cards = []
 
         button_style = {
             "font": ("Arial", 14, "bold"),
@@ -79,6 +92,9 @@ class BlackjackGUI:
         self.model_var = tk.StringVar(value="ai")
         tk.Radiobutton(self.model_frame, text="AI Model", variable=self.model_var, value="ai", command=self.switch_model, bg="#054b25", fg="white", selectcolor="#054b25", font=("Arial", 12)).pack(side="left")
         tk.Radiobutton(self.model_frame, text="Baseline", variable=self.model_var, value="baseline", command=self.switch_model, bg="#054b25", fg="white", selectcolor="#054b25", font=("Arial", 12)).pack(side="left", padx=20)
+        self.optimal_button = tk.Radiobutton(self.model_frame, text="Optimal", variable=self.model_var, value="optimal", command=self.switch_model, bg="#054b25", fg="white", selectcolor="#054b25", font=("Arial", 12))
+        self.optimal_button.pack(side="left")
+        self.optimal_button.config(state="disabled")
 
         self.bet_panel = tk.Frame(self.top_frame, **bet_panel_style)
         self.bet_panel.pack(side="right", padx=0, pady=10, fill="y")  
@@ -124,6 +140,14 @@ class BlackjackGUI:
         self.stand_button.grid(row=0, column=1, padx=20)
         self.stand_button.config(state="disabled")
 
+        # Auto-play: the selected model plays this many hands by itself
+        self.auto_var = tk.IntVar(value=1000)
+        self.auto_entry = tk.Spinbox(self.buttons_frame, from_=1, to=1000000, textvariable=self.auto_var, font=("Arial", 14), width=8, justify="center")
+        self.auto_entry.grid(row=0, column=2, padx=(40, 5))
+        self.auto_button = tk.Button(self.buttons_frame, text="Auto Play", command=self.toggle_auto_play, **button_style)
+        self.auto_button.grid(row=0, column=3, padx=5)
+        self.auto_button.config(state="disabled")
+
         # Result label
         self.result_label = tk.Label(self.game_frame, text="", font=("Arial", 20, "bold"), bg="#054b25", fg="white")
         self.result_label.pack(pady=10)
@@ -158,10 +182,37 @@ class BlackjackGUI:
         self.deck_frame.place(x=30, y=680)
 
         for i in range(5):
-            card_label = tk.Label(self.deck_frame, image=self.card_images.get("card_back.gif"), bg="#054b25", bd=2, relief="solid", highlightbackground="white", highlightthickness=1)
+            card_label = tk.Label(self.deck_frame, image=self.card_images[BACK_FILENAME], bg="#054b25", bd=2, relief="solid", highlightbackground="white", highlightthickness=1)
             card_label.place(x=i*2, y=-i*3)
 
         self.start_game()
+        self.worker.submit("models", self.load_models, self.models_loaded)
+
+    def load_models(self):
+        """
+        Loads the AI policy and optimal table; runs on the background worker.
+        """
+        try:
+            # suggestions only read this snapshot, so they never grow the q-table
+            policy = GreedyPolicy.load()
+        except (OSError, ValueError):
+            print("No trained AI model found, using untrained version")
+            policy = BlackjackAI().freeze()
+        try:
+            optimal = OptimalStrategy.load()
+        except (OSError, ValueError):
+            optimal = None
+            print("No optimal strategy table found, run optimal_strategy.py to build one")
+        return policy, optimal
+
+    def models_loaded(self, models):
+        """
+        Installs the loaded models and refreshes the suggestion.
+        """
+        self.policy, self.optimal = models
+        if self.optimal is not None:
+            self.optimal_button.config(state="normal")
+        self.auto_button.config(state="normal")
         self.update_suggestion()
 
   
@@ -172,27 +223,12 @@ class BlackjackGUI:
         self.current_model = self.model_var.get()
         if self.current_model == "ai":
             self.panel_title_label.config(text="AI Assistant")
+        elif self.current_model == "optimal":
+            self.panel_title_label.config(text="Optimal Strategy")
         else:
             self.panel_title_label.config(text="Baseline Model")
         self.update_suggestion()
 
-    def load_images(self):
-        """
-        Load card images
-        """
-        image_dir = os.path.join(os.path.dirname(__file__), 'images')
-        for suit in ['hearts', 'diamonds', 'clubs', 'spades']:
-            for rank in ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'jack', 'queen', 'king', 'ace']:
-                temp_card = Card(suit, rank)
-                filename = temp_card.filename()
-                path = os.path.join(image_dir, filename)
-                image = Image.open(path).resize((CARD_WIDTH, CARD_HEIGHT))
-                self.card_images[filename] = ImageTk.PhotoImage(image)
-
-        back_path = os.path.join(image_dir, "card_back.gif")
-        back_img = Image.open(back_path).resize((CARD_WIDTH, CARD_HEIGHT))
-        self.card_images["card_back.gif"] = ImageTk.PhotoImage(back_img)
-
     def start_game(self):
         """
         Start a new game
@@ -210,6 +246,8 @@ class BlackjackGUI:
             widget.destroy()
         for widget in self.dealer_frame.winfo_children():
             widget.destroy()
+        self.player_cards = []
+        self.dealer_cards = []
         self.result_label.config(text="")
 
     def place_bet(self):
@@ -218,6 +256,7 @@ class BlackjackGUI:
         """
         amount = self.bet_var.get()
         if self.game.place_bet(amount):
+            self.round_active = True
             self.bet_button.config(state="disabled")
             self.bet_entry.config(state="disabled")
             self.hit_button.config(state="normal")
@@ -226,80 +265,145 @@ class BlackjackGUI:
             self.game.deal_initial()
             self.update_table()
             self.update_chips()
-            self.update_suggestion()
         else:
             self.result_label.config(text="Invalid bet.")
 
     
-    def update_suggestion(self):
+    def suggest_bet(self, model, buckets):
         """
-        Update suggestion based on current deck probabilities
+        The bet the given model suggests for the deck composition.
         """
-        deck_probs = self.deck.get_remaining_probabilities()
-        high_cards = sum(deck_probs[v] for v in range(10, 12))
-        mid_cards = sum(deck_probs[v] for v in range(7, 10))
-        low_cards = sum(deck_probs[v] for v in range(2, 7))
-        
-        if self.current_model == "ai":
-            suggested_bet = self.ai.choose_bet(deck_probs)
-            suggested_bet = min(suggested_bet, self.game.chips)
-            self.bet_suggestion_label.config(text=f"Suggested Bet: {suggested_bet}")
-        else:
-            suggested_bet = self.baseline.get_bet()
-            suggested_bet = min(suggested_bet, self.game.chips)
-            self.bet_suggestion_label.config(text=f"Suggested Bet: {suggested_bet}")
-        
-        if not hasattr(self.game, 'player_hand') or len(self.game.player_hand) == 0:
-            self.suggestion_label.config(text="Place your bet")
-            self.reason_label.config(text=f"High cards: {high_cards*100:.1f}%\n"
-                                        f"Mid cards: {mid_cards*100:.1f}%\n"
-                                        f"Low cards: {low_cards*100:.1f}%")
-        else:
-            player_total = self.game.calculate_score(self.game.player_hand)
+        if model == "ai":
+            return self.policy.get_bet(buckets)
+        if model == "optimal":
+            return self.optimal.get_bet()
+        return self.baseline.get_bet()
+
+    def suggest_action(self, model, player_total, dealer_card, buckets, soft, state=None):
+        """
+        The action the given model suggests for a hand. The AI's state index is
+        read from the live deck on the main thread (ai_state), since its state
+        abstraction may need more of the shoe than the bucket fractions.
+        """
+        if model == "ai":
+            return self.policy.action(state)
+        if model == "optimal":
+            return self.optimal.get_action(player_total, dealer_card, buckets, soft)
+        return self.baseline.get_action(player_total, dealer_card)
+
+    def ai_state(self, model, hand, dealer_card, bet):
+        """
+        The AI policy's state index for a hand on the current deck, or None for the other models.
+        """
+        if model != "ai":
+            return None
+        return self.policy.get_state_from_deck(hand.score, dealer_card, self.deck, bet, hand.is_soft)
+
+    def update_suggestion(self, prompt="Place your bet"):
+        """
+        Update suggestion based on current deck probabilities.
+
+        Everything the suggestion needs is copied here and the work runs on the
+        background worker, so a slow model or dealer-odds calculation never
+        blocks the window; a newer request replaces an older one.
+        """
+        if self.auto_target:
+            return
+        if (self.current_model == "ai" and self.policy is None) or (self.current_model == "optimal" and self.optimal is None):
+            self.worker.cancel("suggestion")
+            self.bet_suggestion_label.config(text="Suggested Bet: -")
+            self.suggestion_label.config(text="Loading model...")
+            return
+        request = {
+            "model": self.current_model,
+            "buckets": self.deck.get_bucket_probabilities(),
+            "chips": self.game.chips,
+            "prompt": prompt,
+            "hand": None,
+        }
+        if self.round_active:
+            hand = self.game.player_hand
             dealer_card = self.game.dealer_hand[0].value
-            
-            if self.current_model == "ai":
-                state = self.ai.get_state(player_total, dealer_card, deck_probs, self.game.bet)
-                action = self.ai.choose_action(state)
-                self.suggestion_label.config(text=f"Action: {action.upper()}")
+            # the hole card is unseen, so the dealer can still draw it
+            counts = list(self.deck.value_counts)
+            counts[self.game.dealer_hand[1].value] += 1
+            state = self.ai_state(self.current_model, hand, dealer_card, self.game.bet)
+            request["hand"] = (hand.score, dealer_card, hand.is_soft, state, counts)
+        self.worker.submit("suggestion", self.compute_suggestion, self.show_suggestion, request)
+
+    def compute_suggestion(self, request):
+        """
+        Works out the suggested bet, action and dealer bust chance; runs on the background worker.
+        """
+        model = request["model"]
+        buckets = request["buckets"]
+        suggestion = {"bet": min(self.suggest_bet(model, buckets), request["chips"]), "buckets": buckets,
+                      "prompt": request["prompt"], "action": None}
+        if request["hand"] is not None:
+            player_total, dealer_card, soft, state, counts = request["hand"]
+            suggestion["action"] = self.suggest_action(model, player_total, dealer_card, buckets, soft, state)
+            suggestion["bust"] = self.dealer_odds.distribution(dealer_card, counts)["bust"]
+        return suggestion
+
+    def show_suggestion(self, suggestion):
+        """
+        Shows a finished suggestion in the assistant panel.
+        """
+        low_cards, mid_cards, high_cards = suggestion["buckets"]
+        self.bet_suggestion_label.config(text=f"Suggested Bet: {suggestion['bet']}")
+        composition = (f"High cards: {high_cards*100:.1f}%\n"
+                       f"Mid cards: {mid_cards*100:.1f}%\n"
+                       f"Low cards: {low_cards*100:.1f}%")
+        if suggestion["action"] is None:
+            self.suggestion_label.config(text=suggestion["prompt"])
+            self.reason_label.config(text=composition)
+        else:
+            self.suggestion_label.config(text=f"Action: {suggestion['action'].upper()}")
+            self.reason_label.config(text=f"{composition}\nDealer bust: {suggestion['bust']*100:.1f}%")
+
+    def show_cards(self, frame, shown, filenames):
+        """
+        Brings a row of card labels up to date, only adding labels for new cards
+        and changing images that differ, e.g. the dealer's hole card on reveal.
+        """
+        for i, filename in enumerate(filenames):
+            if i < len(shown):
+                label, current = shown[i]
+                if current != filename:
+                    label.config(image=self.card_images[filename])
+                    shown[i] = (label, filename)
             else:
-                action = self.baseline.get_action(player_total, dealer_card)
-                self.suggestion_label.config(text=f"Action: {action.upper()}")
-            
-            self.reason_label.config(text=f"High cards: {high_cards*100:.1f}%\n"
-                                        f"Mid cards: {mid_cards*100:.1f}%\n"
-                                        f"Low cards: {low_cards*100:.1f}%")
+                label = tk.Label(frame, image=self.card_images[filename], bg="green")
+                label.pack(side="left")
+                shown.append((label, filename))
+        while len(shown) > len(filenames):
+            shown.pop()[0].destroy()
 
     def update_table(self, reveal_dealer=False):
         """
         Update the table
         """
-
-        self.clear_table()
-        
-        for card in self.game.player_hand:
-            img = self.card_images[card.filename()]
-            label = tk.Label(self.player_frame, image=img, bg="green")
-            label.image = img
-            label.pack(side="left")
-
-        for idx, card in enumerate(self.game.dealer_hand):
-            if idx == 0 or reveal_dealer:
-                img = self.card_images[card.filename()]
-            else:
-                img = self.card_images.get("card_back.gif")
-            label = tk.Label(self.dealer_frame, image=img, bg="green")
-            label.image = img
-            label.pack(side="left")
+        start = time.perf_counter()
+        self.show_cards(self.player_frame, self.player_cards, [card.filename() for card in self.game.player_hand])
+        self.show_cards(self.dealer_frame, self.dealer_cards,
+                        [card.filename() if idx == 0 or reveal_dealer else BACK_FILENAME
+                         for idx, card in enumerate(self.game.dealer_hand)])
+        if self.timings:
+            # include Tk's layout and paint, not just the widget calls
+            self.window.update_idletasks()
+        redraw = time.perf_counter() - start
 
         self.update_suggestion()
+        return redraw
 
     def hit(self):
         """
         Deal a card to the player's hand
         """
         self.game.hit(self.game.player_hand)
-        self.update_table()
+        redraw = self.update_table()
+        if self.timings:
+            self.redraw_times.append(redraw)
         if self.game.calculate_score(self.game.player_hand) > 21:
             self.end_game()
 
@@ -307,14 +411,21 @@ class BlackjackGUI:
         """
         End the player's turn
         """
+        self.play_dealer()
+        self.end_game()
+
+    def play_dealer(self):
+        """
+        Draw the dealer's hand to 17
+        """
         while self.game.calculate_score(self.game.dealer_hand) < 17:
             self.game.hit(self.game.dealer_hand)
-        self.end_game()
 
     def end_game(self):
         """
         End the game
         """
+        self.round_active = False
         self.update_table(reveal_dealer=True)
         result = self.game.check_winner()
         self.result_label.config(text=result)
@@ -323,21 +434,97 @@ class BlackjackGUI:
         self.bet_button.config(state="normal")
         self.bet_entry.config(state="normal")
         self.update_chips()
-        
-        deck_probs = self.deck.get_remaining_probabilities()
-        high_cards = sum(deck_probs[v] for v in range(10, 12))
-        mid_cards = sum(deck_probs[v] for v in range(7, 10))
-        low_cards = sum(deck_probs[v] for v in range(2, 7))
-        
+        self.show_round_over()
+
+    def show_round_over(self):
+        """
+        Prompts for the next bet, or offers a restart when the chips are gone
+        """
         if self.game.chips <= 0:
+            self.worker.cancel("suggestion")
             self.suggestion_label.config(text="No more chips left!")
             self.reason_label.config(text="Game over - click Restart to play again")
             self.restart_button.pack()
         else:
-            self.suggestion_label.config(text="Place your next bet")
-            self.reason_label.config(text=f"High cards: {high_cards*100:.1f}%\n"
-                                        f"Mid cards: {mid_cards*100:.1f}%\n"
-                                        f"Low cards: {low_cards*100:.1f}%")
+            self.update_suggestion("Place your next bet")
+
+    def toggle_auto_play(self):
+        """
+        Start auto-play between hands, or stop it
+        """
+        if self.auto_target:
+            self.stop_auto_play()
+            return
+        if self.round_active or self.game.chips <= 0:
+            return
+        self.auto_target = max(1, self.auto_var.get())
+        self.auto_played = 0
+        self.auto_net = 0
+        self.auto_result = ""
+        self.auto_start = time.perf_counter()
+        self.auto_painted = 0.0
+        self.worker.cancel("suggestion")
+        self.bet_button.config(state="disabled")
+        self.bet_entry.config(state="disabled")
+        self.auto_button.config(text="Stop")
+        self.suggestion_label.config(text="Auto-playing...")
+        self.window.after(1, self.auto_step)
+
+    def auto_step(self):
+        """
+        Plays hands for one short slice, repaints if it's been long enough and
+        yields to Tk so the window stays responsive.
+        """
+        if not self.auto_target:
+            return
+        deadline = time.perf_counter() + AUTO_SLICE
+        while self.auto_played < self.auto_target and self.game.chips > 0 and time.perf_counter() < deadline:
+            self.auto_net += self.play_auto_hand()
+            self.auto_played += 1
+        done = self.auto_played >= self.auto_target or self.game.chips <= 0
+        now = time.perf_counter()
+        if done or now - self.auto_painted >= AUTO_REPAINT:
+            # only the latest hand is drawn; the ones in between are never shown
+            self.auto_painted = now
+            self.update_table(reveal_dealer=True)
+            self.update_chips()
+            self.result_label.config(text=f"{self.auto_result}\n{self.auto_played:,}/{self.auto_target:,} hands, net {self.auto_net:+,}")
+        if done:
+            self.stop_auto_play()
+        else:
+            self.window.after(1, self.auto_step)
+
+    def play_auto_hand(self):
+        """
+        Plays one hand by the selected model's suggestions and returns the net chips won
+        """
+        game = self.game
+        model = self.current_model
+        chips = game.chips
+        game.place_bet(max(1, min(self.suggest_bet(model, self.deck.get_bucket_probabilities()), chips)))
+        game.deal_initial()
+        hand = game.player_hand
+        dealer_card = game.dealer_hand[0].value
+        while hand.score < 21 and self.suggest_action(model, hand.score, dealer_card, self.deck.get_bucket_probabilities(),
+                                                      hand.is_soft, self.ai_state(model, hand, dealer_card, game.bet)) == 'hit':
+            game.hit(hand)
+        if hand.score <= 21:
+            self.play_dealer()
+        self.auto_result = game.check_winner()
+        return game.chips - chips
+
+    def stop_auto_play(self):
+        """
+        Stop auto-play and report how it went
+        """
+        elapsed = time.perf_counter() - self.auto_start
+        self.auto_target = 0
+        self.auto_button.config(text="Auto Play")
+        self.bet_button.config(state="normal")
+        self.bet_entry.config(state="normal")
+        rate = self.auto_played / elapsed if elapsed else 0.0
+        self.result_label.config(text=f"Auto: {self.auto_played:,} hands, net {self.auto_net:+,}\n{rate:,.0f} hands/sec")
+        self.show_round_over()
 
     def update_chips(self):
         """
@@ -349,7 +536,11 @@ class BlackjackGUI:
         """
         Restart the game
         """
-        self.game = BlackjackGame(Deck(), chips=500)
+        if self.auto_target:
+            self.stop_auto_play()
+        self.deck = Deck()
+        self.game = BlackjackGame(self.deck, chips=500)
+        self.round_active = False
         self.bet_button.config(state="normal")
         self.bet_entry.config(state="normal")
         self.restart_button.pack_forget()
@@ -359,12 +550,39 @@ class BlackjackGUI:
         self.reason_label.config(text="")
         self.update_suggestion()
 
+    def report_startup(self):
+        """
+        Prints the time from launch to the first idle main loop, i.e. a drawn window.
+        """
+        print(f"Startup: {(time.perf_counter() - self.start_time) * 1000:.1f} ms to an idle window")
+
+    def report_timings(self):
+        """
+        Prints the redraw time per hit.
+        """
+        if self.redraw_times:
+            times = [t * 1000 for t in self.redraw_times]
+            print(f"Hit redraw: {len(times)} hits, mean {statistics.mean(times):.2f} ms, max {max(times):.2f} ms")
+
     def run(self):
         """
         Run the game
         """
+        if self.timings:
+            self.window.after_idle(self.report_startup)
         self.window.mainloop()
+        if self.timings:
+            self.report_timings()
+
+def main():
+    """
+    launch the GUI
+    """
+    parser = argparse.ArgumentParser(description="Blackjack with an AI assistant.")
+    parser.add_argument("--timings", action="store_true", help="print startup time and per-hit redraw times")
+    args = parser.parse_args()
+    app = BlackjackGUI(timings=args.timings)
+    app.run()
 
 if __name__ == "__main__":
-    app = BlackjackGUI()
-    app.run()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,160 @@
+import argparse
+import os
+import time
+from PIL import Image
+
+from cards import CARD_FILENAMES
+
+CARD_WIDTH = 80
+CARD_HEIGHT = 120
+IMAGE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'images')
+BACK_FILENAME = "card_back.gif"
+# sprite order: the 52 cards by code, then the back
+SPRITE_NAMES = CARD_FILENAMES + [BACK_FILENAME]
+SPRITE_INDEX = {name: i for i, name in enumerate(SPRITE_NAMES)}
+
+def sprite_sheet_path(width, height, image_dir=IMAGE_DIR):
+    """
+    Path of the sprite sheet cache for one card size.
+    """
+    return os.path.join(image_dir, f"card_sprites_{width}x{height}.png")
+
+def load_card_image(filename, width, height, image_dir=IMAGE_DIR):
+    """
+    Opens one card GIF and resizes it.
+    """
+    with Image.open(os.path.join(image_dir, filename)) as image:
+        return image.convert("RGBA").resize((width, height))
+
+def build_sprite_sheet(width, height, image_dir=IMAGE_DIR):
+    """
+    Resizes every card image once and saves them side by side in one PNG, so
+    later launches decode a single file instead of 53 GIFs.
+    """
+    sheet = Image.new("RGBA", (width * len(SPRITE_NAMES), height))
+    for i, filename in enumerate(SPRITE_NAMES):
+        sheet.paste(load_card_image(filename, width, height, image_dir), (i * width, 0))
+    path = sprite_sheet_path(width, height, image_dir)
+    # light compression: the cache is for speed, not size
+    sheet.save(path, compress_level=1)
+    return path
+
+class CardImages:
+    """
+    Card images at one size, decoded on first use.
+
+    Images come from the sprite sheet when one has been built for this size and
+    is newer than the GIFs, otherwise each GIF is opened and resized the first
+    time its card is shown. Tk photos are made lazily too, so nothing is decoded
+    before the window appears.
+    """
+    def __init__(self, width, height, image_dir=IMAGE_DIR):
+        self.width = width
+        self.height = height
+        self.image_dir = image_dir
+        self.images = {}
+        self.photos = {}
+        self.sheet = None
+        self.sheet_checked = False
+
+    def _sheet(self):
+        """
+        The sprite sheet, opened on first use, or None when there is no fresh one.
+        """
+        if not self.sheet_checked:
+            self.sheet_checked = True
+            path = sprite_sheet_path(self.width, self.height, self.image_dir)
+            try:
+                built = os.path.getmtime(path)
+                newest = max(os.path.getmtime(os.path.join(self.image_dir, name)) for name in SPRITE_NAMES)
+                if built >= newest:
+                    with Image.open(path) as sheet:
+                        self.sheet = sheet.convert("RGBA")
+            except OSError:
+                self.sheet = None
+        return self.sheet
+
+    def image(self, filename):
+        """
+        The resized PIL image for a card filename.
+        """
+        image = self.images.get(filename)
+        if image is None:
+            sheet = self._sheet()
+            if sheet is not None:
+                left = SPRITE_INDEX[filename] * self.width
+                image = sheet.crop((left, 0, left + self.width, self.height))
+            else:
+                image = load_card_image(filename, self.width, self.height, self.image_dir)
+            self.images[filename] = image
+        return image
+
+    def __getitem__(self, filename):
+        """
+        The Tk photo for a card filename; needs a Tk root.
+        """
+        photo = self.photos.get(filename)
+        if photo is None:
+            from PIL import ImageTk
+            photo = ImageTk.PhotoImage(self.image(filename))
+            self.photos[filename] = photo
+        return photo
+
+    def get(self, filename, default=None):
+        """
+        Dict-style lookup, so callers can keep using card_images.get().
+        """
+        if filename not in SPRITE_INDEX:
+            return default
+        return self[filename]
+
+def time_loading(width, height, image_dir=IMAGE_DIR):
+    """
+    Seconds to decode the images for a fresh window: every GIF up front (the old
+    startup), only the first card lazily, and all of them from the sprite sheet.
+    """
+    start = time.perf_counter()
+    for filename in SPRITE_NAMES:
+        load_card_image(filename, width, height, image_dir)
+    eager = time.perf_counter() - start
+
+    start = time.perf_counter()
+    images = CardImages(width, height, image_dir)
+    images.sheet_checked = True
+    images.image(BACK_FILENAME)
+    lazy = time.perf_counter() - start
+
+    start = time.perf_counter()
+    images = CardImages(width, height, image_dir)
+    for filename in SPRITE_NAMES:
+        images.image(filename)
+    sheet = time.perf_counter() - start if images.sheet is not None else None
+    return eager, lazy, sheet
+
+def main():
+    """
+    build the sprite sheet cache and report image loading times
+    """
+    parser = argparse.ArgumentParser(description="Build the card sprite sheet cache used by the GUI.")
+    parser.add_argument("--width", type=int, default=CARD_WIDTH, help="card width in pixels")
+    parser.add_argument("--height", type=int, default=CARD_HEIGHT, help="card height in pixels")
+    parser.add_argument("--no-build", action="store_true", help="only time loading, don't (re)build the cache")
+    args = parser.parse_args()
+
+    if not args.no_build:
+        start = time.perf_counter()
+        path = build_sprite_sheet(args.width, args.height)
+        print(f"Wrote {path} in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    eager, lazy, sheet = time_loading(args.width, args.height)
+    print(f"\n=== Card Image Loading ({args.width}x{args.height}) ===")
+    print("-"*44)
+    print(f"| {'Strategy':<25} | {'Time (ms)':>12} |")
+    print("-"*44)
+    print(f"| {'all GIFs up front':<25} | {eager * 1000:12.2f} |")
+    print(f"| {'lazy, first card only':<25} | {lazy * 1000:12.2f} |")
+    print(f"| {'all from sprite sheet':<25} | {sheet * 1000 if sheet is not None else float('nan'):12.2f} |")
+    print("-"*44)
+
+if __name__ == "__main__":
+    main()
@@ -1,56 +1,106 @@
 import random
+import numpy as np
+from rng import numpy_rng, get_rng_state, set_rng_state
 
 SUITS = ['hearts', 'diamonds', 'clubs', 'spades']
 RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'jack', 'queen', 'king', 'ace']
 
+# low (2-6), mid (7-9) and high (10-ace) bucket of each card value
+BUCKETS = [None, None, 0, 0, 0, 0, 0, 1, 1, 1, 2, 2]
+# Hi-Lo tag of each card value
+HI_LO = [0, 0, 1, 1, 1, 1, 1, 0, 0, 0, -1, -1]
+
+# image number of each suit and rank in the card_<suit><rank>.gif files
+SUIT_IMAGES = {'clubs': '1', 'spades': '2', 'diamonds': '3', 'hearts': '4'}
+RANK_IMAGES = {
+    'ace': '1', '2': '2', '3': '3', '4': '4', '5': '5',
+    '6': '6', '7': '7', '8': '8', '9': '9', '10': '10',
+    'jack': '11', 'queen': '12', 'king': '13'
+}
+
+def _rank_value(rank):
+    """
+    Returns the blackjack value of a rank.
+    """
+    if rank in ['jack', 'queen', 'king']:
+        return 10
+    elif rank == 'ace':
+        return 11
+    return int(rank)
+
+# per-code lookup tables; a card's code is its index in a fresh, unshuffled deck
+CARD_SUITS = [suit for suit in SUITS for rank in RANKS]
+CARD_RANKS = [rank for suit in SUITS for rank in RANKS]
+CARD_VALUES = [_rank_value(rank) for rank in CARD_RANKS]
+CARD_FILENAMES = [f"card_{SUIT_IMAGES[suit]}{RANK_IMAGES[rank]}.gif" for suit, rank in zip(CARD_SUITS, CARD_RANKS)]
+
 class Card:
     """
     Represents a playing card.
+
+    There is exactly one immutable Card per suit and rank: Card(suit, rank)
+    returns the shared instance, so dealing never allocates.
     """
-    def __init__(self, suit, rank):
-        """
-        Initializes a card with a suit and rank.
-        """
-        self.suit = suit
-        self.rank = rank
-        self.value = self._get_value()
+    __slots__ = ('suit', 'rank', 'value', 'code')
+    _interned = {}
 
-    def _get_value(self):
+    def __new__(cls, suit, rank):
         """
-        Returns the value of the card based on its rank.
+        Returns the card with a suit and rank.
         """
-        if self.rank in ['jack', 'queen', 'king']:
-            return 10
-        elif self.rank == 'ace':
-            return 11
-        return int(self.rank)
+        card = cls._interned.get((suit, rank))
+        if card is None:
+            code = SUITS.index(suit) * len(RANKS) + RANKS.index(rank)
+            card = object.__new__(cls)
+            object.__setattr__(card, 'suit', suit)
+            object.__setattr__(card, 'rank', rank)
+            object.__setattr__(card, 'value', CARD_VALUES[code])
+            object.__setattr__(card, 'code', code)
+            cls._interned[(suit, rank)] = card
+        return card
+
+    def __setattr__(self, name, value):
+        raise AttributeError("cards are immutable")
+
+    def __reduce__(self):
+        return Card, (self.suit, self.rank)
 
     def filename(self):
         """
         Returns the filename of the card image.
         """
-        suit_map = {'clubs': '1', 'spades': '2', 'diamonds': '3', 'hearts': '4'}
-        rank_map = {
-            'ace': '1', '2': '2', '3': '3', '4': '4', '5': '5', 
-            '6': '6', '7': '7', '8': '8', '9': '9', '10': '10',
-            'jack': '11', 'queen': '12', 'king': '13'
-        }
-        suit_num = suit_map[self.suit]
-        rank_num = rank_map[self.rank]
-        return f"card_{suit_num}{rank_num}.gif"
+        return CARD_FILENAMES[self.code]
+
+# one card of each kind, indexed by card code
+DECK_CARDS = [Card(suit, rank) for suit in SUITS for rank in RANKS]
 
 class Deck:
     """
     Represents a deck of cards.
     """
-    def __init__(self):
+    def __init__(self, rng=None):
         """
-        Initializes the deck.
+        Initializes the deck. rng is a random.Random stream, the random module by default.
         """
-        self.full_deck = [Card(suit, rank) for suit in SUITS for rank in RANKS]
+        self.rng = rng if rng is not None else random
+        self.full_deck = DECK_CARDS.copy()
+        self.full_counts = [0] * 12
+        for card in self.full_deck:
+            self.full_counts[card.value] += 1
         self.cards = self.full_deck.copy()
         self.used_cards = []
-        random.shuffle(self.cards)
+        self._reset_counts()
+        self.rng.shuffle(self.cards)
+
+    def _reset_counts(self):
+        """
+        Resets the running counts to a full deck.
+        """
+        self.value_counts = self.full_counts.copy()
+        self.bucket_counts = [0, 0, 0]
+        for value in range(2, 12):
+            self.bucket_counts[BUCKETS[value]] += self.value_counts[value]
+        self.running_count = 0
 
     def deal(self):
         """
@@ -59,9 +109,13 @@ class Deck:
         if len(self.cards) < 15:
             self.cards += self.used_cards
             self.used_cards = []
-            random.shuffle(self.cards)
+            self._reset_counts()
+            self.rng.shuffle(self.cards)
         card = self.cards.pop()
         self.used_cards.append(card)
+        self.value_counts[card.value] -= 1
+        self.bucket_counts[BUCKETS[card.value]] -= 1
+        self.running_count += HI_LO[card.value]
         return card
 
     def shuffle(self):
@@ -70,14 +124,225 @@ class Deck:
         """
         self.cards = self.full_deck.copy()
         self.used_cards = []
-        random.shuffle(self.cards)
+        self._reset_counts()
+        self.rng.shuffle(self.cards)
+
+    def start_hand(self):
+        """
+        Called before each hand; a single deck reshuffles inside deal instead.
+        """
+
+    def get_state(self):
+        """
+        Returns the card order, counts and rng state as JSON-friendly data.
+        """
+        return {
+            "cards": [card.code for card in self.cards],
+            "used_cards": [card.code for card in self.used_cards],
+            "value_counts": list(self.value_counts),
+            "bucket_counts": list(self.bucket_counts),
+            "running_count": self.running_count,
+            "rng": get_rng_state(self.rng),
+        }
+
+    def set_state(self, state):
+        """
+        Restores a state returned by get_state.
+        """
+        self.cards = [DECK_CARDS[code] for code in state["cards"]]
+        self.used_cards = [DECK_CARDS[code] for code in state["used_cards"]]
+        self.value_counts = list(state["value_counts"])
+        self.bucket_counts = list(state["bucket_counts"])
+        self.running_count = state["running_count"]
+        set_rng_state(self.rng, state["rng"])
+
+    def snapshot(self):
+        """
+        Returns an in-memory copy of the state, cheaper than get_state, for replaying a hand.
+        """
+        return (self.cards.copy(), self.used_cards.copy(), self.value_counts.copy(),
+                self.bucket_counts.copy(), self.running_count, self.rng.getstate())
+
+    def restore(self, snapshot):
+        """
+        Restores a state returned by snapshot.
+        """
+        cards, used_cards, value_counts, bucket_counts, self.running_count, rng_state = snapshot
+        self.cards = cards.copy()
+        self.used_cards = used_cards.copy()
+        self.value_counts = value_counts.copy()
+        self.bucket_counts = bucket_counts.copy()
+        self.rng.setstate(rng_state)
+
+    def remaining(self):
+        """
+        Returns the number of cards left in the deck.
+        """
+        return len(self.cards)
 
     def get_remaining_probabilities(self):
         """
         Returns the probabilities of each card value remaining in the deck.
         """
         total = len(self.cards)
-        value_counts = {v: 0 for v in range(2, 12)}
-        for card in self.cards:
-            value_counts[card.value] += 1
-        return {k: v / total for k, v in value_counts.items()}
+        return {v: self.value_counts[v] / total for v in range(2, 12)}
+
+    def get_bucket_probabilities(self):
+        """
+        Returns the (low, mid, high) fractions of the remaining cards.
+        """
+        total = len(self.cards)
+        low, mid, high = self.bucket_counts
+        return low / total, mid / total, high / total
+
+    def true_count(self):
+        """
+        Returns the Hi-Lo running count divided by the decks remaining.
+        """
+        return self.running_count / (len(self.cards) / 52)
+
+class Shoe:
+    """
+    Represents a multi-deck shoe stored as one byte per card.
+
+    Cards are stored by card code and dealt as the shared Card objects. A cut card is placed at the given penetration and the shoe
+    is reshuffled before the next hand once it has been reached.
+    """
+    def __init__(self, decks=6, penetration=0.75, burn=1, rng=None):
+        """
+        Initializes and shuffles the shoe. rng is a random.Random stream, the random module by default.
+        """
+        if decks < 1:
+            raise ValueError("a shoe needs at least one deck")
+        if not 0 < penetration <= 1:
+            raise ValueError("penetration must be in (0, 1]")
+        self.decks = decks
+        self.size = 52 * decks
+        self.penetration = penetration
+        self.cut_position = int(self.size * penetration)
+        self.burn = burn
+        self.full_counts = [0] * 12
+        for card in DECK_CARDS:
+            self.full_counts[card.value] += decks
+        self.cards = bytearray(range(52)) * decks
+        # numpy view over the same buffer so shuffling happens in place
+        self._codes = np.frombuffer(self.cards, dtype=np.uint8)
+        self.rng = rng if rng is not None else random
+        self._rng = numpy_rng(self.rng)
+        self.shuffle()
+
+    def _reset_counts(self):
+        """
+        Resets the running counts to a full shoe.
+        """
+        self.value_counts = self.full_counts.copy()
+        self.bucket_counts = [0, 0, 0]
+        for value in range(2, 12):
+            self.bucket_counts[BUCKETS[value]] += self.value_counts[value]
+        self.running_count = 0
+
+    def shuffle(self):
+        """
+        Shuffles every card back into the shoe and burns the top cards.
+        """
+        self._rng.shuffle(self._codes)
+        self._reset_counts()
+        # burned cards are never seen, so they stay in the counts
+        self.pos = min(self.burn, self.size - 1)
+        self.unseen = self.size
+
+    def start_hand(self):
+        """
+        Reshuffles before a hand once the cut card has come out.
+        """
+        if self.pos >= self.cut_position:
+            self.shuffle()
+
+    def get_state(self):
+        """
+        Returns the card order, position, counts and rng states as JSON-friendly data.
+        """
+        return {
+            "cards": list(self.cards),
+            "pos": self.pos,
+            "unseen": self.unseen,
+            "value_counts": list(self.value_counts),
+            "bucket_counts": list(self.bucket_counts),
+            "running_count": self.running_count,
+            "rng": get_rng_state(self.rng),
+            "shuffle_rng": self._rng.bit_generator.state,
+        }
+
+    def set_state(self, state):
+        """
+        Restores a state returned by get_state.
+        """
+        self.cards[:] = bytes(state["cards"])
+        self.pos = state["pos"]
+        self.unseen = state["unseen"]
+        self.value_counts = list(state["value_counts"])
+        self.bucket_counts = list(state["bucket_counts"])
+        self.running_count = state["running_count"]
+        set_rng_state(self.rng, state["rng"])
+        self._rng.bit_generator.state = state["shuffle_rng"]
+
+    def snapshot(self):
+        """
+        Returns an in-memory copy of the state, cheaper than get_state, for replaying a hand.
+        """
+        return (bytes(self.cards), self.pos, self.unseen, self.value_counts.copy(), self.bucket_counts.copy(),
+                self.running_count, self.rng.getstate(), self._rng.bit_generator.state)
+
+    def restore(self, snapshot):
+        """
+        Restores a state returned by snapshot.
+        """
+        cards, self.pos, self.unseen, value_counts, bucket_counts, self.running_count, rng_state, shuffle_state = snapshot
+        # copy into the existing buffer so the numpy view stays valid
+        self.cards[:] = cards
+        self.value_counts = value_counts.copy()
+        self.bucket_counts = bucket_counts.copy()
+        self.rng.setstate(rng_state)
+        self._rng.bit_generator.state = shuffle_state
+
+    def deal(self):
+        """
+        Deals a card from the shoe.
+        """
+        if self.pos >= self.size:
+            self.shuffle()
+        card = DECK_CARDS[self.cards[self.pos]]
+        self.pos += 1
+        self.unseen -= 1
+        value = card.value
+        self.value_counts[value] -= 1
+        self.bucket_counts[BUCKETS[value]] -= 1
+        self.running_count += HI_LO[value]
+        return card
+
+    def remaining(self):
+        """
+        Returns the number of cards not yet seen, including burned cards.
+        """
+        return self.unseen
+
+    def get_remaining_probabilities(self):
+        """
+        Returns the probabilities of each card value among the unseen cards.
+        """
+        total = self.unseen
+        return {v: self.value_counts[v] / total for v in range(2, 12)}
+
+    def get_bucket_probabilities(self):
+        """
+        Returns the (low, mid, high) fractions of the unseen cards.
+        """
+        total = self.unseen
+        low, mid, high = self.bucket_counts
+        return low / total, mid / total, high / total
+
+    def true_count(self):
+        """
+        Returns the Hi-Lo running count divided by the decks remaining.
+        """
+        return self.running_count / (self.unseen / 52)
@@ -0,0 +1,196 @@
+import json
+import os
+import queue
+import threading
+import numpy as np
+
+from blackjack_ai import BlackjackAI
+from model_format import write_model, open_model
+from rng import get_rng_state, set_rng_state
+
+MANIFEST = "manifest.json"
+
+class Checkpointer:
+    """
+    Periodic, resumable training checkpoints.
+
+    The first checkpoint is a full snapshot of the q-table; later ones are deltas
+    holding only the rows that changed since the previous checkpoint, so their cost
+    follows the number of changed states. After compact_every deltas a new full
+    snapshot replaces the chain. Files are written by a background thread and the
+    manifest naming the current chain is swapped in atomically after each write.
+    A ConvergenceMonitor passed as monitor has its check history saved and restored too.
+    """
+    def __init__(self, directory, ai: BlackjackAI, deck, config=None, compact_every=20, monitor=None):
+        self.directory = directory
+        self.ai = ai
+        self.deck = deck
+        self.monitor = monitor
+        self.config = config or {}
+        self.compact_every = compact_every
+        os.makedirs(directory, exist_ok=True)
+
+        # files in the published chain, updated by the writer thread
+        self.base = None
+        self.deltas = []
+        # chain bookkeeping as seen by the training thread
+        self.sequence = 0
+        self._has_base = False
+        self._deltas_since_base = 0
+        self._snapshot()
+
+        self._queue = queue.Queue(maxsize=2)
+        self._error = None
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def _snapshot(self):
+        """
+        Remembers the visit counts and seen mask so the next delta can be found by comparison.
+        """
+        self._last_seen = self.ai.seen.copy()
+        self._last_visits = self.ai.visits.copy()
+
+    def _training_state(self, hands):
+        """
+        Returns everything besides the q-table needed to continue exactly.
+        """
+        state = {
+            "hands": hands,
+            "epsilon": self.ai.epsilon,
+            # annealing (ConvergenceMonitor mode="anneal") changes these mid-run
+            "alpha": self.ai.alpha,
+            "epsilon_decay": self.ai.epsilon_decay,
+            "ai_rng": get_rng_state(self.ai.rng),
+            "deck": self.deck.get_state(),
+            "config": self.config,
+        }
+        if self.monitor:
+            state["monitor"] = self.monitor.get_state()
+        return state
+
+    def save(self, hands):
+        """
+        Queues a checkpoint after the given number of training hands. Only the
+        changed rows are copied here; encoding and disk writes happen in the background.
+        """
+        if self._error:
+            raise self._error
+        ai = self.ai
+        self.sequence += 1
+        state = self._training_state(hands)
+
+        if not self._has_base or self._deltas_since_base >= self.compact_every:
+            self._has_base = True
+            self._deltas_since_base = 0
+            name = f"base_{self.sequence:06d}.bjq"
+            sections = {"q_table": ai.q_table.copy(), "visits": ai.visits.copy(), "seen": ai.seen.copy()}
+            self._snapshot()
+            self._queue.put(("base", name, state, sections))
+            return
+
+        # every q-value change either counts a visit (update) or marks a state seen
+        # (first-visit initialisation), so those two arrays locate the changed rows
+        changed = np.flatnonzero((ai.visits != self._last_visits) | (ai.seen != self._last_seen))
+        sections = {
+            "states": changed,
+            "q_table": ai.q_table[changed],
+            "visits": ai.visits[changed],
+            "seen": ai.seen[changed],
+        }
+        self._last_seen[changed] = sections["seen"]
+        self._last_visits[changed] = sections["visits"]
+        self._deltas_since_base += 1
+        name = f"delta_{self.sequence:06d}.bjq"
+        self._queue.put(("delta", name, state, sections))
+
+    def _write_loop(self):
+        """
+        Background writer: writes each queued file, then publishes the new manifest.
+        """
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                return
+            try:
+                kind, name, state, sections = item
+                write_model(os.path.join(self.directory, name), {"kind": f"checkpoint_{kind}", "state": state}, sections)
+                stale = []
+                if kind == "base":
+                    stale = ([self.base] if self.base else []) + self.deltas
+                    self.base = name
+                    self.deltas = []
+                else:
+                    self.deltas.append(name)
+                self._write_manifest(state)
+                for old in stale:
+                    os.remove(os.path.join(self.directory, old))
+            except Exception as error:
+                self._error = error
+            finally:
+                self._queue.task_done()
+
+    def _write_manifest(self, state):
+        """
+        Atomically replaces the manifest naming the current base and deltas.
+        """
+        path = os.path.join(self.directory, MANIFEST)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"base": self.base, "deltas": self.deltas, "sequence": self.sequence, "state": state}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def close(self):
+        """
+        Waits for queued checkpoints to be written and stops the writer.
+        """
+        self._queue.put(None)
+        self._writer.join()
+        if self._error:
+            raise self._error
+
+    def restore(self):
+        """
+        Loads the latest checkpoint into the AI and deck and returns the number of
+        hands already trained, or 0 when there is no checkpoint yet.
+        """
+        path = os.path.join(self.directory, MANIFEST)
+        if not os.path.exists(path):
+            return 0
+        with open(path) as f:
+            manifest = json.load(f)
+        state = manifest["state"]
+        if state["config"] != self.config:
+            raise ValueError(f"checkpoint in {self.directory} was made with {state['config']}, not {self.config}")
+
+        ai = self.ai
+        _, sections = open_model(os.path.join(self.directory, manifest["base"]), None)
+        ai.q_table[:] = sections["q_table"]
+        ai.visits[:] = sections["visits"]
+        ai.seen[:] = sections["seen"]
+        for name in manifest["deltas"]:
+            _, sections = open_model(os.path.join(self.directory, name), None)
+            states = sections["states"]
+            ai.q_table[states] = sections["q_table"]
+            ai.visits[states] = sections["visits"]
+            ai.seen[states] = sections["seen"]
+
+        ai.epsilon = state["epsilon"]
+        ai.alpha = state.get("alpha", ai.alpha)
+        ai.epsilon_decay = state.get("epsilon_decay", ai.epsilon_decay)
+        set_rng_state(ai.rng, state["ai_rng"])
+        self.deck.set_state(state["deck"])
+        if self.monitor:
+            # re-snapshot even without saved history, so the first window starts at the checkpoint
+            self.monitor.set_state(state.get("monitor", {"history": [], "recent": []}))
+
+        self.base = manifest["base"]
+        self.deltas = list(manifest["deltas"])
+        self.sequence = manifest["sequence"]
+        self._has_base = True
+        self._deltas_since_base = len(self.deltas)
+        self._snapshot()
+        return state["hands"]
@@ -0,0 +1,240 @@
+import time
+from collections import deque
+import numpy as np
+
+from blackjack_ai import BlackjackAI, UPDATE_MODES, STATE_ABSTRACTIONS
+from rng import spawn_rngs
+
+class ConvergenceMonitor:
+    """
+    Online convergence check for a training BlackjackAI.
+
+    At each check it compares the greedy policy and q-values with the previous
+    check. policy_change is the visit-weighted share of decisions made in the
+    window whose greedy action has since flipped, and q_delta is the
+    visit-weighted mean absolute q-value change. Training counts as stable once
+    `patience` consecutive windows stay under the tolerances.
+
+    In "stop" mode a stable run stops. In "anneal" mode alpha is halved and
+    epsilon decays faster (epsilon_decay squared) each time it is stable, and the
+    run stops once alpha falls below min_alpha.
+    """
+    def __init__(self, ai: BlackjackAI, policy_tolerance=0.01, q_tolerance=None, patience=3,
+                 min_hands=0, mode="stop", min_alpha=0.005):
+        if mode not in ("stop", "anneal"):
+            raise ValueError("mode must be 'stop' or 'anneal'")
+        self.ai = ai
+        self.policy_tolerance = policy_tolerance
+        self.q_tolerance = q_tolerance
+        self.patience = patience
+        self.min_hands = min_hands
+        self.mode = mode
+        self.min_alpha = min_alpha
+        self.history = []
+        self.stopped_at = None
+        self._recent = deque(maxlen=patience)
+        self._snapshot()
+
+    def _snapshot(self):
+        """
+        Remembers the q-values, greedy actions and visit counts for the next comparison.
+        """
+        self._last_q = np.array(self.ai.q_table, copy=True)
+        self._last_greedy = self._last_q.argmax(axis=1)
+        self._last_visits = np.array(self.ai.visits, copy=True)
+
+    def get_state(self):
+        """
+        Returns the check history and recent stability flags as JSON-friendly values,
+        for a checkpoint.
+        """
+        return {"history": self.history, "recent": list(self._recent)}
+
+    def set_state(self, state):
+        """
+        Restores a state returned by get_state and takes the current q-table as the
+        start of the next window.
+        """
+        self.history = list(state["history"])
+        self._recent = deque(state["recent"], maxlen=self.patience)
+        self._snapshot()
+
+    def check(self, hands):
+        """
+        Records one window ending after `hands` training hands and returns True
+        when training should stop.
+        """
+        ai = self.ai
+        window_visits = (ai.visits - self._last_visits).astype(np.float64)
+        played = np.flatnonzero(window_visits)
+        weights = window_visits[played]
+        q = ai.q_table[played]
+        greedy = q.argmax(axis=1)
+
+        total = weights.sum()
+        if total:
+            policy_change = float(weights[greedy != self._last_greedy[played]].sum() / total)
+            q_delta = float((np.abs(q - self._last_q[played]).max(axis=1) * weights).sum() / total)
+        else:
+            policy_change = q_delta = 0.0
+        self.history.append({"hands": hands, "policy_change": policy_change, "q_delta": q_delta,
+                             "states_played": int(played.size), "alpha": ai.alpha, "epsilon": ai.epsilon})
+        self._snapshot()
+
+        stable = policy_change <= self.policy_tolerance and (self.q_tolerance is None or q_delta <= self.q_tolerance)
+        self._recent.append(stable)
+        if hands < self.min_hands or len(self._recent) < self.patience or not all(self._recent):
+            return False
+
+        if self.mode == "anneal" and ai.alpha / 2 >= self.min_alpha:
+            ai.alpha /= 2
+            ai.epsilon_decay = ai.epsilon_decay ** 2
+            self._recent.clear()
+            return False
+        self.stopped_at = hands
+        return True
+
+    def report(self, budget):
+        """
+        Prints the last windows and the hands saved relative to the fixed budget.
+        """
+        print("\n=== Convergence ===")
+        print("-"*76)
+        print(f"| {'Hands':>10} | {'Policy change':>13} | {'Mean |dQ|':>10} | {'States':>8} | {'Alpha':>8} | {'Epsilon':>7} |")
+        print("-"*76)
+        for row in self.history[-10:]:
+            print(f"| {row['hands']:10,} | {row['policy_change']*100:12.2f}% | {row['q_delta']:10.4f} | {row['states_played']:8,} | {row['alpha']:8.4f} | {row['epsilon']:7.4f} |")
+        print("-"*76)
+        if self.stopped_at is None:
+            print(f"Did not converge within the {budget:,}-hand budget")
+        else:
+            saved = budget - self.stopped_at
+            print(f"Converged after {self.stopped_at:,} hands, saving {saved:,} hands ({saved / budget * 100:.1f}% of the {budget:,}-hand budget)")
+
+def compare_update_modes(modes=UPDATE_MODES, hands=300000, eval_every=25000, eval_hands=20000, target=None,
+                         seed=0, soft_hands=False, rules=None, n_step=3, trace_lambda=0.8, state_abstraction="full"):
+    """
+    Trains one AI per update mode on the same dealing stream and, every
+    eval_every hands, plays all their greedy policies on common random numbers
+    over the same evaluation shoe, so the curves differ by learning rather than
+    by luck. Prints the profit per hand and how many hands each mode needed to
+    first reach target, by default 98% of the one-step "q" mode's last three
+    points. Returns {mode: [(hands, ev), ...]}.
+    """
+    import train_blackjack_ai
+    from evaluate import play_chunk
+
+    ais = []
+    decks = []
+    for mode in modes:
+        deck_rng, ai_rng = spawn_rngs(seed, 2)
+        decks.append(train_blackjack_ai.make_deck(rng=deck_rng))
+        ais.append(BlackjackAI(rng=ai_rng, soft_hands=soft_hands, rules=rules, update_mode=mode,
+                               n_step=n_step, trace_lambda=trace_lambda, state_abstraction=state_abstraction))
+    curves = {mode: [] for mode in modes}
+    training = dict.fromkeys(modes, 0.0)
+    for done in range(eval_every, hands + 1, eval_every):
+        players = []
+        for mode, ai, deck in zip(modes, ais, decks):
+            start = time.perf_counter()
+            for _ in range(eval_every):
+                train_blackjack_ai.simulate_hand(ai, train=True, deck=deck)
+                ai.decay_epsilon()
+            training[mode] += time.perf_counter() - start
+            policy = ai.freeze()
+            players.append(lambda deck, rng, policy=policy, rules=ai.rules:
+                           train_blackjack_ai.simulate_policy_hand(policy, deck, rules, rng))
+        stats, _ = play_chunk(players, eval_hands, seed + 1)
+        for mode, result in zip(modes, stats):
+            curves[mode].append((done, result.mean))
+
+    if target is None:
+        reference = curves.get("q", next(iter(curves.values())))[-3:]
+        reference = sum(ev for _, ev in reference) / len(reference)
+        target = reference - 0.02 * abs(reference)
+    reached = {mode: next((done for done, ev in curve if ev >= target), None) for mode, curve in curves.items()}
+
+    width = 14 + 13 * len(modes)
+    print(f"\n=== Greedy Profit/Hand by Update Mode ({eval_hands:,} paired evaluation hands per point) ===")
+    print("-"*width)
+    print(f"| {'Hands':>10} |" + "".join(f" {mode:>10} |" for mode in modes))
+    print("-"*width)
+    for i, (done, _) in enumerate(curves[modes[0]]):
+        print(f"| {done:10,} |" + "".join(f" {curves[mode][i][1]:10.2f} |" for mode in modes))
+    print("-"*width)
+    print(f"| {'Hands/sec':>10} |" + "".join(f" {hands / training[mode]:10,.0f} |" for mode in modes))
+    print(f"| {'To target':>10} |" + "".join(f" {reached[mode]:10,} |" if reached[mode] else f" {'-':>10} |" for mode in modes))
+    print("-"*width)
+    print(f"Target: {target:.2f} profit/hand")
+    base = reached.get("q")
+    for mode in modes:
+        if mode != "q" and base and reached[mode]:
+            print(f"{mode}: reached the target in {reached[mode] / base * 100:.0f}% of one-step Q-learning's hands")
+    return curves
+
+def compare_state_abstractions(abstractions=tuple(STATE_ABSTRACTIONS), hands=300000, eval_hands=100000, seed=0,
+                               soft_hands=False, rules=None, update_mode="q", well_visited=100):
+    """
+    Trains one AI per state abstraction on the same dealing stream and reports
+    what each table costs and how well the hands fill it: states and bytes,
+    share of states visited, how many of the decisions fell in states visited
+    at least well_visited times, and training hands per second. All the greedy
+    policies are then played on common random numbers, each paired with the
+    first abstraction, and the smallest table whose profit/hand is not
+    significantly below the first's is recommended. Returns {abstraction: row}.
+    """
+    import train_blackjack_ai
+    from evaluate import play_chunk
+
+    rows = {}
+    players = []
+    for abstraction in abstractions:
+        deck_rng, ai_rng = spawn_rngs(seed, 2)
+        deck = train_blackjack_ai.make_deck(rng=deck_rng)
+        ai = BlackjackAI(rng=ai_rng, soft_hands=soft_hands, rules=rules, update_mode=update_mode,
+                         state_abstraction=abstraction)
+        start = time.perf_counter()
+        for _ in range(hands):
+            train_blackjack_ai.simulate_hand(ai, train=True, deck=deck)
+            ai.decay_epsilon()
+        elapsed = time.perf_counter() - start
+
+        visits = ai.visits.astype(np.int64)
+        visited = int((visits > 0).sum())
+        rows[abstraction] = {
+            "states": ai.encoder.size,
+            "bytes": ai.q_table.nbytes + ai.visits.nbytes + ai.seen.nbytes,
+            "visited": visited,
+            "coverage": visited / ai.encoder.size,
+            "well_visited_share": visits[visits >= well_visited].sum() / max(visits.sum(), 1),
+            "hands_per_sec": hands / elapsed,
+        }
+        policy = ai.freeze()
+        players.append(lambda deck, rng, policy=policy, rules=ai.rules:
+                       train_blackjack_ai.simulate_policy_hand(policy, deck, rules, rng))
+
+    stats, differences = play_chunk(players, eval_hands, seed + 1)
+    for i, (abstraction, result) in enumerate(zip(abstractions, stats)):
+        rows[abstraction]["ev"] = result.mean
+        rows[abstraction]["ev_difference"] = differences[i - 1].confidence_interval() if i else (0.0, 0.0)
+    # the smallest table whose paired difference from the first one isn't significantly negative
+    keeps_ev = [abstraction for abstraction in abstractions if rows[abstraction]["ev_difference"][1] >= 0]
+    pick = min(keeps_ev, key=lambda abstraction: rows[abstraction]["states"])
+
+    print(f"\n=== State Abstractions ({hands:,} training hands, {eval_hands:,} paired evaluation hands) ===")
+    print("-"*119)
+    print(f"| {'Abstraction':<11} | {'States':>9} | {'Memory':>9} | {'Visited':>8} | {'Coverage':>8} | "
+          f"{'Decisions in':>12} | {'Hands/sec':>9} | {'Avg/Hand':>8} | {f'vs {abstractions[0]} (95% CI)':>21} |")
+    print(f"| {'':<11} | {'':>9} | {'':>9} | {'':>8} | {'':>8} | {f'>={well_visited} visits':>12} | "
+          f"{'':>9} | {'':>8} | {'':>21} |")
+    print("-"*119)
+    for abstraction, row in rows.items():
+        low, high = row["ev_difference"]
+        difference = f"{low:10.2f}..{high:9.2f}" if abstraction != abstractions[0] else f"{'reference':>21}"
+        print(f"| {abstraction:<11} | {row['states']:9,} | {row['bytes'] / 2**20:6.2f} MB | {row['visited']:8,} | "
+              f"{row['coverage'] * 100:7.2f}% | {row['well_visited_share'] * 100:11.1f}% | {row['hands_per_sec']:9,.0f} | "
+              f"{row['ev']:8.2f} | {difference} |")
+    print("-"*119)
+    print(f"Smallest table keeping the {abstractions[0]} profit/hand: {pick} ({rows[pick]['states']:,} states, "
+          f"{rows[abstractions[0]]['states'] / rows[pick]['states']:,.0f}x smaller)")
+    return rows
@@ -0,0 +1,104 @@
+from functools import lru_cache
+
+from blackjack import SIMPLE_RULES
+
+# final dealer outcomes, in the order distributions are returned
+OUTCOMES = (17, 18, 19, 20, 21, "bust")
+_BUST = (0.0, 0.0, 0.0, 0.0, 0.0, 1.0)
+_STOOD = {total: tuple(1.0 if i == total - 17 else 0.0 for i in range(6)) for total in range(17, 22)}
+# composition the dealer draws from once the shoe runs dry, like Deck's reshuffle
+_FRESH_DECK = (4, 4, 4, 4, 4, 4, 4, 4, 16, 4)
+
+class DealerOdds:
+    """
+    Exact distribution of the dealer's final total (17-21 or bust) given the upcard
+    and the composition of the cards the dealer can still draw.
+
+    The dealer follows the table rules: hitting soft 17 under hit_soft_17, and,
+    when naturals are paid (blackjack_payout is set), peeking under an ace or ten
+    before the player acts. A player still deciding then knows the hole card
+    doesn't complete a blackjack, so distribution leaves those hole cards out.
+    The payout multiple itself changes the player's winnings, not the dealer's odds.
+
+    Sub-results are memoized on (total, soft aces, composition) with an LRU bound,
+    so queries from the same shoe share most of their work.
+    """
+    def __init__(self, cache_size=500000, rules=None):
+        rules = rules if rules is not None else SIMPLE_RULES
+        self.hit_soft_17 = rules.hit_soft_17
+        self.peeks = rules.blackjack_payout is not None
+        self._final = lru_cache(maxsize=cache_size)(self._final_uncached)
+
+    def distribution(self, upcard, counts):
+        """
+        Returns {17: p, 18: p, 19: p, 20: p, 21: p, 'bust': p} for the dealer's
+        final total under the rules. counts is indexed by card value like Deck.value_counts.
+        """
+        soft = 1 if upcard == 11 else 0
+        counts = tuple(counts[2:12])
+        natural = {11: 10, 10: 11}.get(upcard) if self.peeks else None
+        if natural is None or sum(counts) == counts[natural - 2]:
+            return dict(zip(OUTCOMES, self._final(upcard, soft, counts)))
+        # the dealer has peeked and has no blackjack, so the hole card isn't the natural's other half
+        return dict(zip(OUTCOMES, self._draw(upcard, soft, counts, exclude=natural)))
+
+    def from_deck(self, deck, upcard, hole_card=None):
+        """
+        Returns the distribution for the deck's unseen cards, putting the dealer's
+        face-down hole card back since the player has not seen it.
+        """
+        counts = list(deck.value_counts)
+        if hole_card is not None:
+            counts[hole_card.value] += 1
+        return self.distribution(upcard, counts)
+
+    def cache_info(self):
+        """
+        Returns the memo's hit/miss statistics.
+        """
+        return self._final.cache_info()
+
+    def clear(self):
+        """
+        Empties the memo.
+        """
+        self._final.cache_clear()
+
+    def _final_uncached(self, total, soft, counts):
+        """
+        Outcome probabilities from a dealer total, its count of soft aces and the
+        remaining counts of values 2-11.
+        """
+        if total > 21:
+            return _BUST
+        if total >= 17 and not (total == 17 and soft and self.hit_soft_17):
+            return _STOOD[total]
+        return self._draw(total, soft, counts)
+
+    def _draw(self, total, soft, counts, exclude=None):
+        """
+        Outcome probabilities when the dealer draws one more card, leaving out
+        cards of value exclude.
+        """
+        remaining = sum(counts)
+        if remaining == 0:
+            counts = _FRESH_DECK
+            remaining = sum(counts)
+        if exclude is not None:
+            remaining -= counts[exclude - 2]
+
+        result = [0.0] * 6
+        for i, count in enumerate(counts):
+            if count == 0 or i + 2 == exclude:
+                continue
+            value = i + 2
+            new_total = total + value
+            new_soft = soft + (value == 11)
+            while new_total > 21 and new_soft:
+                new_total -= 10
+                new_soft -= 1
+            sub = self._final(new_total, new_soft, counts[:i] + (count - 1,) + counts[i + 1:])
+            p = count / remaining
+            for k in range(6):
+                result[k] += p * sub[k]
+        return tuple(result)
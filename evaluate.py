@@ -0,0 +1,220 @@
+import argparse
+import json
+import math
+import multiprocessing as mp
+import os
+import time
+import numpy as np
+
+import train_blackjack_ai
+from blackjack import TableRules, RULE_PRESETS
+from blackjack_ai import GreedyPolicy, MODEL_PATH
+from blackjack_baseline import BaselineModel
+from optimal_strategy import OptimalStrategy, STRATEGY_PATH
+from result_stats import ResultStats
+from rng import spawn_rngs
+
+def load_player(spec, rules):
+    """
+    Returns (label, play) for a strategy spec: "baseline", "optimal" or "optimal:PATH",
+    or the path of a saved model. play(deck, rng) plays one hand and returns the reward.
+    """
+    if spec == "baseline":
+        baseline = BaselineModel()
+        return "Baseline", lambda deck, rng: train_blackjack_ai.simulate_baseline_hand(baseline, rules=rules, deck=deck)
+    if spec == "optimal" or spec.startswith("optimal:"):
+        strategy = OptimalStrategy.load(spec.partition(":")[2] or STRATEGY_PATH)
+        return "Optimal", lambda deck, rng: train_blackjack_ai.simulate_strategy_hand(strategy, deck, rules)
+    policy = GreedyPolicy.load(spec)
+    if policy.actions != rules.actions:
+        raise ValueError(f"{spec} plays {policy.actions} but the rules allow {rules.actions}")
+    label = os.path.splitext(os.path.basename(spec))[0]
+    return label, lambda deck, rng: train_blackjack_ai.simulate_policy_hand(policy, deck, rules, rng)
+
+def play_chunk(players, hands, seed, decks=None, penetration=0.75):
+    """
+    Plays hands with every player on common random numbers: each hand starts from
+    the same shoe state and the same bet stream for all of them, and both then
+    carry on from where the first (reference) player left them. Returns a
+    ResultStats per player and one per later player for its reward minus the
+    reference's on the same hand.
+    """
+    deck_rng, bet_rng = spawn_rngs(seed, 2)
+    deck = train_blackjack_ai.make_deck(decks, penetration, deck_rng)
+    rewards = np.empty((len(players), hands), dtype=np.int64)
+    for hand in range(hands):
+        state = deck.snapshot()
+        bet_state = bet_rng.getstate()
+        for i in range(len(players) - 1, -1, -1):
+            if i != len(players) - 1:
+                deck.restore(state)
+                bet_rng.setstate(bet_state)
+            rewards[i, hand] = players[i](deck, bet_rng)
+
+    stats = []
+    for row in rewards:
+        stats.append(ResultStats())
+        stats[-1].add_many(row)
+    differences = []
+    for row in rewards[1:]:
+        differences.append(ResultStats())
+        differences[-1].add_many(row - rewards[0])
+    return stats, differences
+
+_players = None
+
+def _init_worker(specs, rules):
+    """
+    Loads the strategies once per worker process.
+    """
+    global _players
+    _players = [load_player(spec, rules)[1] for spec in specs]
+
+def _play_task(task):
+    """
+    Worker entry point for one chunk.
+    """
+    hands, seed, decks, penetration = task
+    return play_chunk(_players, hands, seed, decks, penetration)
+
+def evaluate(specs, rules=None, workers=None, max_hands=2000000, min_hands=100000, chunk=10000,
+             precision=1.0, seed=None, decks=None, penetration=0.75, verbose=True):
+    """
+    Plays the strategies against each other until every difference from the first
+    one has a 95% confidence interval at most precision chips per hand wide on
+    each side (after at least min_hands), or max_hands is reached. Chunks are
+    spread over worker processes but folded in in order, so a seed always gives
+    the same result whatever the number of workers. Returns the report dict.
+    """
+    rules = rules if rules is not None else TableRules()
+    workers = workers or os.cpu_count()
+    labels = [load_player(spec, rules)[0] for spec in specs]
+    # distinct labels for repeated or same-named strategies
+    labels = [f"{label}#{i + 1}" if labels.count(label) > 1 else label for i, label in enumerate(labels)]
+
+    root = np.random.SeedSequence(seed)
+    n_chunks = math.ceil(max_hands / chunk)
+    tasks = [(min(chunk, max_hands - i * chunk), int(child.generate_state(1, np.uint64)[0]), decks, penetration)
+             for i, child in enumerate(root.spawn(n_chunks))]
+
+    stats = [ResultStats() for _ in specs]
+    differences = [ResultStats() for _ in specs[1:]]
+    stop_reason = "max_hands"
+    start = time.perf_counter()
+    pool = None
+    if workers > 1:
+        pool = mp.Pool(workers, initializer=_init_worker, initargs=(specs, rules))
+        results = pool.imap(_play_task, tasks)
+    else:
+        _init_worker(specs, rules)
+        results = map(_play_task, tasks)
+    try:
+        for chunk_stats, chunk_differences in results:
+            for total, part in zip(stats + differences, chunk_stats + chunk_differences):
+                total.merge(part)
+            hands = stats[0].count
+            widths = [d.confidence_interval()[1] - d.mean for d in differences]
+            done = hands >= min_hands and all(width <= precision for width in widths)
+            if verbose and (done or hands % (10 * chunk) == 0):
+                print(f"{hands:>10,} hands, widest CI half-width {max(widths, default=0.0):.3f}")
+            if done:
+                stop_reason = "precision"
+                break
+    finally:
+        if pool:
+            pool.terminate()
+    elapsed = time.perf_counter() - start
+
+    hands = stats[0].count
+    report = {
+        "meta": {
+            "strategies": list(specs),
+            "rules": rules.to_dict(),
+            "decks": decks,
+            "penetration": penetration,
+            "seed_entropy": str(root.entropy),
+            "workers": workers,
+            "precision": precision,
+            "hands": hands,
+            "stop_reason": stop_reason,
+            "seconds": elapsed,
+            "hands_per_sec": hands / elapsed,
+            "strategy_hands_per_sec": hands * len(specs) / elapsed,
+        },
+        "strategies": {},
+        "differences": {},
+    }
+    for label, spec, s in zip(labels, specs, stats):
+        low, high = s.confidence_interval()
+        report["strategies"][label] = {
+            "spec": spec, "total": s.total, "mean": s.mean, "std": s.std, "ci95": [low, high],
+            "win_rate": s.rate(s.wins), "draw_rate": s.rate(s.draws), "loss_rate": s.rate(s.losses),
+            "max_drawdown": s.max_drawdown,
+        }
+    for label, s, d in zip(labels[1:], stats[1:], differences):
+        low, high = d.confidence_interval()
+        # the std of the difference without pairing shows how much the common random numbers saved
+        unpaired = math.sqrt(stats[0].variance + s.variance)
+        report["differences"][f"{label} - {labels[0]}"] = {
+            "mean": d.mean, "std": d.std, "ci95": [low, high], "unpaired_std": unpaired,
+            "variance_reduction": 1 - d.variance / unpaired ** 2 if unpaired else 0.0,
+        }
+    return report
+
+def print_report(report):
+    """
+    Prints the per-strategy results and paired differences.
+    """
+    meta = report["meta"]
+    print(f"\n=== Evaluation ({meta['hands']:,} hands per strategy, common random numbers) ===")
+    print("-"*83)
+    print(f"| {'Strategy':<20} | {'Avg/Hand':>9} | {'95% CI':>17} | {'Win Rate':>8} | {'Max Drawdown':>12} |")
+    print("-"*83)
+    for label, s in report["strategies"].items():
+        low, high = s["ci95"]
+        print(f"| {label:<20} | {s['mean']:9.2f} | {low:8.2f}..{high:7.2f} | {s['win_rate']:7.2f}% | {s['max_drawdown']:12,} |")
+    print("-"*83)
+    if report["differences"]:
+        print("-"*83)
+        print(f"| {'Difference':<36} | {'Avg/Hand':>9} | {'95% CI':>17} | {'Var. saved':>10} |")
+        print("-"*83)
+        for label, d in report["differences"].items():
+            low, high = d["ci95"]
+            print(f"| {label:<36} | {d['mean']:9.2f} | {low:8.2f}..{high:7.2f} | {d['variance_reduction'] * 100:9.1f}% |")
+        print("-"*83)
+    stop = "precision reached" if meta["stop_reason"] == "precision" else "hand limit reached"
+    print(f"{meta['hands_per_sec']:,.0f} hands/sec ({meta['strategy_hands_per_sec']:,.0f} strategy-hands/sec) "
+          f"on {meta['workers']} workers, {meta['seconds']:.1f} s, {stop}")
+
+def main():
+    """
+    evaluate saved models and built-in strategies head to head
+    """
+    parser = argparse.ArgumentParser(description="Compare saved models and built-in strategies on identical shoes.")
+    parser.add_argument("strategies", nargs="*", default=["baseline", MODEL_PATH],
+                        help="baseline, optimal, optimal:PATH or a model path; differences are taken from the first")
+    parser.add_argument("--rules", choices=list(RULE_PRESETS), default="simple", help="table rule set")
+    parser.add_argument("--decks", type=int, default=None, help="play from a multi-deck shoe with this many decks")
+    parser.add_argument("--penetration", type=float, default=0.75, help="fraction of the shoe dealt before the cut card")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--max-hands", type=int, default=2000000, help="most hands per strategy")
+    parser.add_argument("--min-hands", type=int, default=100000, help="fewest hands before stopping early")
+    parser.add_argument("--chunk", type=int, default=10000, help="hands per work unit")
+    parser.add_argument("--precision", type=float, default=1.0, help="stop once every difference's 95%% CI half-width is at most this (chips/hand)")
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible runs")
+    parser.add_argument("--output", default=None, help="write the report as JSON to this file")
+    args = parser.parse_args()
+
+    try:
+        report = evaluate(args.strategies, TableRules.preset(args.rules), args.workers, args.max_hands, args.min_hands,
+                          args.chunk, args.precision, args.seed, args.decks, args.penetration)
+    except (OSError, ValueError) as error:
+        parser.error(str(error))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import queue
+import threading
+
+class BackgroundWorker:
+    """
+    Runs jobs on one background thread and hands their results back to the Tk main loop.
+
+    Every job has a key, e.g. "suggestion". Submitting a job replaces any job with
+    the same key that hasn't started yet. A job that was superseded or cancelled
+    while running has its result dropped, so a slow answer for an old hand never
+    overwrites the current one. Tk must only be touched from the main thread, so
+    finished jobs go through a queue that the main loop drains every poll_ms
+    milliseconds with window.after, calling each job's callback there.
+    """
+    def __init__(self, window, poll_ms=15):
+        self.window = window
+        self.poll_ms = poll_ms
+        # latest generation per key; only written on the main thread
+        self.generations = {}
+        self._pending = {}
+        self._wake = threading.Condition()
+        self._results = queue.Queue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        window.after(poll_ms, self._poll)
+
+    def submit(self, key, job, callback, *args):
+        """
+        Queues job(*args) and calls callback(result) on the main thread when it
+        finishes, unless another job with the same key is submitted first.
+        """
+        generation = self.generations.get(key, 0) + 1
+        self.generations[key] = generation
+        with self._wake:
+            self._pending[key] = (generation, job, args, callback)
+            self._wake.notify()
+        return generation
+
+    def cancel(self, key):
+        """
+        Drops the waiting job for a key and the result of one already running.
+        """
+        self.generations[key] = self.generations.get(key, 0) + 1
+        with self._wake:
+            self._pending.pop(key, None)
+
+    def is_current(self, key, generation):
+        """
+        Whether a job is still the latest for its key.
+        """
+        return self.generations.get(key) == generation
+
+    def _run(self):
+        """
+        Background thread: runs pending jobs, oldest key first.
+        """
+        while True:
+            with self._wake:
+                while not self._pending:
+                    self._wake.wait()
+                key = next(iter(self._pending))
+                generation, job, args, callback = self._pending.pop(key)
+            try:
+                result, error = job(*args), None
+            except Exception as exc:
+                result, error = None, exc
+            self._results.put((key, generation, callback, result, error))
+
+    def _poll(self):
+        """
+        Main thread: delivers finished, still-current results and reschedules itself.
+        """
+        try:
+            while True:
+                try:
+                    key, generation, callback, result, error = self._results.get_nowait()
+                except queue.Empty:
+                    break
+                if not self.is_current(key, generation):
+                    continue
+                if error is not None:
+                    print(f"Background {key} failed: {error}")
+                    continue
+                callback(result)
+        finally:
+            self.window.after(self.poll_ms, self._poll)
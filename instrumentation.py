@@ -0,0 +1,100 @@
+import functools
+import time
+from collections import defaultdict
+
+from cards import Deck, Shoe
+from blackjack import BlackjackGame
+from blackjack_ai import BlackjackAI
+
+# (owner, attribute) pairs timed by default, covering dealing, probability reads,
+# scoring, state construction, q-table lookups, learning and epsilon decay
+DEFAULT_TARGETS = [
+    (Deck, "deal"),
+    (Deck, "get_remaining_probabilities"),
+    (Deck, "get_bucket_probabilities"),
+    (Shoe, "deal"),
+    (Shoe, "get_remaining_probabilities"),
+    (Shoe, "get_bucket_probabilities"),
+    (BlackjackGame, "calculate_score"),
+    (BlackjackAI, "get_state"),
+    (BlackjackAI, "get_state_from_buckets"),
+    (BlackjackAI, "get_state_from_deck"),
+    (BlackjackAI, "choose_action"),
+    (BlackjackAI, "choose_bet_from_buckets"),
+    (BlackjackAI, "observe"),
+    (BlackjackAI, "update"),
+    (BlackjackAI, "learn_episode"),
+    (BlackjackAI, "decay_epsilon"),
+]
+
+class StageProfiler:
+    """
+    Opt-in per-stage call counter and wall-time accumulator.
+
+    enable() patches each target with a timing wrapper and disable() puts the
+    original back, so there is no overhead while the profiler is off.
+    """
+    def __init__(self):
+        self.calls = defaultdict(int)
+        self.seconds = defaultdict(float)
+        self._originals = []
+
+    def wrap(self, owner, attr, stage=None):
+        """
+        Times every call to owner.attr (a class method or module function) under stage.
+        """
+        stage = stage or f"{getattr(owner, '__name__', owner)}.{attr}"
+        original = owner.__dict__[attr]
+        calls = self.calls
+        seconds = self.seconds
+        clock = time.perf_counter
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                seconds[stage] += clock() - start
+                calls[stage] += 1
+
+        setattr(owner, attr, timed)
+        self._originals.append((owner, attr, original))
+
+    def enable(self, targets=DEFAULT_TARGETS):
+        """
+        Starts timing the given targets.
+        """
+        for owner, attr in targets:
+            self.wrap(owner, attr)
+        return self
+
+    def disable(self):
+        """
+        Restores every wrapped function.
+        """
+        while self._originals:
+            owner, attr, original = self._originals.pop()
+            setattr(owner, attr, original)
+
+    def __enter__(self):
+        return self.enable()
+
+    def __exit__(self, *exc):
+        self.disable()
+
+    def report(self, wall_seconds=None):
+        """
+        Prints the per-stage breakdown, slowest first. Times are inclusive,
+        so an outer stage like simulate_hand contains the stages it calls.
+        """
+        print("\n=== Per-Stage Profile ===")
+        print("-"*92)
+        print(f"| {'Stage':<42} | {'Calls':>12} | {'Total s':>9} | {'us/call':>8} | {'% wall':>6} |")
+        print("-"*92)
+        for stage in sorted(self.seconds, key=self.seconds.get, reverse=True):
+            calls = self.calls[stage]
+            total = self.seconds[stage]
+            share = f"{total / wall_seconds * 100:6.1f}" if wall_seconds else f"{'-':>6}"
+            print(f"| {stage:<42} | {calls:12,} | {total:9.3f} | {total / calls * 1e6:8.2f} | {share} |")
+        print("-"*92)
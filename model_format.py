@@ -0,0 +1,106 @@
+import argparse
+import json
+import os
+import struct
+import numpy as np
+
+MAGIC = b"BJQMODEL"
+VERSION = 1
+ALIGNMENT = 64
+# magic, format version, header length
+PREAMBLE = struct.Struct("<8sII")
+
+def write_model(path, header, sections):
+    """
+    Writes a model file: a fixed preamble, a JSON header, then each array in
+    sections as a contiguous little-endian block aligned to 64 bytes.
+    The file is written to a temporary path and renamed into place.
+    """
+    header = dict(header)
+    layout = []
+    blocks = []
+    for name, array in sections.items():
+        array = np.ascontiguousarray(array)
+        array = array.astype(array.dtype.newbyteorder("<"), copy=False)
+        layout.append({"name": name, "dtype": array.dtype.str, "shape": list(array.shape)})
+        blocks.append(array)
+
+    # offsets depend on the header length, which depends on the offsets
+    offset_guess = 0
+    while True:
+        header["sections"] = layout
+        offset = offset_guess
+        for entry, array in zip(layout, blocks):
+            entry["offset"] = offset
+            offset = _align(offset + array.nbytes)
+        encoded = json.dumps(header, sort_keys=True).encode("utf-8")
+        data_start = _align(PREAMBLE.size + len(encoded))
+        if data_start == offset_guess:
+            break
+        offset_guess = data_start
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, VERSION, len(encoded)))
+        f.write(encoded)
+        for entry, array in zip(layout, blocks):
+            f.write(b"\0" * (entry["offset"] - f.tell()))
+            f.write(array.tobytes())
+    os.replace(tmp_path, path)
+
+def read_header(path):
+    """
+    Returns the JSON header of a model file.
+    """
+    with open(path, "rb") as f:
+        preamble = f.read(PREAMBLE.size)
+        if len(preamble) < PREAMBLE.size:
+            raise ValueError(f"{path} is not a blackjack model file")
+        magic, version, header_len = PREAMBLE.unpack(preamble)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a blackjack model file")
+        if version > VERSION:
+            raise ValueError(f"{path} uses model format version {version}, newest supported is {VERSION}")
+        return json.loads(f.read(header_len).decode("utf-8"))
+
+def open_model(path, mmap_mode="c"):
+    """
+    Returns (header, sections) for a model file with every section memory-mapped.
+    The default copy-on-write mode shares clean pages between processes.
+    """
+    header = read_header(path)
+    sections = {}
+    for entry in header["sections"]:
+        shape = tuple(entry["shape"])
+        if int(np.prod(shape)) == 0:
+            sections[entry["name"]] = np.zeros(shape, dtype=entry["dtype"])
+        elif mmap_mode is None:
+            sections[entry["name"]] = np.fromfile(path, dtype=entry["dtype"], count=int(np.prod(shape)), offset=entry["offset"]).reshape(shape)
+        else:
+            sections[entry["name"]] = np.memmap(path, dtype=entry["dtype"], mode=mmap_mode, offset=entry["offset"], shape=shape)
+    return header, sections
+
+def _align(offset):
+    """
+    Rounds offset up to the section alignment.
+    """
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+def main():
+    """
+    converts a pickled q-table into the binary model format
+    """
+    from blackjack_ai import BlackjackAI, MODEL_PATH
+
+    parser = argparse.ArgumentParser(description="Convert a pickled blackjack q-table to the binary model format.")
+    parser.add_argument("source", nargs="?", default="blackjack_q_table.pkl", help="pickled model to convert")
+    parser.add_argument("target", nargs="?", default=MODEL_PATH, help="binary model to write")
+    args = parser.parse_args()
+
+    ai = BlackjackAI()
+    ai.load_pickle(args.source)
+    ai.save_model(args.target)
+    print(f"Converted {args.source} ({int(ai.seen.sum()):,} states) -> {args.target}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+import argparse
+import time
+import multiprocessing as mp
+import numpy as np
+
+from blackjack_ai import StateEncoder, to_tenths
+from blackjack_baseline import BaselineModel
+from dealer_odds import DealerOdds
+from model_format import write_model, open_model
+
+STRATEGY_PATH = "optimal_strategy.bjq"
+ACTIONS = ['hit', 'stand']
+# per-deck counts of each value within its low (2-6), mid (7-9) and high (10-ace) bucket
+BUCKET_VALUES = [(2, 3, 4, 5, 6), (7, 8, 9), (10, 11)]
+BUCKET_SHARES = [(4, 4, 4, 4, 4), (4, 4, 4), (16, 4)]
+
+def representative_counts(low10, mid10, high10, cards):
+    """
+    Returns value counts for a composition of about `cards` cards whose low/mid/high
+    fractions match the given tenths, split within each bucket like a full deck.
+    """
+    weights = (low10, mid10, high10)
+    weight_total = sum(weights)
+    counts = [0] * 12
+    for weight, values, shares in zip(weights, BUCKET_VALUES, BUCKET_SHARES):
+        bucket_cards = cards * weight / weight_total
+        for value, share in zip(values, shares):
+            counts[value] = int(round(bucket_cards * share / sum(shares)))
+    return counts
+
+def stand_ev(player_total, dealer):
+    """
+    Expected reward per unit bet of standing, using the trainer's payouts (1.5 win, 0 push, -1 loss).
+    """
+    win = dealer[5]
+    lose = 0.0
+    for i in range(5):
+        if 17 + i < player_total:
+            win += dealer[i]
+        elif 17 + i > player_total:
+            lose += dealer[i]
+    return 1.5 * win - lose
+
+def player_evs(dealer, probs):
+    """
+    Returns {(total, soft): (hit_ev, stand_ev)} for every player total, where soft
+    means an ace is still counted as 11. probs maps values 2-11 to draw probabilities.
+
+    This is an approximation: probs and the dealer outcomes stay fixed at the
+    decision-time composition, so the cards the player draws are not removed
+    from the shoe for later draws or for the dealer. The error grows as the shoe
+    runs low.
+    """
+    best = {}
+    evs = {}
+
+    def solve(total, soft):
+        if total > 21:
+            return -1.0
+        key = (total, soft)
+        if key not in best:
+            hit = 0.0
+            for value, p in probs.items():
+                if p == 0:
+                    continue
+                new_total = total + value
+                new_soft = soft or value == 11
+                if value == 11 and soft:
+                    new_total -= 10
+                if new_total > 21 and new_soft:
+                    new_total -= 10
+                    new_soft = False
+                hit += p * solve(new_total, new_soft)
+            stand = stand_ev(total, dealer)
+            evs[key] = (hit, stand)
+            best[key] = max(hit, stand)
+        return best[key]
+
+    for total in range(StateEncoder.MIN_TOTAL, 22):
+        solve(total, False)
+    for total in range(12, 22):
+        solve(total, True)
+    return evs
+
+def _solve_upcard(args):
+    """
+    Solves every bucket composition for one dealer upcard.
+    Returns an array indexed [soft, total, low, mid, residual, action].
+    """
+    upcard, cards = args
+    encoder = StateEncoder()
+    n_totals, _, n_low, n_mid, n_residual, _ = encoder.shape
+    ev = np.full((2, n_totals, n_low, n_mid, n_residual, 2), np.nan, dtype=np.float32)
+    dealer_odds = DealerOdds()
+
+    for low10 in range(n_low):
+        for mid10 in range(n_mid):
+            for residual in range(n_residual):
+                high10 = 10 - low10 - mid10 + residual - 1
+                if not 0 <= high10 <= 10 or low10 + mid10 + high10 == 0:
+                    continue
+                counts = representative_counts(low10, mid10, high10, cards)
+                remaining = sum(counts)
+                if remaining == 0:
+                    continue
+                dealer = tuple(dealer_odds.distribution(upcard, counts).values())
+                probs = {v: counts[v] / remaining for v in range(2, 12)}
+                for (total, soft), action_evs in player_evs(dealer, probs).items():
+                    ev[int(soft), total - encoder.MIN_TOTAL, low10, mid10, residual] = action_evs
+        dealer_odds.clear()
+    return upcard, ev
+
+def build_table(decks=1, cards=None, workers=1):
+    """
+    Solves hit/stand expected values for all states and returns an array indexed
+    [soft, state index without the bet, action]. Work is split across dealer upcards.
+    """
+    encoder = StateEncoder()
+    cards = cards if cards is not None else 26 * decks
+    n_totals, n_dealer, n_low, n_mid, n_residual, _ = encoder.shape
+    ev = np.full((2, n_totals, n_dealer, n_low, n_mid, n_residual, 2), np.nan, dtype=np.float32)
+
+    tasks = [(upcard, cards) for upcard in range(2, 12)]
+    if workers > 1:
+        with mp.get_context().Pool(workers) as pool:
+            results = pool.map(_solve_upcard, tasks)
+    else:
+        results = [_solve_upcard(task) for task in tasks]
+    for upcard, upcard_ev in results:
+        ev[:, :, upcard - 2] = upcard_ev
+    return ev.reshape(2, -1, 2)
+
+class OptimalStrategy:
+    """
+    Fast lookup strategy over a precomputed composition-dependent expected-value table.
+    """
+    def __init__(self, ev=None, decks=1):
+        self.encoder = StateEncoder()
+        self.ev = ev
+        self.decks = decks
+        self.bet_slots = self.encoder.shape[-1]
+
+    @classmethod
+    def build(cls, decks=1, cards=None, workers=1):
+        """
+        Solves a new table for a shoe of the given number of decks.
+        """
+        return cls(build_table(decks, cards, workers), decks)
+
+    def save(self, path=STRATEGY_PATH):
+        """
+        Saves the table in the binary model format.
+        """
+        header = {
+            "kind": "optimal_strategy",
+            "schema": {
+                "encoder": type(self.encoder).__name__,
+                "shape": list(self.encoder.shape),
+                "actions": ACTIONS,
+            },
+            "decks": self.decks,
+        }
+        write_model(path, header, {"ev": self.ev})
+
+    @classmethod
+    def load(cls, path=STRATEGY_PATH):
+        """
+        Memory-maps a saved table.
+        """
+        header, sections = open_model(path, "r")
+        strategy = cls(sections["ev"], header["decks"])
+        if tuple(header["schema"]["shape"]) != strategy.encoder.shape:
+            raise ValueError(f"{path} was built for state shape {header['schema']['shape']}")
+        return strategy
+
+    def get_state(self, player_total, dealer_card, buckets):
+        """
+        Returns the state index for a hand, keyed like BlackjackAI.get_state_from_buckets.
+        """
+        low, mid, high = buckets
+        return self.encoder.encode(player_total, dealer_card, to_tenths(low),
+                                   to_tenths(mid), to_tenths(high), 0)
+
+    def get_evs(self, player_total, dealer_card, buckets, soft=False):
+        """
+        Returns the (hit, stand) expected values per unit bet.
+        """
+        state = self.get_state(player_total, dealer_card, buckets)
+        return tuple(self.ev[int(soft), state // self.bet_slots])
+
+    def get_action(self, player_total, dealer_card, buckets, soft=False):
+        """
+        Returns the action with the higher expected value.
+        """
+        if player_total > 21:
+            return "stand"
+        hit, stand = self.get_evs(player_total, dealer_card, buckets, soft)
+        if np.isnan(hit):
+            return BaselineModel.get_action(player_total, dealer_card)
+        return "hit" if hit > stand else "stand"
+
+    @staticmethod
+    def get_bet():
+        """
+        Flat bet, so results measure playing decisions only
+        """
+        return 10
+
+def main():
+    """
+    builds and saves the optimal strategy table
+    """
+    parser = argparse.ArgumentParser(description="Precompute the composition-dependent optimal hit/stand table.")
+    parser.add_argument("--decks", type=int, default=1, help="decks in the shoe the table is solved for")
+    parser.add_argument("--cards", type=int, default=None, help="cards in each representative composition (default: half the shoe)")
+    parser.add_argument("--workers", type=int, default=mp.cpu_count(), help="processes to split dealer upcards across")
+    parser.add_argument("--output", default=STRATEGY_PATH, help="table file to write")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    strategy = OptimalStrategy.build(args.decks, args.cards, args.workers)
+    strategy.save(args.output)
+    solved = int(np.count_nonzero(~np.isnan(strategy.ev[..., 0])))
+    print(f"Solved {solved:,} states in {time.perf_counter() - start:.1f}s -> {args.output}")
+    print("Hit EVs hold the composition fixed while the player draws (no depletion), so they are approximate on short shoes")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+import time
+import multiprocessing as mp
+import numpy as np
+
+import train_blackjack_ai
+from blackjack_ai import BlackjackAI
+from rng import spawn_rngs
+
+def _worker(conn, deck_rng, ai_rng, params, workers, decks, penetration):
+    """
+    Worker process: trains its own copy of the AI on its own deck, one round per message.
+    """
+    deck = train_blackjack_ai.make_deck(decks, penetration, deck_rng)
+    ai = BlackjackAI(**params, rng=ai_rng)
+
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        (states, q_values), epsilon, alpha, epsilon_decay, n_hands = message
+        ai.q_table[states] = q_values
+        ai.seen[states] = True
+        ai.epsilon = epsilon
+        # the master's alpha and decay may have been annealed since the last round;
+        # every worker decays once per hand, so the combined schedule follows the global hand count
+        ai.alpha = alpha
+        ai.epsilon_decay = epsilon_decay ** workers
+        ai.visits[:] = 0
+
+        for _ in range(n_hands):
+            train_blackjack_ai.simulate_hand(ai, train=True, deck=deck)
+            ai.decay_epsilon()
+
+        # only send back states touched this round
+        touched = np.flatnonzero(ai.visits)
+        conn.send(((touched, ai.q_table[touched], ai.visits[touched]), ai.epsilon))
+    conn.close()
+
+def merge_updates(ai: BlackjackAI, worker_updates):
+    """
+    Folds the workers' round updates into the master q-table by visit-count-weighted
+    averaging and returns the merged entries to broadcast back.
+    """
+    indices = np.concatenate([states for states, _, _ in worker_updates])
+    q_values = np.concatenate([q for _, q, _ in worker_updates]).astype(np.float64)
+    counts = np.concatenate([visits for _, _, visits in worker_updates]).astype(np.float64)
+
+    states, inverse = np.unique(indices, return_inverse=True)
+    total = np.bincount(inverse, weights=counts, minlength=states.size)
+    merged = np.empty((states.size, q_values.shape[1]), dtype=ai.q_table.dtype)
+    for action in range(q_values.shape[1]):
+        merged[:, action] = np.bincount(inverse, weights=q_values[:, action] * counts, minlength=states.size) / total
+
+    ai.q_table[states] = merged
+    ai.seen[states] = True
+    ai.visits[states] += total.astype(ai.visits.dtype)
+    return states, merged
+
+def train_parallel(ai: BlackjackAI, total_hands, workers, seed=None, sync_every=10000, verbose=True,
+                   decks=None, penetration=0.75, monitor=None):
+    """
+    Trains the AI across worker processes, merging their q-tables every sync_every hands per worker.
+    Results are deterministic for a fixed seed and worker count. An optional ConvergenceMonitor
+    is checked after every merge and can end training early.
+    """
+    params = {
+        "alpha": ai.alpha,
+        "gamma": ai.gamma,
+        "epsilon_min": ai.epsilon_min,
+        "epsilon_decay": ai.epsilon_decay,
+        "soft_hands": ai.encoder.soft,
+        "state_abstraction": ai.encoder.abstraction,
+        "rules": ai.rules,
+        "update_mode": ai.update_mode,
+        "n_step": ai.n_step,
+        "trace_lambda": ai.trace_lambda,
+    }
+    ctx = mp.get_context()
+    # a dealing and a decision stream per worker, all spawned from the one seed
+    rngs = spawn_rngs(seed, 2 * workers)
+    pipes = []
+    processes = []
+    for worker_id in range(workers):
+        parent_conn, child_conn = ctx.Pipe()
+        process = ctx.Process(target=_worker, args=(child_conn, rngs[2 * worker_id], rngs[2 * worker_id + 1], params, workers, decks, penetration), daemon=True)
+        process.start()
+        pipes.append(parent_conn)
+        processes.append(process)
+
+    try:
+        # first round seeds the workers with the full master table
+        seen = np.flatnonzero(ai.seen)
+        broadcast = (seen, ai.q_table[seen])
+        done = 0
+        next_report = 50000
+        while done < total_hands:
+            round_hands = min(sync_every * workers, total_hands - done)
+            shares = [round_hands // workers + (1 if i < round_hands % workers else 0) for i in range(workers)]
+            for conn, n_hands in zip(pipes, shares):
+                conn.send((broadcast, ai.epsilon, ai.alpha, ai.epsilon_decay, n_hands))
+
+            results = [conn.recv() for conn in pipes]
+            broadcast = merge_updates(ai, [touched for touched, _ in results])
+            # workers with the largest share have decayed furthest
+            ai.epsilon = results[0][1]
+
+            done += round_hands
+            if monitor and monitor.check(done):
+                break
+            while verbose and done >= next_report:
+                print(f"Completed {next_report} hands")
+                next_report += 50000
+    finally:
+        for conn in pipes:
+            conn.send(None)
+        for process in processes:
+            process.join()
+    return ai
+
+def speedup_curve(hands=100000, worker_counts=(1, 2, 4, 8), seed=0, sync_every=10000):
+    """
+    Times the single-process training loop against train_parallel at several worker counts.
+    """
+    deck_rng, ai_rng = spawn_rngs(seed, 2)
+    deck = train_blackjack_ai.make_deck(rng=deck_rng)
+    ai = BlackjackAI(rng=ai_rng)
+    start = time.perf_counter()
+    for _ in range(hands):
+        train_blackjack_ai.simulate_hand(ai, train=True, deck=deck)
+        ai.decay_epsilon()
+    serial_rate = hands / (time.perf_counter() - start)
+
+    print(f"\n=== Training Speedup ({hands:,} hands) ===")
+    print("-"*58)
+    print(f"| {'Workers':<12} | {'Hands/sec':>15} | {'Speedup':>10} | {'States':>8} |")
+    print("-"*58)
+    print(f"| {'serial':<12} | {serial_rate:15,.0f} | {1.0:9.2f}x | {int(ai.seen.sum()):8,} |")
+    for workers in worker_counts:
+        ai = BlackjackAI()
+        start = time.perf_counter()
+        train_parallel(ai, hands, workers, seed=seed, sync_every=sync_every, verbose=False)
+        rate = hands / (time.perf_counter() - start)
+        print(f"| {workers:<12} | {rate:15,.0f} | {rate/serial_rate:9.2f}x | {int(ai.seen.sum()):8,} |")
+    print("-"*58)
@@ -0,0 +1,327 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import deque
+import numpy as np
+
+from blackjack_ai import BlackjackAI, StateEncoder, MODEL_PATH, to_tenths
+from batch_simulator import q_table_policy, ai_bet
+
+class PolicyServer:
+    """
+    Serves a trained model's greedy hit/stand policy and bet sizing to many clients.
+
+    The protocol is newline-delimited JSON over TCP or a Unix socket, for example
+    {"id": 1, "op": "action", "player_total": 15, "dealer_card": 10,
+     "buckets": [0.38, 0.23, 0.39], "bet": 20, "soft": false}
+    answered with {"id": 1, "action": "hit"}, {"id": 2, "op": "bet", "buckets": [...]}
+    answered with {"id": 2, "bet": 40}, and {"op": "stats"} for the latency report.
+    Requests from every connection go through one queue and are answered in
+    micro-batches: after the first request arrives the batcher waits up to
+    max_delay seconds or until max_batch requests are queued, then evaluates
+    them all in one vectorized lookup. Responses carry the request's id and come
+    back in request order, except errors and stats, which are answered at once.
+
+    Only models trained under the simple rules (hit/stand) with a bucket state
+    abstraction ("full" or "no_bet") can be served, since requests carry the
+    bucket fractions and answers are hit or stand.
+    """
+    def __init__(self, ai: BlackjackAI, max_batch=256, max_delay=0.001, seed=None):
+        self.policy = q_table_policy(ai)
+        self.rng = np.random.default_rng(seed)
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.queue = None
+        # receive-to-response times of the most recent requests
+        self.latencies = deque(maxlen=100000)
+        self.served = 0
+        self.batches = 0
+        # span from the first request to the latest response, for throughput
+        self.first_received = None
+        self.last_answered = None
+
+    def _parse(self, line):
+        """
+        Decodes and checks one request line, raising ValueError when it is malformed.
+        """
+        request = json.loads(line)
+        op = request.get("op", "action")
+        if op == "stats":
+            return request
+        try:
+            buckets = [float(x) for x in request["buckets"]]
+            if len(buckets) != 3 or not all(0 <= x <= 1 for x in buckets):
+                raise ValueError("buckets must be three fractions between 0 and 1")
+            # the encoder keeps high as an offset of at most one tenth from 1 - low - mid
+            low10, mid10, high10 = (to_tenths(x) for x in buckets)
+            if abs(high10 - (10 - low10 - mid10)) > 1:
+                raise ValueError("buckets must sum to 1")
+            request["buckets"] = buckets
+            if op == "action":
+                dealer_card = float(request["dealer_card"])
+                player_total = float(request["player_total"])
+                bet = float(request["bet"])
+                if not 2 <= dealer_card <= 11:
+                    raise ValueError("dealer_card must be 2-11")
+                if not StateEncoder.MIN_TOTAL <= player_total <= StateEncoder.MAX_TOTAL:
+                    raise ValueError(f"player_total must be {StateEncoder.MIN_TOTAL}-{StateEncoder.MAX_TOTAL}")
+                # comparisons are all false for NaN, so it never gets this far
+                if not 0 <= bet < 2 ** 31:
+                    raise ValueError("bet must be a non-negative number below 2**31")
+                request["dealer_card"] = int(dealer_card)
+                request["player_total"] = int(player_total)
+                request["bet"] = int(bet)
+            elif op != "bet":
+                raise ValueError(f"unknown op {op!r}")
+        except KeyError as error:
+            raise ValueError(f"missing field {error}")
+        return request
+
+    async def handle(self, reader, writer):
+        """
+        Reads requests from one connection and queues them for the batcher.
+        """
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                received = time.perf_counter()
+                try:
+                    request = self._parse(line)
+                except (ValueError, KeyError, TypeError) as error:
+                    request_id = None
+                    try:
+                        request_id = json.loads(line).get("id")
+                    except (ValueError, AttributeError):
+                        pass
+                    writer.write(self._encode({"id": request_id, "error": str(error)}))
+                    continue
+                if request.get("op") == "stats":
+                    writer.write(self._encode({"id": request.get("id"), **self.stats()}))
+                    continue
+                self.queue.put_nowait((request, writer, received))
+        except ConnectionError:
+            # the client went away mid-request
+            pass
+        finally:
+            writer.close()
+
+    async def batcher(self):
+        """
+        Collects queued requests into micro-batches and answers them.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                if self.queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    batch.append(self.queue.get_nowait())
+
+            # this task is the queue's only consumer, so one bad batch or vanished
+            # client must not end it
+            try:
+                responses = self.evaluate([request for request, _, _ in batch])
+            except Exception as error:
+                responses = [{"id": request.get("id"), "error": str(error)} for request, _, _ in batch]
+            writers = {}
+            for (request, writer, received), response in zip(batch, responses):
+                if not writer.is_closing():
+                    writer.write(self._encode(response))
+                    writers[id(writer)] = writer
+            for writer in writers.values():
+                try:
+                    await writer.drain()
+                except (ConnectionError, OSError):
+                    writer.close()
+            now = time.perf_counter()
+            if self.first_received is None:
+                self.first_received = batch[0][2]
+            self.last_answered = now
+            self.latencies.extend(now - received for _, _, received in batch)
+            self.served += len(batch)
+            self.batches += 1
+
+    def evaluate(self, requests):
+        """
+        Answers a batch of action and bet requests with one vectorized pass per op.
+        """
+        responses = [None] * len(requests)
+        actions = [i for i, request in enumerate(requests) if request.get("op", "action") == "action"]
+        bets = [i for i, request in enumerate(requests) if request.get("op") == "bet"]
+        if actions:
+            rows = [requests[i] for i in actions]
+            low, mid, high = np.array([row["buckets"] for row in rows], dtype=np.float64).T
+            hit = self.policy(np.array([row["player_total"] for row in rows], dtype=np.int64),
+                              np.array([row["dealer_card"] for row in rows], dtype=np.int64),
+                              low, mid, high,
+                              np.array([row["bet"] for row in rows], dtype=np.int64),
+                              np.array([bool(row.get("soft", False)) for row in rows]))
+            for i, is_hit in zip(actions, hit):
+                responses[i] = {"id": requests[i].get("id"), "action": "hit" if is_hit else "stand"}
+        if bets:
+            low, mid, high = np.array([requests[i]["buckets"] for i in bets], dtype=np.float64).T
+            for i, bet in zip(bets, ai_bet(low, mid, high, self.rng)):
+                responses[i] = {"id": requests[i].get("id"), "bet": int(bet)}
+        return responses
+
+    def stats(self):
+        """
+        Returns the served count, throughput, mean batch size and p50/p99 latency.
+        """
+        latencies = np.array(self.latencies) * 1000
+        elapsed = self.last_answered - self.first_received if self.served else 0.0
+        return {
+            "served": self.served,
+            "requests_per_sec": self.served / elapsed if elapsed else 0.0,
+            "mean_batch": self.served / self.batches if self.batches else 0.0,
+            "p50_ms": float(np.percentile(latencies, 50)) if latencies.size else None,
+            "p99_ms": float(np.percentile(latencies, 99)) if latencies.size else None,
+        }
+
+    @staticmethod
+    def _encode(message):
+        return (json.dumps(message) + "\n").encode()
+
+    async def serve(self, host="127.0.0.1", port=8765, unix=None):
+        """
+        Listens on a TCP port, or a Unix socket path when unix is given, until cancelled.
+        """
+        self.queue = asyncio.Queue()
+        batcher = asyncio.create_task(self.batcher())
+        if unix:
+            server = await asyncio.start_unix_server(self.handle, unix)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        print(f"Serving on {unix or f'{host}:{port}'} (max batch {self.max_batch}, max delay {self.max_delay * 1000:.1f} ms)")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+
+def random_request(rng, request_id):
+    """
+    Returns an action or bet request for a random but plausible game situation.
+    """
+    low = rng.uniform(0.25, 0.5)
+    high = rng.uniform(0.25, 0.45)
+    buckets = [low, 1 - low - high, high]
+    if rng.random() < 0.2:
+        return {"id": request_id, "op": "bet", "buckets": buckets}
+    return {"id": request_id, "op": "action", "player_total": rng.randint(4, 21), "dealer_card": rng.randint(2, 11),
+            "buckets": buckets, "bet": rng.choice(range(10, 101, 10)), "soft": rng.random() < 0.1}
+
+async def _load_connection(connect, requests, pipeline, rng, latencies):
+    """
+    One client connection keeping up to pipeline requests in flight.
+    """
+    reader, writer = await connect()
+    sent = {}
+    in_flight = asyncio.Semaphore(pipeline)
+
+    async def receive():
+        for _ in range(requests):
+            response = json.loads(await reader.readline())
+            latencies.append(time.perf_counter() - sent.pop(response["id"]))
+            in_flight.release()
+
+    receiver = asyncio.create_task(receive())
+    for request_id in range(requests):
+        await in_flight.acquire()
+        sent[request_id] = time.perf_counter()
+        writer.write(PolicyServer._encode(random_request(rng, request_id)))
+        await writer.drain()
+    await receiver
+    writer.close()
+
+async def run_load(host="127.0.0.1", port=8765, unix=None, connections=32, requests=2000, pipeline=8, seed=0):
+    """
+    Drives the server from many concurrent connections and prints client-side
+    throughput and latency, then the server's own report.
+    """
+    def connect():
+        if unix:
+            return asyncio.open_unix_connection(unix)
+        return asyncio.open_connection(host, port)
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_load_connection(connect, requests, pipeline, random.Random(seed + i), latencies)
+                           for i in range(connections)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await connect()
+    writer.write(PolicyServer._encode({"op": "stats"}))
+    server_stats = json.loads(await reader.readline())
+    writer.close()
+
+    latencies = np.array(latencies) * 1000
+    total = connections * requests
+    print(f"\n=== Policy Server Load ({connections} connections x {requests:,} requests, {pipeline} in flight each) ===")
+    print("-"*54)
+    print(f"| {'Measured at':<12} | {'Requests/sec':>12} | {'p50 ms':>8} | {'p99 ms':>8} |")
+    print("-"*54)
+    print(f"| {'client':<12} | {total / elapsed:12,.0f} | {np.percentile(latencies, 50):8.3f} | {np.percentile(latencies, 99):8.3f} |")
+    print(f"| {'server':<12} | {server_stats['requests_per_sec']:12,.0f} | {server_stats['p50_ms']:8.3f} | {server_stats['p99_ms']:8.3f} |")
+    print("-"*54)
+    print(f"Mean server batch: {server_stats['mean_batch']:.1f} requests")
+
+def main():
+    """
+    serve the trained policy or load-test a running server
+    """
+    parser = argparse.ArgumentParser(description="Batched policy server for the trained blackjack AI.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, help_text in (("serve", "load the model and serve requests"), ("bench", "load-test a running server")):
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.add_argument("--host", default="127.0.0.1", help="TCP host")
+        sub.add_argument("--port", type=int, default=8765, help="TCP port")
+        sub.add_argument("--unix", default=None, help="use this Unix socket path instead of TCP")
+        if name == "serve":
+            sub.add_argument("--model", default=MODEL_PATH, help="model file to serve")
+            sub.add_argument("--max-batch", type=int, default=256, help="largest micro-batch")
+            sub.add_argument("--max-delay", type=float, default=1.0, help="longest wait in ms for a batch to fill")
+            sub.add_argument("--seed", type=int, default=None, help="seed for the random small bets")
+        else:
+            sub.add_argument("--connections", type=int, default=32, help="concurrent client connections")
+            sub.add_argument("--requests", type=int, default=2000, help="requests per connection")
+            sub.add_argument("--pipeline", type=int, default=8, help="requests in flight per connection")
+            sub.add_argument("--seed", type=int, default=0, help="seed for the generated requests")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        ai = BlackjackAI(epsilon=0.0)
+        try:
+            ai.load_model(args.model)
+        except FileNotFoundError:
+            print(f"No trained model at {args.model}, serving the untrained heuristic policy")
+        except ValueError as error:
+            parser.error(f"the server only supports simple-rules models with bucket states: {error}")
+        try:
+            server = PolicyServer(ai, args.max_batch, args.max_delay / 1000, args.seed)
+        except ValueError as error:
+            parser.error(f"the server only supports simple-rules models with bucket states: {error}")
+        try:
+            asyncio.run(server.serve(args.host, args.port, args.unix))
+        except KeyboardInterrupt:
+            stats = server.stats()
+            if stats["served"]:
+                print(f"\nServed {stats['served']:,} requests at {stats['requests_per_sec']:,.0f}/sec, "
+                      f"p50 {stats['p50_ms']:.3f} ms, p99 {stats['p99_ms']:.3f} ms, mean batch {stats['mean_batch']:.1f}")
+    else:
+        asyncio.run(run_load(args.host, args.port, args.unix, args.connections, args.requests, args.pipeline, args.seed))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+import math
+import numpy as np
+
+class ResultStats:
+    """
+    Streaming accumulator over hand rewards.
+
+    Tracks count, total, win/draw/loss counts, mean and variance (Welford) and the
+    running bankroll's peak, trough and largest drawdown, without storing the
+    rewards. Accumulators over consecutive streams can be merged.
+    """
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        # bankroll extremes relative to the start of the stream
+        self.max_bankroll = 0
+        self.min_bankroll = 0
+        self.max_drawdown = 0
+
+    @classmethod
+    def from_iterable(cls, rewards):
+        """
+        Builds an accumulator from a generator of rewards.
+        """
+        stats = cls()
+        for reward in rewards:
+            stats.add(reward)
+        return stats
+
+    def add(self, reward):
+        """
+        Adds one hand's reward.
+        """
+        self.count += 1
+        self.total += reward
+        if reward > 0:
+            self.wins += 1
+        elif reward == 0:
+            self.draws += 1
+        else:
+            self.losses += 1
+
+        delta = reward - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (reward - self.mean)
+
+        bankroll = self.total
+        if bankroll > self.max_bankroll:
+            self.max_bankroll = bankroll
+        elif bankroll < self.min_bankroll:
+            self.min_bankroll = bankroll
+        if self.max_bankroll - bankroll > self.max_drawdown:
+            self.max_drawdown = self.max_bankroll - bankroll
+
+    def add_many(self, rewards):
+        """
+        Adds an array of consecutive rewards in one vectorized pass.
+        """
+        rewards = np.asarray(rewards)
+        if rewards.size == 0:
+            return
+        batch = ResultStats()
+        batch.count = int(rewards.size)
+        batch.total = int(rewards.sum())
+        batch.wins = int(np.count_nonzero(rewards > 0))
+        batch.draws = int(np.count_nonzero(rewards == 0))
+        batch.losses = batch.count - batch.wins - batch.draws
+        batch.mean = float(rewards.mean())
+        batch.m2 = float(((rewards - batch.mean) ** 2).sum())
+
+        bankroll = np.cumsum(rewards)
+        peaks = np.maximum.accumulate(np.maximum(bankroll, 0))
+        batch.max_bankroll = int(max(peaks[-1], 0))
+        batch.min_bankroll = int(min(bankroll.min(), 0))
+        batch.max_drawdown = int((peaks - bankroll).max())
+        self.merge(batch)
+
+    def merge(self, other):
+        """
+        Folds in an accumulator whose stream followed this one.
+        """
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.__dict__.update(other.__dict__)
+            return self
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+
+        # the other stream's bankroll starts where this one ended
+        self.max_drawdown = max(self.max_drawdown, other.max_drawdown,
+                                self.max_bankroll - (self.total + other.min_bankroll))
+        self.max_bankroll = max(self.max_bankroll, self.total + other.max_bankroll)
+        self.min_bankroll = min(self.min_bankroll, self.total + other.min_bankroll)
+
+        self.count = count
+        self.total += other.total
+        self.wins += other.wins
+        self.draws += other.draws
+        self.losses += other.losses
+        return self
+
+    @property
+    def variance(self):
+        """
+        Sample variance of the rewards.
+        """
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        """
+        Sample standard deviation of the rewards.
+        """
+        return math.sqrt(self.variance)
+
+    def confidence_interval(self, z=1.96):
+        """
+        Returns the (low, high) normal-approximation interval for the mean reward.
+        """
+        if self.count == 0:
+            return (0.0, 0.0)
+        half_width = z * self.std / math.sqrt(self.count)
+        return (self.mean - half_width, self.mean + half_width)
+
+    def rate(self, outcome_count):
+        """
+        Returns outcome_count as a percentage of hands.
+        """
+        return outcome_count / self.count * 100 if self.count else 0.0
@@ -0,0 +1,31 @@
+import random
+import numpy as np
+
+def spawn_rngs(seed, n):
+    """
+    Returns n independent random.Random streams derived from seed through numpy's
+    SeedSequence, so parallel workers never share correlated streams.
+    seed=None draws fresh entropy.
+    """
+    children = np.random.SeedSequence(seed).spawn(n)
+    return [random.Random(int(child.generate_state(1, np.uint64)[0])) for child in children]
+
+def numpy_rng(rng):
+    """
+    Returns a numpy Generator seeded from a random.Random stream (or the random module).
+    """
+    return np.random.default_rng(rng.getrandbits(64))
+
+def get_rng_state(rng):
+    """
+    Returns the state of a random.Random stream (or the random module) as JSON-friendly lists.
+    """
+    version, internal, gauss = rng.getstate()
+    return [version, list(internal), gauss]
+
+def set_rng_state(rng, state):
+    """
+    Restores a state returned by get_rng_state.
+    """
+    version, internal, gauss = state
+    rng.setstate((version, tuple(internal), gauss))
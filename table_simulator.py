@@ -0,0 +1,328 @@
+import argparse
+import time
+
+from blackjack import BlackjackGame, Hand, TableRules, RULE_PRESETS, SIMPLE_RULES
+from blackjack_ai import BlackjackAI, GreedyPolicy, MODEL_PATH
+from blackjack_baseline import BaselineModel
+from optimal_strategy import OptimalStrategy
+from result_stats import ResultStats
+from rng import spawn_rngs
+import train_blackjack_ai
+
+class AISeat:
+    """
+    Seat played by a BlackjackAI, learning from its hands when train is set.
+    """
+    def __init__(self, ai: BlackjackAI, train=False):
+        self.ai = ai
+        self.train = train
+        self.label = "AI"
+        self.bet = 0
+        self.decisions = []
+
+    def check_rules(self, rules):
+        """
+        The AI's q-table columns must match the table's actions.
+        """
+        if self.ai.actions != rules.actions:
+            raise ValueError(f"the AI plays {self.ai.actions} but the table allows {rules.actions}")
+
+    def get_bet(self, deck):
+        """
+        Chooses the bet from the deck composition and starts a new decision log.
+        """
+        self.bet = self.ai.choose_bet_from_buckets(deck.get_bucket_probabilities())
+        self.decisions = []
+        return self.bet
+
+    def insure(self, deck):
+        """
+        Insurance by the AI's count rule.
+        """
+        return self.ai.take_insurance(deck)
+
+    def choose(self, game, hand, legal):
+        """
+        Picks an action for the hand and logs the decision for learning.
+        """
+        pair_card = hand[0].value if 'split' in legal else 0
+        state = self.ai.get_state_from_deck(hand.score, game.dealer_hand[0].value, game.deck,
+                                            self.bet, hand.is_soft, pair_card)
+        action = self.ai.choose_action(state, legal)
+        self.decisions.append((hand, state, action, legal))
+        return action
+
+    def finish(self, game, hand_rewards):
+        """
+        Learns from the round's decisions when training.
+        """
+        if self.train:
+            train_blackjack_ai.learn_rules_hand(self.ai, self.decisions, game.hands, hand_rewards)
+            self.ai.decay_epsilon()
+
+class PolicySeat:
+    """
+    Seat played by a frozen GreedyPolicy, for evaluation without touching the q-table.
+    """
+    def __init__(self, policy: GreedyPolicy, rng=None):
+        self.policy = policy
+        self.rng = rng
+        self.label = "AI"
+        self.bet = 0
+
+    def check_rules(self, rules):
+        """
+        The policy's actions must match the table's.
+        """
+        if self.policy.actions != rules.actions:
+            raise ValueError(f"the policy plays {self.policy.actions} but the table allows {rules.actions}")
+
+    def get_bet(self, deck):
+        """
+        The policy's bet for the deck composition.
+        """
+        self.bet = self.policy.get_bet(deck.get_bucket_probabilities(), self.rng)
+        return self.bet
+
+    def insure(self, deck):
+        """
+        Insurance by the AI's count rule.
+        """
+        return self.policy.take_insurance(deck)
+
+    def choose(self, game, hand, legal):
+        """
+        The greedy action for the hand.
+        """
+        pair_card = hand[0].value if 'split' in legal else 0
+        return self.policy.get_action_from_deck(hand.score, game.dealer_hand[0].value, game.deck,
+                                                self.bet, hand.is_soft, pair_card, legal)
+
+    def finish(self, game, hand_rewards):
+        """
+        Nothing to learn.
+        """
+
+class BaselineSeat:
+    """
+    Seat played by the BaselineModel, with basic strategy under extended rules.
+    """
+    def __init__(self, baseline: BaselineModel):
+        self.baseline = baseline
+        self.label = "Baseline"
+        self.extended = False
+
+    def check_rules(self, rules):
+        """
+        Plays basic strategy with doubles and splits only under extended rules.
+        """
+        self.extended = rules.extended
+
+    def get_bet(self, deck):
+        """
+        The baseline's flat bet.
+        """
+        return self.baseline.get_bet()
+
+    def insure(self, deck):
+        """
+        The baseline never insures.
+        """
+        return self.baseline.take_insurance(deck)
+
+    def choose(self, game, hand, legal):
+        """
+        The baseline's action for the hand.
+        """
+        dealer_card = game.dealer_hand[0].value
+        if not self.extended:
+            return self.baseline.get_action(hand.score, dealer_card)
+        pair_card = hand[0].value if 'split' in legal else None
+        return self.baseline.get_rules_action(hand.score, dealer_card, legal, hand.is_soft, pair_card)
+
+    def finish(self, game, hand_rewards):
+        """
+        Nothing to learn.
+        """
+
+class StrategySeat:
+    """
+    Seat played by a lookup strategy such as OptimalStrategy, which only hits or stands.
+    """
+    def __init__(self, strategy):
+        self.strategy = strategy
+        self.label = "Optimal"
+
+    def check_rules(self, rules):
+        """
+        Any rules; only hit and stand are ever chosen.
+        """
+
+    def get_bet(self, deck):
+        """
+        The strategy's flat bet.
+        """
+        return self.strategy.get_bet()
+
+    def insure(self, deck):
+        """
+        Never insures.
+        """
+        return False
+
+    def choose(self, game, hand, legal):
+        """
+        Hit or stand by the table's expected values.
+        """
+        return self.strategy.get_action(hand.score, game.dealer_hand[0].value, game.deck.get_bucket_probabilities(), hand.is_soft)
+
+    def finish(self, game, hand_rewards):
+        """
+        Nothing to learn.
+        """
+
+def make_seat(agent, train=False):
+    """
+    Wraps an agent in its seat type; seats are passed through unchanged.
+    """
+    if isinstance(agent, BlackjackAI):
+        return AISeat(agent, train)
+    if isinstance(agent, GreedyPolicy):
+        return PolicySeat(agent)
+    if isinstance(agent, BaselineModel):
+        return BaselineSeat(agent)
+    if isinstance(agent, OptimalStrategy):
+        return StrategySeat(agent)
+    return agent
+
+class Table:
+    """
+    Several seats playing every round from one shared Deck or Shoe against a single dealer hand.
+
+    Cards go out in casino order: one to each seat, the dealer's upcard, a second
+    to each seat, then the hole card. Seats act in order, the dealer draws once
+    after all of them and every seat keeps its own streaming ResultStats. Agents
+    are BlackjackAI, GreedyPolicy, BaselineModel or OptimalStrategy objects, or any object with
+    the seat methods (check_rules, get_bet, insure, choose, finish).
+    """
+    def __init__(self, deck, agents, rules=None, train=False):
+        self.deck = deck
+        self.rules = rules if rules is not None else SIMPLE_RULES
+        self.seats = [make_seat(agent, train) for agent in agents]
+        for seat in self.seats:
+            seat.check_rules(self.rules)
+        self.stats = [ResultStats() for _ in self.seats]
+        self.rounds = 0
+
+    def play_round(self):
+        """
+        Plays one round for every seat and returns each seat's net reward.
+        """
+        deck = self.deck
+        deck.start_hand()
+        games = []
+        for seat in self.seats:
+            game = BlackjackGame(deck, chips=500, rules=self.rules)
+            game.place_bet(min(seat.get_bet(deck), game.chips))
+            games.append(game)
+
+        first_cards = [deck.deal() for _ in games]
+        upcard = deck.deal()
+        second_cards = [deck.deal() for _ in games]
+        dealer_hand = Hand((upcard, deck.deal()))
+        for game, first, second in zip(games, first_cards, second_cards):
+            game.start_round(Hand((first, second), game.bet), dealer_hand)
+
+        for seat, game in zip(self.seats, games):
+            if game.can_insure() and seat.insure(deck):
+                game.take_insurance()
+        if not games[0].dealer_has_blackjack():
+            for seat, game in zip(self.seats, games):
+                train_blackjack_ai.play_player_hands(game, lambda hand, legal: seat.choose(game, hand, legal))
+            if any(game.has_live_hand() for game in games):
+                games[0].draw_dealer()
+
+        rewards = []
+        for seat, game, stats in zip(self.seats, games, self.stats):
+            reward, hand_rewards = game.settle()
+            seat.finish(game, hand_rewards)
+            stats.add(reward)
+            rewards.append(reward)
+        self.rounds += 1
+        return rewards
+
+    def play(self, rounds):
+        """
+        Plays the given number of rounds.
+        """
+        for _ in range(rounds):
+            self.play_round()
+        return self
+
+    def report(self):
+        """
+        Prints each seat's results.
+        """
+        print(f"\n=== Table Results ({self.rounds:,} rounds) ===")
+        print("-"*95)
+        print(f"| {'Seat':<14} | {'Total Profit':>13} | {'Avg/Hand':>9} | {'95% CI':>17} | {'Win Rate':>8} | {'Max Drawdown':>12} |")
+        print("-"*95)
+        for i, (seat, stats) in enumerate(zip(self.seats, self.stats)):
+            low, high = stats.confidence_interval()
+            label = f"{i + 1} {seat.label}"
+            print(f"| {label:<14} | {stats.total:13,} | {stats.mean:9.2f} | {low:8.2f}..{high:7.2f} | {stats.rate(stats.wins):7.2f}% | {stats.max_drawdown:12,} |")
+        print("-"*95)
+
+def main():
+    """
+    play a table of agents sharing one shoe and report per-seat results
+    """
+    parser = argparse.ArgumentParser(description="Simulate a multi-seat blackjack table sharing one shoe.")
+    parser.add_argument("--seats", default="ai,baseline,baseline,baseline,baseline,baseline,baseline",
+                        help="comma-separated seats, each ai, baseline or optimal (up to 7)")
+    parser.add_argument("--rounds", type=int, default=100000, help="rounds to play")
+    parser.add_argument("--decks", type=int, default=6, help="decks in the shoe (0 = single reshuffling deck)")
+    parser.add_argument("--penetration", type=float, default=0.75, help="fraction of the shoe dealt before the cut card")
+    parser.add_argument("--rules", choices=list(RULE_PRESETS), default="simple", help="table rule set")
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible runs")
+    args = parser.parse_args()
+
+    names = args.seats.split(",")
+    if not 1 <= len(names) <= 7:
+        parser.error("a table seats one to seven players")
+    rules = TableRules.preset(args.rules)
+    deck_rng, ai_rng = spawn_rngs(args.seed, 2)
+    deck = train_blackjack_ai.make_deck(args.decks or None, args.penetration, deck_rng)
+
+    agents = []
+    policy = strategy = None
+    for name in names:
+        if name == "ai":
+            if policy is None:
+                try:
+                    policy = GreedyPolicy.load(MODEL_PATH if not rules.extended else f"blackjack_model_{args.rules}.bjq")
+                except FileNotFoundError:
+                    print("No trained AI model found, using untrained version")
+                    policy = BlackjackAI(rules=rules).freeze()
+            agents.append(PolicySeat(policy, ai_rng))
+        elif name == "baseline":
+            agents.append(BaselineModel())
+        elif name == "optimal":
+            if strategy is None:
+                try:
+                    strategy = OptimalStrategy.load()
+                except (OSError, ValueError) as error:
+                    parser.error(f"optimal seat needs the strategy table from optimal_strategy.py: {error}")
+            agents.append(strategy)
+        else:
+            parser.error(f"unknown seat {name!r}")
+
+    table = Table(deck, agents, rules)
+    start = time.perf_counter()
+    table.play(args.rounds)
+    elapsed = time.perf_counter() - start
+    table.report()
+    print(f"{args.rounds / elapsed:,.0f} rounds/sec, {args.rounds * len(agents) / elapsed:,.0f} seat-hands/sec")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+from blackjack import TableRules
+from blackjack_ai import BlackjackAI
+
+def test_frozen_policy_keeps_ace_and_six_pairs_apart():
+    ai = BlackjackAI(rules=TableRules.preset("vegas"), epsilon=0.0)
+    aces = ai.get_state_from_buckets(12, 6, (0.4, 0.3, 0.3), 20, True, 11)
+    sixes = ai.get_state_from_buckets(12, 6, (0.4, 0.3, 0.3), 20, False, 6)
+    ai.seen[[aces, sixes]] = True
+    split = ai.action_index['split']
+    ai.q_table[aces, split] = 1.0
+    ai.q_table[sixes, split] = -1.0
+    policy = ai.freeze()
+    assert policy.action(aces) == 'split'
+    assert policy.action(sixes) != 'split'
+
+def test_bootstrap_ignores_actions_illegal_after_a_hit():
+    ai = BlackjackAI(rules=TableRules.preset("vegas"), alpha=1.0, gamma=1.0)
+    state = ai.get_state_from_buckets(9, 6, (0.4, 0.3, 0.3), 20)
+    next_state = ai.get_state_from_buckets(14, 6, (0.4, 0.3, 0.3), 20)
+    ai.seen[next_state] = True
+    ai.q_table[next_state] = 0.0
+    ai.q_table[next_state, ai.action_index['double']] = 40.0
+    ai.q_table[next_state, ai.action_index['stand']] = -5.0
+    ai.update(state, 'hit', 0, next_state, ['hit', 'stand'])
+    assert ai.q_table[state, ai.action_index['hit']] == 0.0
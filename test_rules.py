@@ -0,0 +1,145 @@
+from blackjack import BlackjackGame, TableRules
+from cards import Card
+
+class StackedDeck:
+    """
+    Deals the given ranks in order: player, player, dealer up card, dealer hole card, then draws.
+    """
+    def __init__(self, *ranks):
+        self.cards = [Card('spades', rank) for rank in ranks]
+
+    def start_hand(self):
+        pass
+
+    def deal(self):
+        return self.cards.pop(0)
+
+def deal(preset, *ranks, bet=20):
+    game = BlackjackGame(StackedDeck(*ranks), rules=TableRules.preset(preset))
+    game.place_bet(bet)
+    game.deal_initial()
+    return game
+
+def test_simple_rules_pay_wins_at_one_and_a_half_and_naturals_as_21():
+    game = deal("simple", 'ace', 'king', '10', '9')
+    assert game.legal_actions(game.player_hand) == ['hit', 'stand']
+    assert not game.dealer_has_blackjack()
+    game.dealer_play()
+    assert game.settle() == (30, [30])
+
+def test_vegas_pays_naturals_three_to_two_and_wins_even_money():
+    game = deal("vegas", 'ace', 'king', '10', '9')
+    assert game.legal_actions(game.player_hand) == ['stand']
+    assert game.settle() == (30, [30])
+
+    game = deal("vegas", '10', '9', '10', '8')
+    game.dealer_play()
+    assert game.settle() == (20, [20])
+
+def test_six_to_five_table_pays_naturals_six_to_five():
+    game = deal("h17_6to5", 'ace', 'king', '10', '9')
+    assert game.settle() == (24, [24])
+
+def test_push_and_bust_settle():
+    game = deal("vegas", '10', '8', '10', '8')
+    game.dealer_play()
+    assert game.settle() == (0, [0])
+
+    game = deal("vegas", '10', '6', '10', '7', '9')
+    game.hit(game.player_hand)
+    assert game.settle() == (-20, [-20])
+
+def test_dealer_stands_or_hits_soft_17_by_the_rules():
+    game = deal("vegas", '10', '8', 'ace', '6', '2')
+    game.dealer_play()
+    assert game.dealer_hand.score == 17
+    assert game.settle() == (20, [20])
+
+    game = deal("h17_6to5", '10', '8', 'ace', '6', '2')
+    game.dealer_play()
+    assert game.dealer_hand.score == 19
+    assert game.settle() == (-20, [-20])
+
+def test_legal_actions_on_a_pair():
+    game = deal("vegas", '8', '8', '10', '7')
+    assert game.legal_actions(game.player_hand) == ['hit', 'stand', 'double', 'split', 'surrender']
+    game = deal("h17_6to5", '8', '8', '10', '7')
+    assert game.legal_actions(game.player_hand) == ['hit', 'stand', 'double', 'split']
+
+def test_double_doubles_the_bet_and_deals_one_card():
+    game = deal("vegas", '6', '5', '10', '7', '10')
+    game.double(game.player_hand)
+    assert game.player_hand.bet == 40
+    assert game.player_hand.score == 21
+    assert game.chips == 460
+    game.dealer_play()
+    assert game.settle() == (40, [40])
+    assert game.chips == 540
+
+def test_split_plays_two_hands_and_allows_doubling_after():
+    game = deal("vegas", '8', '8', '10', '7', '3', '10')
+    other = game.split(game.player_hand)
+    assert game.hands == [game.player_hand, other]
+    assert [hand.bet for hand in game.hands] == [20, 20]
+    assert [hand.score for hand in game.hands] == [11, 18]
+    assert 'double' in game.legal_actions(game.player_hand)
+    assert 'surrender' not in game.legal_actions(game.player_hand)
+    game.dealer_play()
+    assert game.settle() == (0, [-20, 20])
+
+def test_split_ace_and_ten_is_not_a_natural():
+    game = deal("vegas", 'ace', 'ace', '10', '7', 'king', '9')
+    game.split(game.player_hand)
+    assert game.legal_actions(game.player_hand) == ['stand']
+    game.dealer_play()
+    assert game.settle() == (40, [20, 20])
+
+def test_resplits_stop_at_max_hands_and_aces_only_when_allowed():
+    game = deal("vegas", '8', '8', '10', '7', '8', '8', '8', '8', '8', '8')
+    game.split(game.player_hand)
+    game.split(game.player_hand)
+    game.split(game.player_hand)
+    assert len(game.hands) == 4
+    assert 'split' not in game.legal_actions(game.player_hand)
+
+    game = deal("vegas", 'ace', 'ace', '10', '7', 'ace', '9')
+    game.split(game.player_hand)
+    assert game.legal_actions(game.player_hand) == ['stand']
+    game = BlackjackGame(StackedDeck('ace', 'ace', '10', '7', 'ace', '9'),
+                         rules=TableRules.preset("vegas", resplit_aces=True))
+    game.place_bet(20)
+    game.deal_initial()
+    game.split(game.player_hand)
+    assert game.legal_actions(game.player_hand) == ['stand', 'split']
+
+def test_surrender_returns_half_the_bet():
+    game = deal("vegas", '10', '6', '10', '7')
+    game.surrender(game.player_hand)
+    assert not game.has_live_hand()
+    assert game.settle() == (-10, [-10])
+    assert game.chips == 490
+
+def test_insurance_pays_two_to_one_on_a_dealer_blackjack():
+    game = deal("vegas", '10', '9', 'ace', 'king')
+    assert game.can_insure()
+    game.take_insurance()
+    assert game.dealer_has_blackjack()
+    assert game.settle() == (0, [-20])
+    assert game.chips == 500
+
+    game = deal("vegas", '10', '9', 'ace', '7')
+    game.take_insurance()
+    assert not game.dealer_has_blackjack()
+    game.dealer_play()
+    assert game.settle() == (10, [20])
+
+def test_dealer_peek_only_with_naturals():
+    game = deal("vegas", '10', '9', '10', 'ace')
+    assert game.dealer_has_blackjack()
+    assert game.settle() == (-20, [-20])
+    game = deal("vegas", 'ace', 'king', '10', 'ace')
+    assert game.settle() == (0, [0])
+
+    game = deal("simple", '10', '9', '10', 'ace')
+    assert not game.dealer_has_blackjack()
+    assert not game.can_insure()
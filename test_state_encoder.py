@@ -0,0 +1,31 @@
+import numpy as np
+from blackjack_ai import BlackjackAI, StateEncoder
+
+def test_ace_pair_and_six_pair_have_different_states():
+    encoder = StateEncoder(soft=True, pairs=True)
+    aces = encoder.encode(12, 10, 4, 3, 3, 20, soft=True, pair=11)
+    sixes = encoder.encode(12, 10, 4, 3, 3, 20, soft=False, pair=6)
+    assert aces != sixes
+    assert encoder.decode(aces)[0] == 12
+    assert encoder.decode(sixes)[0] == 12
+
+def test_pairs_below_aces_keep_their_total_slot():
+    encoder = StateEncoder(pairs=True)
+    for card in range(2, 11):
+        state = encoder.encode(2 * card, 7, 4, 3, 3, 20, pair=card)
+        assert state >= encoder.pair_offset
+        assert encoder.decode(state)[0] == 2 * card
+
+def test_scalar_and_batched_encodings_agree_on_every_composition():
+    ai = BlackjackAI(epsilon=0.0)
+    policy = ai.freeze()
+    # every low/mid/high split of a single deck with 15 to 52 cards left
+    counts = [(low, mid, high) for low in range(21) for mid in range(13) for high in range(21)
+              if 15 <= low + mid + high <= 52]
+    low, mid, high = (np.array(c, dtype=np.float64) for c in zip(*counts))
+    total = low + mid + high
+    expected = [ai.get_state_from_buckets(16, 10, (l / n, m / n, h / n), 30)
+                for l, m, h, n in zip(low.tolist(), mid.tolist(), high.tolist(), total.tolist())]
+    batched = policy.query_states(np.full(len(counts), 16), np.full(len(counts), 10),
+                                  low / total, mid / total, high / total, np.full(len(counts), 30))
+    assert batched.tolist() == expected
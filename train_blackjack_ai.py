@@ -1,20 +1,59 @@
-from blackjack import BlackjackGame
-from cards import Deck
-from blackjack_ai import BlackjackAI
+import argparse
+import cProfile
+import json
+import sys
+import time
+from blackjack import BlackjackGame, TableRules, RULE_PRESETS
+from cards import Deck, Shoe
+from blackjack_ai import BlackjackAI, GreedyPolicy, MODEL_PATH, UPDATE_MODES, STATE_ABSTRACTIONS
 from blackjack_baseline import BaselineModel
+from optimal_strategy import OptimalStrategy
+from result_stats import ResultStats
+from rng import spawn_rngs
+from instrumentation import StageProfiler
+from checkpoint import Checkpointer
+from convergence import ConvergenceMonitor
 
-deck=Deck()
+# deck shared by calls that don't bring their own
+shared_deck = Deck()
 
-def simulate_hand(ai: BlackjackAI, train=True):
+def make_deck(decks=None, penetration=0.75, rng=None):
     """
-    Simulate a single hand of blackjack using the AI
+    Returns the single reshuffling Deck, or a multi-deck Shoe when decks is given
     """
-    global deck
+    if decks:
+        return Shoe(decks, penetration, rng=rng)
+    return Deck(rng)
+
+def settle_simple_hand(game, bet):
+    """
+    Plays the dealer's hand under the simple rules, the player having stood,
+    and returns the player's reward: 1.5x the bet on a win, 0 on a draw, -bet otherwise
+    """
+    # dealer's turn
+    while game.calculate_score(game.dealer_hand) < 17:
+        game.hit(game.dealer_hand)
+
+    result = game.check_winner()
+    if result == "Player wins":
+        return int(bet * 1.5)
+    elif result == "Draw":
+        return 0
+    else:
+        return -bet
+
+def simulate_hand(ai: BlackjackAI, train=True, deck=None):
+    """
+    Simulate a single hand of blackjack using the AI, on the shared module deck unless one is given
+    """
+    if ai.rules.extended:
+        return simulate_rules_hand(ai, train, deck)
+    if deck is None:
+        deck = shared_deck
     game = BlackjackGame(deck, chips=500)
 
     # choosing bet
-    deck_probs = deck.get_remaining_probabilities()
-    bet = ai.choose_bet(deck_probs)
+    bet = ai.choose_bet_from_buckets(deck.get_bucket_probabilities())
     bet = min(bet, game.chips)
     game.place_bet(bet)
 
@@ -23,7 +62,7 @@ def simulate_hand(ai: BlackjackAI, train=True):
     player_total = game.calculate_score(game.player_hand)
     dealer_card_val = game.dealer_hand[0].value
 
-    state = ai.get_state(player_total, dealer_card_val, deck.get_remaining_probabilities(), bet)
+    state = ai.get_state_from_deck(player_total, dealer_card_val, deck, bet, game.is_soft(game.player_hand))
 
     # player's turn
     while True:
@@ -34,38 +73,155 @@ def simulate_hand(ai: BlackjackAI, train=True):
             if new_total > 21:
                 reward = -bet
                 if train:
-                    ai.update(state, action, reward)
+                    ai.observe(state, action, reward)
                 return reward
-            next_state = ai.get_state(new_total, dealer_card_val, deck.get_remaining_probabilities(), bet)
+            next_state = ai.get_state_from_deck(new_total, dealer_card_val, deck, bet, game.is_soft(game.player_hand))
             if train:
-                ai.update(state, action, 0, next_state)
+                ai.observe(state, action, 0, next_state)
             state = next_state
         else:
             break
 
-    # dealer's turn
-    while game.calculate_score(game.dealer_hand) < 17:
-        game.hit(game.dealer_hand)
+    reward = settle_simple_hand(game, bet)
+    if train:
+        ai.observe(state, action, reward)
 
-    result = game.check_winner()
-    if result == "Player wins":
-        reward = int(bet * 1.5)  
-    elif result == "Draw":
-        reward = 0
-    else:
-        reward = -bet
+    return reward
 
-    if train:
-        ai.update(state, action, reward)
+def play_rules_hand(game, choose, insure=None):
+    """
+    Plays a dealt hand to the end under game.rules: insurance, the dealer's peek,
+    every player hand including split ones, then the dealer. choose(hand, legal)
+    picks each action (anything outside legal counts as a stand) and insure(deck)
+    decides on insurance when it is offered. Returns the net reward and the
+    reward of each hand in game.hands.
+    """
+    if insure is not None and game.can_insure() and insure(game.deck):
+        game.take_insurance()
+    if not game.dealer_has_blackjack():
+        play_player_hands(game, choose)
+        game.dealer_play()
+    return game.settle()
+
+def play_player_hands(game, choose):
+    """
+    Plays each of the player's hands in turn, including hands split off along the way.
+    choose(hand, legal) picks each action; anything outside legal counts as a stand.
+    """
+    i = 0
+    while i < len(game.hands):
+        hand = game.hands[i]
+        while True:
+            legal = game.legal_actions(hand)
+            if len(legal) == 1:
+                break
+            action = choose(hand, legal)
+            if action not in legal or action == 'stand':
+                break
+            if action == 'hit':
+                game.hit(hand)
+                if hand.score > 21:
+                    break
+            elif action == 'split':
+                game.split(hand)
+            else:
+                # doubling and surrendering both end the hand
+                getattr(game, action)(hand)
+                break
+        i += 1
+
+def learn_rules_hand(ai: BlackjackAI, decisions, hands, hand_rewards):
+    """
+    Learning steps for the (hand, state, action, legal) decisions of one round.
+    A hit leads to the next decision on the same hand, bootstrapping from the
+    actions legal there, the last decision on a hand gets that hand's reward and
+    a split gets the combined reward of every hand played from the pair.
+    """
+    rewards = {id(hand): reward for hand, reward in zip(hands, hand_rewards)}
+    for i, (hand, state, action, _) in enumerate(decisions):
+        if action == 'split':
+            reward = 0
+            for other in hands:
+                ancestor = other
+                while ancestor is not None and ancestor is not hand:
+                    ancestor = ancestor.parent
+                if ancestor is hand:
+                    reward += rewards[id(other)]
+            ai.observe(state, action, reward)
+            continue
+        following = next((decision for decision in decisions[i + 1:] if decision[0] is hand), None)
+        if action == 'hit' and following is not None:
+            _, next_state, _, next_legal = following
+            ai.observe(state, action, 0, next_state, next_legal)
+        else:
+            ai.observe(state, action, rewards[id(hand)])
+
+def simulate_rules_hand(ai: BlackjackAI, train=True, deck=None):
+    """
+    Simulate a single hand under ai.rules, with doubling, splitting, surrender, insurance and naturals as the rules allow
+    """
+    if deck is None:
+        deck = shared_deck
+    game = BlackjackGame(deck, chips=500, rules=ai.rules)
+
+    bet = ai.choose_bet_from_buckets(deck.get_bucket_probabilities())
+    bet = min(bet, game.chips)
+    game.place_bet(bet)
 
+    game.deal_initial()
+    dealer_card_val = game.dealer_hand[0].value
+    decisions = []
+
+    def choose(hand, legal):
+        pair_card = hand[0].value if 'split' in legal else 0
+        state = ai.get_state_from_deck(hand.score, dealer_card_val, deck, bet, hand.is_soft, pair_card)
+        action = ai.choose_action(state, legal)
+        decisions.append((hand, state, action, legal))
+        return action
+
+    reward, hand_rewards = play_rules_hand(game, choose, ai.take_insurance)
+    if train:
+        learn_rules_hand(ai, decisions, game.hands, hand_rewards)
     return reward
 
-def simulate_baseline_hand(baseline: BaselineModel):
+def simulate_policy_hand(policy: GreedyPolicy, deck=None, rules=None, rng=None):
     """
-    Simulate a single hand of blackjack using the baseline strategy
+    Simulate a single hand with a frozen GreedyPolicy, which never touches the q-table,
+    on the shared module deck unless one is given. rng picks the random small bets
     """
-    deck = Deck()
-    game = BlackjackGame(deck, chips=500)
+    if deck is None:
+        deck = shared_deck
+    game = BlackjackGame(deck, chips=500, rules=rules)
+
+    bet = policy.get_bet(deck.get_bucket_probabilities(), rng)
+    bet = min(bet, game.chips)
+    game.place_bet(bet)
+
+    game.deal_initial()
+    dealer_card_val = game.dealer_hand[0].value
+
+    if game.rules.extended:
+        def choose(hand, legal):
+            pair_card = hand[0].value if 'split' in legal else 0
+            return policy.get_action_from_deck(hand.score, dealer_card_val, deck, bet, hand.is_soft, pair_card, legal)
+        return play_rules_hand(game, choose, policy.take_insurance)[0]
+
+    # player's turn
+    hand = game.player_hand
+    while policy.get_action_from_deck(hand.score, dealer_card_val, deck, bet, hand.is_soft) == 'hit':
+        game.hit(hand)
+        if hand.score > 21:
+            return -bet
+
+    return settle_simple_hand(game, bet)
+
+def simulate_baseline_hand(baseline: BaselineModel, rng=None, rules=None, deck=None):
+    """
+    Simulate a single hand of blackjack using the baseline strategy on a fresh deck shuffled by rng, unless a deck is given
+    """
+    if deck is None:
+        deck = Deck(rng)
+    game = BlackjackGame(deck, chips=500, rules=rules)
 
     # fixed bet
     bet = baseline.get_bet()
@@ -76,6 +232,12 @@ def simulate_baseline_hand(baseline: BaselineModel):
     player_total = game.calculate_score(game.player_hand)
     dealer_card_val = game.dealer_hand[0].value
 
+    if game.rules.extended:
+        def choose(hand, legal):
+            pair_card = hand[0].value if 'split' in legal else None
+            return baseline.get_rules_action(hand.score, dealer_card_val, legal, hand.is_soft, pair_card)
+        return play_rules_hand(game, choose, baseline.take_insurance)[0]
+
     # player's turn
     while True:
         action = baseline.get_action(player_total, dealer_card_val)
@@ -88,92 +250,236 @@ def simulate_baseline_hand(baseline: BaselineModel):
         else:
             break
 
-    # dealer's turn
-    while game.calculate_score(game.dealer_hand) < 17:
-        game.hit(game.dealer_hand)
+    return settle_simple_hand(game, bet)
 
-    result = game.check_winner()
-    if result == "Player wins":
-        return int(bet * 1.5)
-    elif result == "Draw":
-        return 0
-    else:
-        return -bet
+def simulate_strategy_hand(strategy, deck=None, rules=None):
+    """
+    Simulate a single hand of blackjack using a lookup strategy such as OptimalStrategy, on the shared module deck unless one is given.
+    Under extended rules the strategy still only hits or stands
+    """
+    if deck is None:
+        deck = shared_deck
+    game = BlackjackGame(deck, chips=500, rules=rules)
+
+    bet = strategy.get_bet()
+    game.place_bet(bet)
+
+    game.deal_initial()
+    player_total = game.calculate_score(game.player_hand)
+    dealer_card_val = game.dealer_hand[0].value
+
+    if game.rules.extended:
+        def choose(hand, legal):
+            return strategy.get_action(hand.score, dealer_card_val, deck.get_bucket_probabilities(), hand.is_soft)
+        return play_rules_hand(game, choose)[0]
+
+    # player's turn
+    while True:
+        soft = game.is_soft(game.player_hand)
+        action = strategy.get_action(player_total, dealer_card_val, deck.get_bucket_probabilities(), soft)
+        if action == 'hit':
+            game.hit(game.player_hand)
+            player_total = game.calculate_score(game.player_hand)
+            if player_total > 21:
+                return -bet
+        else:
+            break
 
-def print_results(label, results):
+    return settle_simple_hand(game, bet)
+
+def print_results(label, stats):
     """
-    print the results of the simulation
+    print the results of the simulation from a ResultStats accumulator
     """
-    total_profit = sum(results)
-    wins = sum(1 for r in results if r > 0)
-    draws = sum(1 for r in results if r == 0)
-    losses = sum(1 for r in results if r < 0)
-    
+    low, high = stats.confidence_interval()
+
     print(f"\n{label} Results:")
     print("--------------------")
-    print(f"Total Profit:         {total_profit}")
-    print(f"Average Profit per Hand: {total_profit / len(results):.2f}")
-    print(f"Win Rate:              {wins / len(results) * 100:.2f}%")
-    print(f"Draw Rate:            {draws / len(results) * 100:.2f}%")
-    print(f"Loss Rate:            {losses / len(results) * 100:.2f}%")
+    print(f"Total Profit:         {stats.total}")
+    print(f"Average Profit per Hand: {stats.mean:.2f}")
+    print(f"95% CI per Hand:      {low:.2f} to {high:.2f}")
+    print(f"Win Rate:              {stats.rate(stats.wins):.2f}%")
+    print(f"Draw Rate:            {stats.rate(stats.draws):.2f}%")
+    print(f"Loss Rate:            {stats.rate(stats.losses):.2f}%")
+    print(f"Max Drawdown:         {stats.max_drawdown}")
+
+def parse_args():
+    """
+    parse command line options
+    """
+    parser = argparse.ArgumentParser(description="Train and test the blackjack AI against the baseline.")
+    parser.add_argument("--training-hands", type=int, default=500000,
+                        help="hands to train for in total; with --resume a larger value extends a finished run")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes to train with (1 = single-process loop)")
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible runs")
+    parser.add_argument("--sync-every", type=int, default=10000, help="hands per worker between q-table merges")
+    parser.add_argument("--decks", type=int, default=None, help="train on a multi-deck shoe with this many decks")
+    parser.add_argument("--penetration", type=float, default=0.75, help="fraction of the shoe dealt before the cut card")
+    parser.add_argument("--rules", choices=list(RULE_PRESETS), default="simple", help="table rule set to train and test under")
+    parser.add_argument("--rule", action="append", default=[], metavar="NAME=VALUE",
+                        help="override one table rule, e.g. hit_soft_17=true or max_hands=2 (repeatable)")
+    parser.add_argument("--soft-hands", action="store_true", help="give the AI separate states for soft and hard totals")
+    parser.add_argument("--state-abstraction", choices=list(STATE_ABSTRACTIONS), default="full",
+                        help="what the AI's states keep of the shoe and bet: full buckets and bet, no_bet, count_bet, count or basic")
+    parser.add_argument("--compare-abstractions", action="store_true",
+                        help="report table size, visit coverage, training speed and profit/hand for each state abstraction and exit")
+    parser.add_argument("--update-mode", choices=UPDATE_MODES, default="q",
+                        help="q: one-step Q-learning; nstep, lambda (Watkins Q(lambda)) and mc learn each hand at its end")
+    parser.add_argument("--n-step", type=int, default=3, help="steps per return in nstep mode")
+    parser.add_argument("--trace-lambda", type=float, default=0.8, help="trace decay in lambda mode")
+    parser.add_argument("--compare-updates", action="store_true", help="report hands to a target profit/hand for each update mode and exit")
+    parser.add_argument("--optimal-table", default=None, help="also test the precomputed optimal strategy table at this path")
+    parser.add_argument("--profile", action="store_true", help="print a per-stage time breakdown of single-process training")
+    parser.add_argument("--profile-output", default=None, help="also write cProfile stats of training to this file")
+    parser.add_argument("--checkpoint-dir", default=None, help="write periodic training checkpoints to this directory")
+    parser.add_argument("--checkpoint-every", type=int, default=50000, help="hands between checkpoints")
+    parser.add_argument("--resume", action="store_true", help="continue from the latest checkpoint in --checkpoint-dir")
+    parser.add_argument("--converge", action="store_true", help="stop training early once the greedy policy stops changing")
+    parser.add_argument("--convergence-window", type=int, default=10000, help="hands per convergence check")
+    parser.add_argument("--policy-tolerance", type=float, default=0.01, help="largest share of flipped greedy decisions per window counted as stable")
+    parser.add_argument("--patience", type=int, default=3, help="consecutive stable windows needed")
+    parser.add_argument("--convergence-mode", choices=["stop", "anneal"], default="stop", help="stop when stable, or anneal alpha/epsilon decay first")
+    parser.add_argument("--speedup-curve", action="store_true", help="report parallel training speedup and exit")
+    args = parser.parse_args()
+    if args.resume and not args.checkpoint_dir:
+        parser.error("--resume needs --checkpoint-dir")
+    if args.checkpoint_dir and args.workers > 1:
+        parser.error("checkpointing covers single-process training only")
+    overrides = {}
+    for rule in args.rule:
+        name, _, value = rule.partition("=")
+        try:
+            overrides[name] = json.loads(value)
+        except json.JSONDecodeError:
+            parser.error(f"--rule {rule}: value must be JSON, e.g. true, 2 or 1.2")
+    try:
+        args.table_rules = TableRules.preset(args.rules, **overrides)
+    except TypeError:
+        parser.error(f"unknown rule in {args.rule}")
+    return args
 
 def main():
     """
     main function
     """
+    args = parse_args()
+    if args.speedup_curve:
+        from parallel_training import speedup_curve
+        speedup_curve(seed=0 if args.seed is None else args.seed, sync_every=args.sync_every)
+        return
+    if args.compare_updates:
+        from convergence import compare_update_modes
+        compare_update_modes(seed=0 if args.seed is None else args.seed, soft_hands=args.soft_hands, rules=args.table_rules,
+                             n_step=args.n_step, trace_lambda=args.trace_lambda, state_abstraction=args.state_abstraction)
+        return
+    if args.compare_abstractions:
+        from convergence import compare_state_abstractions
+        compare_state_abstractions(seed=0 if args.seed is None else args.seed, soft_hands=args.soft_hands,
+                                   rules=args.table_rules, update_mode=args.update_mode)
+        return
+
+    # independent streams for dealing, the AI's choices and the baseline's fresh decks
+    deck_rng, ai_rng, baseline_rng, strategy_rng = spawn_rngs(args.seed, 4)
+    deck = make_deck(args.decks, args.penetration, deck_rng)
+
     # initialize models
-    ai = BlackjackAI()
+    rules = args.table_rules
+    ai = BlackjackAI(rng=ai_rng, soft_hands=args.soft_hands, rules=rules, update_mode=args.update_mode,
+                     n_step=args.n_step, trace_lambda=args.trace_lambda, state_abstraction=args.state_abstraction)
     baseline = BaselineModel()
     
     # training ai
-    total_training_hands = 500000
-    print("Training AI model...")
+    total_training_hands = args.training_hands
+    print(f"Training AI model under the {args.rules} rules ({', '.join(ai.actions)}), "
+          f"{args.state_abstraction} states ({ai.encoder.size:,})...")
+
+    profiler = None
+    if args.profile:
+        profiler = StageProfiler().enable()
+        profiler.wrap(sys.modules[__name__], "simulate_hand", "simulate_hand")
+    profile = cProfile.Profile() if args.profile_output else None
+    if profile:
+        profile.enable()
+    monitor = None
+    if args.converge:
+        monitor = ConvergenceMonitor(ai, args.policy_tolerance, patience=args.patience, mode=args.convergence_mode)
+    start = time.perf_counter()
     
-    for i in range(total_training_hands):
-        simulate_hand(ai, train=True)
-        ai.decay_epsilon()
-        if (i + 1) % 50000 == 0:
-            print(f"Completed {i + 1} hands")
+    if args.workers > 1:
+        from parallel_training import train_parallel
+        train_parallel(ai, total_training_hands, args.workers, seed=args.seed, sync_every=args.sync_every,
+                       decks=args.decks, penetration=args.penetration, monitor=monitor)
+    else:
+        checkpointer = None
+        first_hand = 0
+        if args.checkpoint_dir:
+            # the hand budget is left out so a resumed run can be extended
+            config = {"seed": args.seed, "decks": args.decks, "penetration": args.penetration, "soft_hands": args.soft_hands,
+                      "rules": rules.to_dict(), "update_mode": args.update_mode, "state_abstraction": args.state_abstraction}
+            checkpointer = Checkpointer(args.checkpoint_dir, ai, deck, config, monitor=monitor)
+            if args.resume:
+                first_hand = checkpointer.restore()
+                print(f"Resuming from hand {first_hand}")
+
+        for i in range(first_hand, total_training_hands):
+            simulate_hand(ai, train=True, deck=deck)
+            ai.decay_epsilon()
+            if (i + 1) % 50000 == 0:
+                print(f"Completed {i + 1} hands")
+            # check before saving, so a checkpoint holds the window that ends on it
+            stop = monitor and (i + 1) % args.convergence_window == 0 and monitor.check(i + 1)
+            if checkpointer and (i + 1) % args.checkpoint_every == 0:
+                checkpointer.save(i + 1)
+            if stop:
+                break
+
+        if checkpointer:
+            checkpointer.close()
+
+    wall_seconds = time.perf_counter() - start
+    if profile:
+        profile.disable()
+        profile.dump_stats(args.profile_output)
+        print(f"cProfile stats written to {args.profile_output} (inspect with python -m pstats)")
+    if profiler:
+        profiler.disable()
+        profiler.report(wall_seconds)
+
+    if monitor:
+        monitor.report(total_training_hands)
 
-    ai.save_model()
+    # models for other rule sets are saved beside the default one the GUI loads
+    ai.save_model(MODEL_PATH if not rules.extended else f"blackjack_model_{args.rules}.bjq")
     
     # testing phase
     test_hands = 100000
     print(f"\nTesting both models on {test_hands} hands each...")
     
-    # test AI model
-    ai.epsilon = 0.0  # Disable exploration
-    ai_results = [simulate_hand(ai, train=False) for _ in range(test_hands)]
+    # test AI model through a read-only greedy snapshot, so testing can't change the q-table
+    policy = ai.freeze()
+    ai_stats = ResultStats.from_iterable(simulate_policy_hand(policy, deck, rules, ai.rng) for _ in range(test_hands))
     
     # test Baseline model
-    baseline_results = [simulate_baseline_hand(baseline) for _ in range(test_hands)]
+    baseline_stats = ResultStats.from_iterable(simulate_baseline_hand(baseline, baseline_rng, rules) for _ in range(test_hands))
     
     # print results
     print("\n=== Final Test Results ===")
     print("-"*75)
     print(f"| {'Metric':<25} | {'AI Model':<20} | {'Baseline':<20} | ")
     print("-"*75)
-
-    ai_profit = sum(ai_results)
-    baseline_profit = sum(baseline_results)
-    print(f"| {'Total Profit':<25} | {ai_profit:20,} | {baseline_profit:20,} | ")
-
-    ai_avg = ai_profit / test_hands
-    baseline_avg = baseline_profit / test_hands
-    print(f"| {'Avg Profit/Hand':<25} | {ai_avg:20.2f} | {baseline_avg:20.2f} | ")
-
-    ai_wins = sum(1 for r in ai_results if r > 0)
-    baseline_wins = sum(1 for r in baseline_results if r > 0)
-    print(f"| {'Win Rate':<25} | {ai_wins/test_hands*100:19.2f}% | {baseline_wins/test_hands*100:19.2f}% | ")
-
-    ai_draws = sum(1 for r in ai_results if r == 0)
-    baseline_draws = sum(1 for r in baseline_results if r == 0)
-    print(f"| {'Draw Rate':<25} | {ai_draws/test_hands*100:19.2f}% | {baseline_draws/test_hands*100:19.2f}% | ")
-
-    ai_losses = sum(1 for r in ai_results if r < 0)
-    baseline_losses = sum(1 for r in baseline_results if r < 0)
-    print(f"| {'Loss Rate':<25} | {ai_losses/test_hands*100:19.2f}% | {baseline_losses/test_hands*100:19.2f}% | ")
+    print(f"| {'Total Profit':<25} | {ai_stats.total:20,} | {baseline_stats.total:20,} | ")
+    print(f"| {'Avg Profit/Hand':<25} | {ai_stats.mean:20.2f} | {baseline_stats.mean:20.2f} | ")
+    print(f"| {'Std Dev/Hand':<25} | {ai_stats.std:20.2f} | {baseline_stats.std:20.2f} | ")
+    print(f"| {'Win Rate':<25} | {ai_stats.rate(ai_stats.wins):19.2f}% | {baseline_stats.rate(baseline_stats.wins):19.2f}% | ")
+    print(f"| {'Draw Rate':<25} | {ai_stats.rate(ai_stats.draws):19.2f}% | {baseline_stats.rate(baseline_stats.draws):19.2f}% | ")
+    print(f"| {'Loss Rate':<25} | {ai_stats.rate(ai_stats.losses):19.2f}% | {baseline_stats.rate(baseline_stats.losses):19.2f}% | ")
+    print(f"| {'Max Drawdown':<25} | {ai_stats.max_drawdown:20,} | {baseline_stats.max_drawdown:20,} | ")
     print("-"*75)
 
+    if args.optimal_table:
+        strategy = OptimalStrategy.load(args.optimal_table)
+        deck = make_deck(args.decks, args.penetration, strategy_rng)
+        print_results("Optimal Strategy", ResultStats.from_iterable(simulate_strategy_hand(strategy, deck, rules) for _ in range(test_hands)))
+
 if __name__ == "__main__":
     main()
\ No newline at end of file